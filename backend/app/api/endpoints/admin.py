@@ -10,6 +10,7 @@ import logging
 
 from app.db.engine import get_db
 from app.db import models
+from app.ml.registry import get_model_registry
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -230,13 +231,15 @@ async def populate_sample_data(db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/generate-predictions", summary="Generate mock predictions for upcoming fixtures")
+@router.post("/generate-predictions", summary="Generate predictions for upcoming fixtures")
 async def generate_mock_predictions(db: AsyncSession = Depends(get_db)):
     """
-    Generate realistic mock predictions for all upcoming (scheduled) fixtures.
-    Based on team standings, form, and home advantage.
+    Generate predictions for all upcoming (scheduled) fixtures.
 
-    Predictions are calculated using:
+    When a trained Dixon-Coles model is available, every fixture whose teams
+    it knows is scored in a single batched `predict_matches` call. Remaining
+    fixtures get realistic mock predictions based on team standings, form,
+    and home advantage, calculated using:
     - Current league position and points
     - Goals scored/conceded ratio
     - Home advantage factor
@@ -256,6 +259,32 @@ async def generate_mock_predictions(db: AsyncSession = Depends(get_db)):
         if not fixtures:
             return {"message": "No scheduled fixtures found", "predictions_created": 0}
 
+        teams_result = await db.execute(select(models.Team))
+        teams_by_id = {team.id: team for team in teams_result.scalars().all()}
+
+        # Score all fixtures known to the trained model in one pass
+        model_predictions = {}
+        entry = get_model_registry().get()
+        if entry is not None:
+            try:
+                model = entry.model
+                scorable = [
+                    f for f in fixtures
+                    if teams_by_id[f.home_team_id].name in model.attack_params
+                    and teams_by_id[f.away_team_id].name in model.attack_params
+                ]
+                if scorable:
+                    batch = model.predict_matches(
+                        [teams_by_id[f.home_team_id].name for f in scorable],
+                        [teams_by_id[f.away_team_id].name for f in scorable]
+                    )
+                    for idx, fixture in enumerate(scorable):
+                        model_predictions[fixture.id] = {
+                            key: values[idx] for key, values in batch.items()
+                        }
+            except Exception as e:
+                logger.error(f"Failed to score fixtures with trained model: {e}")
+
         # Team strength ratings based on real standings (after Giornata 17)
         team_ratings = {
             "Inter": {"rating": 1900, "attack": 2.24, "defense": 1.06},  # 38 GF, 18 GA in 17 matches
@@ -283,12 +312,31 @@ async def generate_mock_predictions(db: AsyncSession = Depends(get_db)):
         predictions_created = 0
 
         for fixture in fixtures:
-            # Get home and away teams
-            home_team_query = select(models.Team).where(models.Team.id == fixture.home_team_id)
-            away_team_query = select(models.Team).where(models.Team.id == fixture.away_team_id)
+            if fixture.id in model_predictions:
+                pred = model_predictions[fixture.id]
+                db.add(models.Prediction(
+                    fixture_id=fixture.id,
+                    model_version=entry.version,
+                    prob_home_win=round(float(pred['prob_home_win']), 3),
+                    prob_draw=round(float(pred['prob_draw']), 3),
+                    prob_away_win=round(float(pred['prob_away_win']), 3),
+                    prob_over_25=round(float(pred['prob_over_25']), 3),
+                    prob_under_25=round(float(pred['prob_under_25']), 3),
+                    prob_btts_yes=round(float(pred['prob_btts_yes']), 3),
+                    prob_btts_no=round(float(pred['prob_btts_no']), 3),
+                    expected_home_goals=round(float(pred['expected_home_goals']), 2),
+                    expected_away_goals=round(float(pred['expected_away_goals']), 2),
+                    most_likely_score=str(pred['most_likely_score']),
+                    confidence_score=round(float(max(
+                        pred['prob_home_win'], pred['prob_draw'], pred['prob_away_win']
+                    )), 2)
+                ))
+                predictions_created += 1
+                continue
 
-            home_team = (await db.execute(home_team_query)).scalar_one()
-            away_team = (await db.execute(away_team_query)).scalar_one()
+            # Get home and away teams
+            home_team = teams_by_id[fixture.home_team_id]
+            away_team = teams_by_id[fixture.away_team_id]
 
             home_stats = team_ratings.get(home_team.name, {"rating": 1600, "attack": 1.5, "defense": 1.5})
             away_stats = team_ratings.get(away_team.name, {"rating": 1600, "attack": 1.5, "defense": 1.5})
@@ -361,9 +409,10 @@ async def generate_mock_predictions(db: AsyncSession = Depends(get_db)):
         logger.info(f"✅ Successfully generated {predictions_created} predictions!")
 
         return {
-            "message": "Mock predictions generated successfully",
+            "message": "Predictions generated successfully",
             "predictions_created": predictions_created,
-            "model_version": "mock-v1.0-standings-based",
+            "model_predictions": len(model_predictions),
+            "model_version": entry.version if model_predictions else "mock-v1.0-standings-based",
             "fixtures_analyzed": len(fixtures)
         }
 
@@ -21,6 +21,7 @@ from app.api.schemas import (
     SuspensionResponse,
     TeamBase
 )
+from app.services.h2h_index import h2h_summary, load_head_to_head
 import logging
 
 logger = logging.getLogger(__name__)
@@ -239,6 +240,9 @@ async def get_match_detail(
         away_suspensions_result = await db.execute(away_suspensions_query)
         away_suspensions = away_suspensions_result.scalars().all()
 
+        # Head-to-head record from the local index (history if it lags)
+        h2h = await load_head_to_head(db, fixture.home_team_id, fixture.away_team_id)
+
         # Build response
         return MatchDetailResponse(
             fixture=FixtureBase.model_validate(fixture),
@@ -281,7 +285,7 @@ async def get_match_detail(
             ],
             home_last_5_results=[],  # TODO: Calculate from fixtures
             away_last_5_results=[],  # TODO: Calculate from fixtures
-            h2h_summary=None  # TODO: Calculate H2H stats
+            h2h_summary=h2h_summary(h2h, fixture.home_team_id) if h2h.matches else None
         )
 
     except HTTPException:
@@ -12,6 +12,7 @@ import logging
 
 from app.db.engine import get_db
 from app.config import get_settings
+from app.ml.registry import get_model_registry
 
 router = APIRouter()
 settings = get_settings()
@@ -114,6 +115,13 @@ async def readiness_check(db: AsyncSession = Depends(get_db)):
     except Exception as e:
         checks["redis"] = f"unhealthy: {str(e)}"
 
+    # Active prediction model (optional, predictions fall back to stored rows)
+    try:
+        entry = get_model_registry().get()
+        checks["model"] = entry.version if entry else "not loaded"
+    except Exception as e:
+        checks["model"] = f"error: {str(e)}"
+
     # Overall status
     # Database must be healthy
     is_ready = checks["database"] == "healthy"
@@ -2,15 +2,15 @@
 Predictions API Endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from typing import List
+from typing import List, Optional
 from datetime import datetime, timedelta, timezone, date
 
 from app.db.engine import get_db
-from app.db.models import Prediction, Fixture
+from app.db.models import Prediction, Fixture, LivePrediction, PredictionMetrics, Team
 from app.api.schemas import (
     PredictionResponse,
     FixtureScorersResponse,
@@ -21,8 +21,16 @@ from app.api.schemas import (
     FixtureBiorhythmsResponse,
     TeamBiorhythm,
     PlayerBiorhythm,
-    PredictionStatsResponse
+    PredictionStatsResponse,
+    IntervalEstimate,
+    PredictionIntervalsResponse,
+    FixtureMarketsResponse,
+    LivePredictionResponse
 )
+from app.ml.bootstrap import INTERVAL_FIELDS
+from app.ml.markets import market_sheet
+from app.ml.online_metrics import CONFIDENCE, OVERALL, TEAM, MetricTotals, load_metric_totals
+from app.ml.registry import get_model_registry
 from app.utils.biorhythm import calculate_player_biorhythm, compare_team_biorhythms
 from app.data.player_birthdates import get_birthdate, get_team_birthdates, PLAYER_BIRTHDATES
 import logging
@@ -541,39 +549,71 @@ MOCK_LINEUPS = {
     },
 }
 
+# Evaluated matches a team needs before it can be best/worst predicted
+MIN_TEAM_EVALUATIONS = 5
+
+
 @router.get("/stats", response_model=PredictionStatsResponse)
-async def get_prediction_stats():
+async def get_prediction_stats(
+    model_version: Optional[str] = Query(None, description="Restrict to one model version (default: all)"),
+    db: AsyncSession = Depends(get_db)
+):
     """
     Get aggregated prediction statistics.
     Returns model accuracy, reliability stats, and team performance.
+
+    Served from the running metric sums updated on every evaluation, so the
+    cost does not grow with the number of evaluated predictions.
     """
-    # MOCK DATA matching the user's screenshot request
-    # In a real scenario, this would aggregate data from the Prediction table
-    return {
-        "total_predictions": 184,
-        "accuracy_1x2": 54.3,
-        "accuracy_over_under": 62.1,
-        "accuracy_btts": 58.7,
-        "best_team_predicted": "Inter",
-        "worst_team_predicted": "Fiorentina",
-        "last_week_accuracy": 70.0,
-        "model_version": "v1.2.0-xg (Dixon-Coles + xG)",
-        "last_update": datetime.now(),
-        "avg_confidence": 67.5,
-        "high_confidence_wins": 45,
-        "high_confidence_accuracy": 78.0,
-        "medium_confidence_wins": 89,
-        "medium_confidence_accuracy": 56.0,
-        "low_confidence_wins": 23,
-        "low_confidence_accuracy": 38.0,
-        "best_team_accuracy": 85.0,
-        "best_team_correct": 17,
-        "best_team_total": 20,
-        "worst_team_accuracy": 32.0,
-        "worst_team_correct": 6,
-        "worst_team_total": 19
+    overall = (await load_metric_totals(db, OVERALL, model_version=model_version)).get('') or MetricTotals()
+    last_week = (await load_metric_totals(db, OVERALL, days=7, model_version=model_version)).get('') or MetricTotals()
+    buckets = await load_metric_totals(db, CONFIDENCE, model_version=model_version)
+    teams = await load_metric_totals(db, TEAM, model_version=model_version)
+
+    def pct(correct: int, total: int) -> float:
+        return round(100.0 * correct / total, 1) if total else 0.0
+
+    summary = overall.summary()
+    response = {
+        "total_predictions": overall.n_evaluated,
+        "accuracy_1x2": pct(overall.correct_1x2, overall.n_evaluated),
+        "accuracy_over_under": pct(overall.correct_over_under, overall.n_evaluated),
+        "accuracy_btts": pct(overall.correct_btts, overall.n_evaluated),
+        "last_week_accuracy": pct(last_week.correct_1x2, last_week.n_evaluated),
+        "model_version": model_version or get_model_registry().active_version,
+        "avg_confidence": round(100.0 * summary['avg_confidence'], 1) if overall.n_evaluated else 0.0,
     }
 
+    for bucket in ('high', 'medium', 'low'):
+        totals = buckets.get(bucket) or MetricTotals()
+        response[f"{bucket}_confidence_wins"] = totals.correct_1x2
+        response[f"{bucket}_confidence_accuracy"] = pct(totals.correct_1x2, totals.n_evaluated)
+
+    # Best/worst team by 1X2 accuracy over the fixtures it played
+    ranked = [(key, totals) for key, totals in teams.items() if totals.n_evaluated >= MIN_TEAM_EVALUATIONS]
+    ranked = ranked or list(teams.items())
+    ranked.sort(key=lambda item: (item[1].correct_1x2 / item[1].n_evaluated, item[1].n_evaluated))
+
+    names = {}
+    if ranked:
+        names = dict((await db.execute(
+            select(Team.id, Team.name).where(Team.id.in_([int(ranked[0][0]), int(ranked[-1][0])]))
+        )).all())
+
+    for label, item in (("best", ranked[-1] if ranked else None), ("worst", ranked[0] if ranked else None)):
+        key, totals = item if item else (None, MetricTotals())
+        response[f"{label}_team_predicted"] = names.get(int(key), "N/A") if key else "N/A"
+        response[f"{label}_team_accuracy"] = pct(totals.correct_1x2, totals.n_evaluated)
+        response[f"{label}_team_correct"] = totals.correct_1x2
+        response[f"{label}_team_total"] = totals.n_evaluated
+
+    last_update = (await db.execute(
+        select(func.max(PredictionMetrics.updated_at))
+    )).scalar_one_or_none()
+    response["last_update"] = last_update or datetime.now(timezone.utc)
+
+    return response
+
 
 @router.get("/{fixture_id}", response_model=PredictionResponse)
 async def get_prediction(
@@ -601,6 +641,115 @@ async def get_prediction(
     return prediction
 
 
+@router.get("/{fixture_id}/live", response_model=LivePredictionResponse)
+async def get_live_prediction(
+    fixture_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the latest in-play prediction for a fixture.
+    Served as stored by the live sync task, without recomputation.
+    """
+    query = select(LivePrediction).where(LivePrediction.fixture_id == fixture_id)
+    result = await db.execute(query)
+    live = result.scalar_one_or_none()
+
+    if not live:
+        raise HTTPException(status_code=404, detail="Live prediction not found")
+
+    return live
+
+
+@router.get("/{fixture_id}/intervals", response_model=PredictionIntervalsResponse)
+async def get_prediction_intervals(
+    fixture_id: int,
+    level: float = Query(0.9, gt=0, lt=1),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get bootstrap percentile intervals for expected goals and 1X2 probabilities.
+    Available when the model was trained with bootstrap resamples enabled.
+    """
+    entry = get_model_registry().get()
+    if entry is None or entry.bootstrap is None:
+        raise HTTPException(status_code=503, detail="Prediction intervals not available")
+
+    query = (
+        select(Fixture)
+        .options(selectinload(Fixture.home_team), selectinload(Fixture.away_team))
+        .where(Fixture.id == fixture_id)
+    )
+    result = await db.execute(query)
+    fixture = result.scalar_one_or_none()
+
+    if not fixture:
+        raise HTTPException(status_code=404, detail="Fixture not found")
+
+    try:
+        intervals = entry.bootstrap.predict_intervals(
+            [fixture.home_team.name],
+            [fixture.away_team.name],
+            level=level,
+            max_goals=entry.table.max_goals
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return PredictionIntervalsResponse(
+        fixture_id=fixture_id,
+        model_version=entry.version,
+        n_draws=entry.bootstrap.n_draws,
+        level=level,
+        **{
+            name: IntervalEstimate(
+                lower=float(intervals[name][0, 0]),
+                median=float(intervals[name][0, 1]),
+                upper=float(intervals[name][0, 2])
+            )
+            for name in INTERVAL_FIELDS
+        }
+    )
+
+
+@router.get("/{fixture_id}/markets", response_model=FixtureMarketsResponse)
+async def get_fixture_markets(
+    fixture_id: int,
+    top_k: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the full market sheet for a fixture: over/under at every half-goal
+    line, Asian handicaps, double chance, team totals, winning margins,
+    clean sheets and the most likely exact scores.
+    """
+    entry = get_model_registry().get()
+    if entry is None:
+        raise HTTPException(status_code=503, detail="Model not available")
+
+    query = (
+        select(Fixture)
+        .options(selectinload(Fixture.home_team), selectinload(Fixture.away_team))
+        .where(Fixture.id == fixture_id)
+    )
+    result = await db.execute(query)
+    fixture = result.scalar_one_or_none()
+
+    if not fixture:
+        raise HTTPException(status_code=404, detail="Fixture not found")
+
+    if (fixture.home_team.name, fixture.away_team.name) not in entry.table:
+        raise HTTPException(status_code=404, detail="Teams not found in fitted model")
+
+    prediction = entry.table.lookup(fixture.home_team.name, fixture.away_team.name)
+    sheet = market_sheet(prediction['scoreline_probs'], top_k=top_k)
+
+    return FixtureMarketsResponse(
+        fixture_id=fixture_id,
+        model_version=entry.version,
+        markets=sheet.fixture(0)
+    )
+
+
 @router.get("/{fixture_id}/scorers", response_model=FixtureScorersResponse)
 async def get_scorers_prediction(
     fixture_id: int,
@@ -4,13 +4,18 @@ Classifica, Marcatori, Cartellini
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import select, desc, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 from typing import List, Optional
 import logging
+import os
 
 from app.db.engine import get_db
 from app.db import models
+from app.ml.registry import get_model_registry
+from app.ml.season_simulation import SeasonSimulator
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
@@ -36,6 +41,18 @@ class TeamStandingResponse(BaseModel):
         from_attributes = True
 
 
+class TeamProjectionResponse(BaseModel):
+    team_name: str
+    team_short_name: str
+    current_points: int
+    expected_points: float
+    prob_title: float
+    prob_champions_league: float  # Top 4
+    prob_europe: float  # Top 6 (Champions League, Europa League, Conference League)
+    prob_relegation: float  # Bottom 3
+    position_probs: List[float]  # Index 0 = 1st place
+
+
 class TopScorerResponse(BaseModel):
     position: int
     player_name: str
@@ -133,6 +150,115 @@ async def get_standings(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/projections/{season}", response_model=List[TeamProjectionResponse])
+async def get_season_projections(
+    season: str = "2025-2026",
+    n_simulations: int = Query(20000, ge=1000, le=200000),
+    seed: Optional[int] = None,
+    n_workers: Optional[int] = Query(None, ge=1, le=32),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Project the final table by Monte Carlo simulation of the remaining fixtures.
+    Returns title, Europe and relegation odds plus the full finishing
+    position distribution for every team.
+
+    Simulations are split over `n_workers` processes (default: CPU count).
+    Live fixtures count as remaining, since standings only hold finished ones.
+    """
+    entry = get_model_registry().get()
+    if entry is None:
+        raise HTTPException(status_code=503, detail="Model not available")
+
+    try:
+        logger.info(f"Simulating season {season} ({n_simulations} runs)")
+
+        result = await db.execute(
+            select(models.TeamStats, models.Team)
+            .join(models.Team, models.TeamStats.team_id == models.Team.id)
+            .where(models.TeamStats.season == season)
+        )
+        teams_data = result.all()
+
+        if not teams_data:
+            logger.warning(f"No standings data found for season {season}")
+            return []
+
+        standings = {}
+        short_names = {}
+        for team_stats, team in teams_data:
+            standings[team.name] = (
+                (team_stats.wins * 3) + team_stats.draws,
+                team_stats.goals_scored - team_stats.goals_conceded,
+                team_stats.goals_scored
+            )
+            short_names[team.name] = team.short_name
+
+        home_team = aliased(models.Team)
+        away_team = aliased(models.Team)
+        result = await db.execute(
+            select(home_team.name, away_team.name)
+            .select_from(models.Fixture)
+            .join(home_team, models.Fixture.home_team_id == home_team.id)
+            .join(away_team, models.Fixture.away_team_id == away_team.id)
+            .where(
+                models.Fixture.season == season,
+                models.Fixture.status.in_([
+                    models.FixtureStatus.SCHEDULED,
+                    models.FixtureStatus.LIVE,
+                    models.FixtureStatus.POSTPONED
+                ])
+            )
+        )
+
+        remaining = []
+        skipped = 0
+        for home, away in result.all():
+            if (home, away) in entry.table and home in standings and away in standings:
+                remaining.append((home, away))
+            else:
+                skipped += 1
+
+        if skipped:
+            logger.warning(f"Skipping {skipped} fixtures with teams unknown to the model")
+
+        simulator = SeasonSimulator(entry.model)
+        simulation = await run_in_threadpool(
+            simulator.simulate, standings, remaining,
+            n_simulations=n_simulations, n_workers=n_workers or os.cpu_count() or 1, seed=seed
+        )
+
+        n_teams = len(simulation.team_list)
+        position_probs = simulation.position_probs
+        prob_title = simulation.prob_top(1)
+        prob_champions_league = simulation.prob_top(min(4, n_teams))
+        prob_europe = simulation.prob_top(min(6, n_teams))
+        prob_relegation = simulation.prob_bottom(min(3, n_teams))
+
+        projections = [
+            TeamProjectionResponse(
+                team_name=team,
+                team_short_name=short_names[team],
+                current_points=standings[team][0],
+                expected_points=round(float(simulation.expected_points[i]), 2),
+                prob_title=float(prob_title[i]),
+                prob_champions_league=float(prob_champions_league[i]),
+                prob_europe=float(prob_europe[i]),
+                prob_relegation=float(prob_relegation[i]),
+                position_probs=position_probs[i].tolist()
+            )
+            for i, team in enumerate(simulation.team_list)
+        ]
+        projections.sort(key=lambda x: x.expected_points, reverse=True)
+
+        logger.info(f"Returning projections for {len(projections)} teams")
+        return projections
+
+    except Exception as e:
+        logger.error(f"Error simulating season: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/top-scorers/{season}", response_model=List[TopScorerResponse])
 async def get_top_scorers(
     season: str = "2025-2026",
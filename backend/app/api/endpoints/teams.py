@@ -2,15 +2,17 @@
 Teams API Endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 import logging
 
 from app.db.engine import get_db
-from app.db.models import Team
-from app.api.schemas import TeamBase
+from app.db.models import Team, TeamStrength
+from app.api.schemas import HeadToHeadResponse, TeamBase, TeamStrengthResponse
+from app.services.h2h_index import h2h_summary, load_head_to_head
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -62,3 +64,96 @@ async def get_team(team_id: int, db: AsyncSession = Depends(get_db)):
     except Exception as e:
         logger.error(f"Error fetching team {team_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{team_id}/strength", response_model=TeamStrengthResponse)
+async def get_team_strength(
+    team_id: int,
+    as_of: Optional[datetime] = Query(None, description="Strength after the last match on or before this date"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get a team's online attack/defense rating, now or as of a past date.
+
+    Teams without a finished match (before `as_of`) get the prior rating.
+    """
+    try:
+        team = (await db.execute(select(Team).where(Team.id == team_id))).scalar_one_or_none()
+        if not team:
+            raise HTTPException(status_code=404, detail="Team not found")
+
+        query = select(TeamStrength).where(TeamStrength.team_id == team_id)
+        if as_of is not None:
+            query = query.where(TeamStrength.as_of <= as_of)
+        strength = (await db.execute(
+            query.order_by(TeamStrength.as_of.desc()).limit(1)
+        )).scalar_one_or_none()
+
+        if strength is None:
+            from app.ml.online_ratings import OnlineStrengthModel
+
+            prior = OnlineStrengthModel.load().initial_state()
+            return TeamStrengthResponse(
+                team_id=team_id,
+                attack=prior.attack,
+                defense=prior.defense,
+                attack_var=prior.attack_var,
+                defense_var=prior.defense_var
+            )
+
+        return TeamStrengthResponse.model_validate(strength)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching strength for team {team_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{team_id}/strength/history", response_model=List[TeamStrengthResponse])
+async def get_team_strength_history(
+    team_id: int,
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get a team's online rating after every finished match, oldest first.
+    """
+    try:
+        query = select(TeamStrength).where(TeamStrength.team_id == team_id)
+        if since is not None:
+            query = query.where(TeamStrength.as_of >= since)
+        if until is not None:
+            query = query.where(TeamStrength.as_of <= until)
+
+        rows = (await db.execute(query.order_by(TeamStrength.as_of.asc()))).scalars().all()
+        return [TeamStrengthResponse.model_validate(row) for row in rows]
+
+    except Exception as e:
+        logger.error(f"Error fetching strength history for team {team_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{team_id}/h2h/{opponent_id}", response_model=HeadToHeadResponse)
+async def get_head_to_head(
+    team_id: int,
+    opponent_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get a team's all-time record against an opponent.
+
+    Served from the local head-to-head index (one primary-key lookup),
+    replayed from fixture history when the index row is missing or
+    behind; teams that never met get an empty record.
+    """
+    if team_id == opponent_id:
+        raise HTTPException(status_code=400, detail="A team has no head-to-head record with itself")
+
+    try:
+        return h2h_summary(await load_head_to_head(db, team_id, opponent_id), team_id)
+
+    except Exception as e:
+        logger.error(f"Error fetching head-to-head {team_id} vs {opponent_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
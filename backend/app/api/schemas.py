@@ -115,6 +115,56 @@ class PredictionResponse(BaseModel):
     model_config = {"from_attributes": True, "populate_by_name": True}
 
 
+class IntervalEstimate(BaseModel):
+    lower: float
+    median: float
+    upper: float
+
+
+class PredictionIntervalsResponse(BaseModel):
+    fixture_id: int
+    model_version: str
+    n_draws: int = Field(..., description="Bootstrap resamples")
+    level: float = Field(..., gt=0, lt=1, description="Interval coverage")
+
+    expected_home_goals: IntervalEstimate
+    expected_away_goals: IntervalEstimate
+    prob_home_win: IntervalEstimate
+    prob_draw: IntervalEstimate
+    prob_away_win: IntervalEstimate
+
+
+class FixtureMarketsResponse(BaseModel):
+    """Full market sheet derived from the scoreline matrix"""
+    fixture_id: int
+    model_version: str
+    markets: Dict
+
+    model_config = {"protected_namespaces": ()}
+
+
+class LivePredictionResponse(BaseModel):
+    """In-play prediction, recomputed every live sync tick"""
+    fixture_id: int
+    model_version: str
+    minute: int
+    home_score: int
+    away_score: int
+
+    prob_home_win: float = Field(..., ge=0, le=1)
+    prob_draw: float = Field(..., ge=0, le=1)
+    prob_away_win: float = Field(..., ge=0, le=1)
+    prob_over_25: Optional[float] = Field(None, ge=0, le=1)
+    prob_btts_yes: Optional[float] = Field(None, ge=0, le=1)
+    expected_home_goals: Optional[float] = Field(None, ge=0, description="Expected final home goals")
+    expected_away_goals: Optional[float] = Field(None, ge=0, description="Expected final away goals")
+    most_likely_score: Optional[str] = None
+    markets: Optional[Dict] = None
+    updated_at: datetime
+
+    model_config = {"from_attributes": True, "protected_namespaces": ()}
+
+
 # ============= TEAM STATS MODELS =============
 
 class TeamStatsResponse(BaseModel):
@@ -131,6 +181,41 @@ class TeamStatsResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class TeamStrengthResponse(BaseModel):
+    """Online attack/defense rating (log scale, 0 = league average)"""
+    team_id: int
+    fixture_id: Optional[int] = None
+    as_of: Optional[datetime] = None
+    attack: float
+    defense: float = Field(..., description="Higher concedes more")
+    attack_var: float = Field(..., ge=0)
+    defense_var: float = Field(..., ge=0)
+
+    model_config = {"from_attributes": True}
+
+
+class HeadToHeadMeeting(BaseModel):
+    fixture_id: int
+    date: datetime
+    home_team_id: int
+    home_score: int
+    away_score: int
+
+
+class HeadToHeadResponse(BaseModel):
+    """All-time record of a team against one opponent (local H2H index)"""
+    team_id: int
+    opponent_id: int
+    matches: int
+    wins: int
+    draws: int
+    losses: int
+    goals_for: int
+    goals_against: int
+    last_match_date: Optional[datetime] = None
+    recent: List[HeadToHeadMeeting] = Field(default_factory=list, description="Latest meetings, most recent first")
+
+
 class InjuryResponse(BaseModel):
     player_name: str
     injury_type: str
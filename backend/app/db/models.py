@@ -5,7 +5,7 @@ All SQLAlchemy ORM models for the application
 
 from sqlalchemy import (
     Column, Integer, String, Float, DateTime, Boolean,
-    ForeignKey, Text, Date, Enum as SQLEnum, Index
+    ForeignKey, Text, Date, Enum as SQLEnum, Index, JSON
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
@@ -267,6 +267,113 @@ class Prediction(Base):
     )
 
 
+class LivePrediction(Base):
+    """Latest in-play prediction for a live fixture (overwritten every tick)"""
+    __tablename__ = "live_predictions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    fixture_id = Column(Integer, ForeignKey("fixtures.id"), nullable=False, unique=True)
+    model_version = Column(String(50), nullable=False)
+    minute = Column(Integer, nullable=False)
+    home_score = Column(Integer, nullable=False)
+    away_score = Column(Integer, nullable=False)
+    prob_home_win = Column(Float, nullable=False)
+    prob_draw = Column(Float, nullable=False)
+    prob_away_win = Column(Float, nullable=False)
+    prob_over_25 = Column(Float)
+    prob_btts_yes = Column(Float)
+    expected_home_goals = Column(Float)
+    expected_away_goals = Column(Float)
+    most_likely_score = Column(String(10))
+    markets = Column(JSON)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    fixture = relationship("Fixture")
+
+
+class TeamStrength(Base):
+    """Online attack/defense rating of a team after one finished fixture"""
+    __tablename__ = "team_strengths"
+
+    id = Column(Integer, primary_key=True, index=True)
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
+    fixture_id = Column(Integer, ForeignKey("fixtures.id"))
+    as_of = Column(DateTime(timezone=True), nullable=False)
+    attack = Column(Float, nullable=False)  # Log scale, 0 = league average
+    defense = Column(Float, nullable=False)  # Log scale, higher concedes more
+    attack_var = Column(Float, nullable=False)
+    defense_var = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_team_strength_team_as_of', 'team_id', 'as_of'),
+        Index('ix_team_strength_team_fixture', 'team_id', 'fixture_id', unique=True),
+    )
+
+
+class TeamFeatures(Base):
+    """Rolling per-team, per-season feature aggregates (see app.services.feature_store)"""
+    __tablename__ = "team_features"
+
+    id = Column(Integer, primary_key=True, index=True)
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
+    season = Column(String(20), nullable=False)
+    matches_played = Column(Integer, default=0)
+    home_played = Column(Integer, default=0)
+    home_wins = Column(Integer, default=0)
+    home_draws = Column(Integer, default=0)
+    home_losses = Column(Integer, default=0)
+    away_played = Column(Integer, default=0)
+    away_wins = Column(Integer, default=0)
+    away_draws = Column(Integer, default=0)
+    away_losses = Column(Integer, default=0)
+    goals_for = Column(Integer, default=0)
+    goals_against = Column(Integer, default=0)
+    home_goals_for = Column(Integer, default=0)
+    home_goals_against = Column(Integer, default=0)
+    away_goals_for = Column(Integer, default=0)
+    away_goals_against = Column(Integer, default=0)
+    xg_for = Column(Float, default=0.0)
+    xg_against = Column(Float, default=0.0)
+    xg_matches = Column(Integer, default=0)
+    clean_sheets = Column(Integer, default=0)
+    failed_to_score = Column(Integer, default=0)
+    win_streak = Column(Integer, default=0)
+    unbeaten_streak = Column(Integer, default=0)
+    winless_streak = Column(Integer, default=0)
+    form_points = Column(Float, default=0.0)  # Weighted points over the last 5 matches
+    last_match_date = Column(DateTime)  # Naive UTC
+    recent = Column(JSON)  # [[fixture_id, date, goals_for, goals_against], ...] most recent first
+    recent_home = Column(JSON)
+    recent_away = Column(JSON)
+    fixture_ids = Column(JSON)  # Fixtures applied this season
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_team_features_team_season', 'team_id', 'season', unique=True),
+    )
+
+
+class HeadToHead(Base):
+    """Meeting aggregates of an unordered team pair (see app.services.h2h_index)"""
+    __tablename__ = "head_to_head"
+
+    # Primary key is the pair itself, lower team id first
+    team_a_id = Column(Integer, ForeignKey("teams.id"), primary_key=True)
+    team_b_id = Column(Integer, ForeignKey("teams.id"), primary_key=True)
+    matches = Column(Integer, default=0)
+    team_a_wins = Column(Integer, default=0)
+    draws = Column(Integer, default=0)
+    team_b_wins = Column(Integer, default=0)
+    team_a_goals = Column(Integer, default=0)
+    team_b_goals = Column(Integer, default=0)
+    last_match_date = Column(DateTime)  # Naive UTC
+    recent = Column(JSON)  # [[fixture_id, date, home_team_id, home_score, away_score], ...] most recent first
+    fixture_ids = Column(JSON)  # Fixtures applied
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class FeatureSnapshot(Base):
     """Snapshot of features used for prediction (for audit trail)"""
     __tablename__ = "feature_snapshots"
@@ -314,6 +421,36 @@ class PredictionEvaluation(Base):
     prediction = relationship("Prediction", back_populates="evaluation")
 
 
+class PredictionMetrics(Base):
+    """Running sums of prediction evaluations (see app.ml.online_metrics)"""
+    __tablename__ = "prediction_metrics"
+
+    id = Column(Integer, primary_key=True, index=True)
+    model_version = Column(String(50), nullable=False)
+    scope = Column(String(20), nullable=False)  # 'overall', 'team', 'confidence'
+    scope_key = Column(String(50), nullable=False, default='')  # Team id or confidence bucket
+    period = Column(String(10), nullable=False)  # 'all' or evaluation day (YYYY-MM-DD)
+    n_evaluated = Column(Integer, nullable=False, default=0)
+    correct_1x2 = Column(Integer, nullable=False, default=0)
+    correct_over_under = Column(Integer, nullable=False, default=0)
+    correct_btts = Column(Integer, nullable=False, default=0)
+    brier_1x2 = Column(Float, nullable=False, default=0.0)
+    brier_over_under = Column(Float, nullable=False, default=0.0)
+    brier_btts = Column(Float, nullable=False, default=0.0)
+    log_loss_1x2 = Column(Float, nullable=False, default=0.0)
+    rps_1x2 = Column(Float, nullable=False, default=0.0)
+    confidence = Column(Float, nullable=False, default=0.0)  # Sum of top 1X2 probabilities
+    calibration_count = Column(JSON)
+    calibration_confidence = Column(JSON)
+    calibration_correct = Column(JSON)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_prediction_metrics_cell', 'model_version', 'scope', 'scope_key', 'period', unique=True),
+        Index('ix_prediction_metrics_scope_period', 'scope', 'period'),
+    )
+
+
 class DataSyncLog(Base):
     """Log of external data synchronization"""
     __tablename__ = "data_sync_logs"
@@ -0,0 +1,215 @@
+"""
+Model Artifact Format
+Versioned, memory-mappable on-disk format for DixonColesModel
+
+An artifact is a small JSON manifest plus a content-addressed `.npy`
+parameter block stored next to it:
+
+    dixon_coles_latest.json                       manifest (scalars, team index)
+    dixon_coles_latest.<sha256[:12]>.params.npy   (2, n_teams) float64 [attack, defense]
+
+The parameter block is memory-mapped read-only and its rows become the
+model's strength arrays without a copy, so every uvicorn and Celery worker
+on the host shares one physical copy. Parameter files are never
+rewritten in place: a save writes a new block and a staged manifest, then
+atomically replaces the live manifest, so a reader sees either the old or
+the new artifact. Training writes the companion files keyed by the new
+manifest's fingerprint (prediction table, bootstrap draws) between the two
+steps, so they are in place before any reader can load the new model.
+
+Legacy pickles (`dixon_coles_latest.pkl`) are still accepted by `load_model`.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.ml.dixon_coles import DixonColesModel
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FORMAT = "dixon-coles"
+ARTIFACT_FORMAT_VERSION = 1
+
+
+def stage_artifact(model: DixonColesModel, manifest_path: str, max_goals: Optional[int] = None) -> Path:
+    """
+    Write a fitted model's parameter block and a staged manifest next to
+    `manifest_path`, without replacing the live manifest.
+
+    The staged file has the final content, so its fingerprint is the one
+    the artifact will have once published; companion files keyed by it
+    (prediction table, bootstrap draws) can be written before readers see
+    the new model.
+
+    Args:
+        model: Model to save
+        manifest_path: Path of the JSON manifest (e.g. saved_models/dixon_coles_latest.json)
+        max_goals: Scoreline grid size the companion files were built with
+
+    Returns:
+        Path of the staged manifest (see `publish_artifact`)
+    """
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+
+    params = np.ascontiguousarray(np.stack([model.attack, model.defense]), dtype=np.float64)
+
+    params_sha = hashlib.sha256(params.tobytes()).hexdigest()
+    params_name = f"{manifest_path.stem}.{params_sha[:12]}.params.npy"
+    params_path = manifest_path.parent / params_name
+
+    if not params_path.exists():
+        tmp_path = params_path.with_name(params_name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            np.save(f, params)
+        os.replace(tmp_path, params_path)
+
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'model_version': model.version,
+        'created_at': datetime.utcnow().isoformat(),
+        'home_advantage': float(model.home_advantage),
+        'rho': float(model.rho),
+        'xi': float(model.xi),
+        'is_fitted': bool(model._is_fitted),
+        'teams': list(model.team_list),
+        'team_ids': model.team_ids_by_name(),
+        'params_file': params_name,
+        'params_sha256': params_sha,
+        'params_layout': ['attack', 'defense'],
+        'fit_stats': model.fit_stats,
+    }
+    if max_goals is not None:
+        manifest['max_goals'] = int(max_goals)
+
+    staged_manifest = manifest_path.with_name(manifest_path.name + ".tmp")
+    with open(staged_manifest, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return staged_manifest
+
+
+def publish_artifact(staged_manifest: Path, manifest_path: str):
+    """Atomically replace the live manifest with a staged one"""
+    manifest_path = Path(manifest_path)
+    with open(staged_manifest) as f:
+        params_name = json.load(f)['params_file']
+    os.replace(staged_manifest, manifest_path)
+
+    # Drop parameter blocks no longer referenced; workers that still map
+    # them keep their pages until they reload (POSIX unlink semantics)
+    for stale in manifest_path.parent.glob(f"{manifest_path.stem}.*.params.npy"):
+        if stale.name != params_name:
+            try:
+                stale.unlink()
+            except OSError as e:
+                logger.warning(f"Could not remove stale parameter block {stale}: {e}")
+
+    logger.info(f"Model artifact saved to {manifest_path}")
+
+
+def save_artifact(model: DixonColesModel, manifest_path: str, max_goals: Optional[int] = None):
+    """
+    Save a fitted model as manifest + parameter block.
+
+    Args:
+        model: Model to save
+        manifest_path: Path of the JSON manifest (e.g. saved_models/dixon_coles_latest.json)
+        max_goals: Scoreline grid size recorded in the manifest (optional)
+    """
+    publish_artifact(stage_artifact(model, manifest_path, max_goals), manifest_path)
+
+
+def read_manifest(path: str) -> Dict:
+    """Manifest of an artifact (empty for legacy pickles)"""
+    if str(path).endswith('.pkl'):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_artifact(manifest_path: str, mmap: bool = True) -> DixonColesModel:
+    """
+    Load a model from a manifest + parameter block.
+
+    Args:
+        manifest_path: Path of the JSON manifest
+        mmap: Memory-map the parameter block read-only (default True)
+
+    Returns:
+        DixonColesModel
+    """
+    manifest_path = Path(manifest_path)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    if manifest.get('format') != ARTIFACT_FORMAT:
+        raise ValueError(f"Unknown artifact format: {manifest.get('format')}")
+    if manifest.get('format_version', 0) > ARTIFACT_FORMAT_VERSION:
+        raise ValueError(
+            f"Artifact format version {manifest['format_version']} is newer than "
+            f"supported version {ARTIFACT_FORMAT_VERSION}"
+        )
+
+    params = np.load(
+        manifest_path.parent / manifest['params_file'],
+        mmap_mode='r' if mmap else None,
+        allow_pickle=False
+    )
+
+    teams = manifest['teams']
+    if params.shape != (2, len(teams)):
+        raise ValueError(
+            f"Parameter block shape {params.shape} does not match {len(teams)} teams"
+        )
+
+    model = DixonColesModel(
+        home_advantage=manifest['home_advantage'],
+        rho=manifest['rho'],
+        xi=manifest['xi']
+    )
+    # Rows of the mapped block back the model arrays directly (no copy)
+    model.set_params(teams, params[0], params[1], team_ids=manifest.get('team_ids'))
+    model.version = manifest.get('model_version')
+    model.fit_stats = manifest.get('fit_stats', {})
+    model._is_fitted = manifest['is_fitted']
+
+    logger.info(f"Model artifact loaded from {manifest_path}")
+
+    return model
+
+
+def load_model(path: str) -> DixonColesModel:
+    """Load a model from either a JSON manifest or a legacy pickle"""
+    if str(path).endswith('.pkl'):
+        return DixonColesModel.load(path)
+    return load_artifact(path)
+
+
+def convert_legacy_pickle(pickle_path: str, manifest_path: str, model_version: str = None):
+    """Convert a legacy pickled model into the manifest + parameter block format"""
+    model = DixonColesModel.load(pickle_path)
+    if model_version and not model.version:
+        model.version = model_version
+    save_artifact(model, manifest_path)
+    return model
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+
+    from app.ml.train import LEGACY_MODEL_PATH, MODEL_PATH, MODEL_VERSION
+
+    source = sys.argv[1] if len(sys.argv) > 1 else LEGACY_MODEL_PATH
+    target = sys.argv[2] if len(sys.argv) > 2 else MODEL_PATH
+    convert_legacy_pickle(source, target, model_version=MODEL_VERSION)
+    print(f"Converted {source} -> {target}")
@@ -0,0 +1,247 @@
+"""
+Bootstrap Uncertainty
+Parameter draws from refits on resampled training matches
+
+Each resample reweights the training matches with multinomial counts
+(equivalent to sampling matches with replacement) and is warm-started
+from the point-estimate model, so a refit takes a handful of iterations.
+Resamples are fitted across a process pool and stored as one compact
+float32 array next to the model artifact. Interval prediction is a single
+vectorized pass over all draws; nothing is refitted at request time.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.ml.dixon_coles import DixonColesModel, market_masks, poisson_pmf_matrix
+
+logger = logging.getLogger(__name__)
+
+INTERVAL_FIELDS = ('expected_home_goals', 'expected_away_goals', 'prob_home_win', 'prob_draw', 'prob_away_win')
+
+
+def _fit_resamples(args: Tuple) -> np.ndarray:
+    """
+    Fit a chunk of bootstrap resamples (module-level so it can run in a
+    worker process).
+
+    Returns:
+        (n_resamples, 2 * n_teams + 2) float32 parameter draws
+    """
+    base_model, data, n_resamples, seed, use_xg, xg_loss = args
+
+    rng = np.random.default_rng(seed)
+    n_teams = data.n_teams
+    draws = np.empty((n_resamples, 2 * n_teams + 2), dtype=np.float32)
+
+    for b in range(n_resamples):
+        counts = rng.multinomial(data.n_matches, np.full(data.n_matches, 1.0 / data.n_matches))
+        resample = replace(data, weights=data.weights * counts)
+
+        model = DixonColesModel(
+            xi=base_model.xi,
+            rho_bounds=base_model.rho_bounds,
+            parameterization=base_model.parameterization
+        )
+        if use_xg:
+            model.fit_xg_arrays(resample, loss=xg_loss, warm_start=base_model)
+        else:
+            model.fit_arrays(resample, warm_start=base_model)
+
+        draws[b, :n_teams] = model.attack
+        draws[b, n_teams:2 * n_teams] = model.defense
+        draws[b, -2] = model.home_advantage
+        draws[b, -1] = model.rho
+
+    return draws
+
+
+class BootstrapDraws:
+    """
+    Bootstrap parameter draws for a fitted model.
+
+    `params` has one row per resample, laid out as
+    [attack (n_teams), defense (n_teams), home_advantage, rho].
+    """
+
+    def __init__(
+        self,
+        team_list: List[str],
+        params: np.ndarray,
+        model_version: Optional[str] = None,
+        model_fingerprint: Optional[str] = None
+    ):
+        self.team_list = list(team_list)
+        self.team_to_idx = {team: i for i, team in enumerate(self.team_list)}
+        self.params = params
+        self.model_version = model_version
+        self.model_fingerprint = model_fingerprint
+
+    @property
+    def n_draws(self) -> int:
+        return self.params.shape[0]
+
+    @classmethod
+    def fit(
+        cls,
+        model: DixonColesModel,
+        matches: List[Dict],
+        n_resamples: int = 200,
+        use_xg: bool = False,
+        xg_loss: str = 'mse',
+        n_workers: Optional[int] = None,
+        seed: Optional[int] = None
+    ) -> 'BootstrapDraws':
+        """
+        Fit bootstrap resamples around a fitted model.
+
+        Args:
+            model: Point-estimate model (used as warm start)
+            matches: The matches the model was fitted on
+            n_resamples: Number of bootstrap resamples (B)
+            use_xg: Fit on xG instead of goals (as the model was)
+            xg_loss: Objective used when fitting on xG
+            n_workers: Worker processes (default: CPU count)
+            seed: Random seed for reproducible draws
+
+        Returns:
+            BootstrapDraws aligned with `model.team_list`
+        """
+        start = time.perf_counter()
+        data = model.build_match_arrays(matches)
+
+        n_workers = max(1, min(n_workers or os.cpu_count() or 1, n_resamples))
+        chunk_sizes = [len(c) for c in np.array_split(np.arange(n_resamples), n_workers)]
+        seeds = np.random.SeedSequence(seed).spawn(n_workers)
+        jobs = [
+            (model, data, size, chunk_seed, use_xg, xg_loss)
+            for size, chunk_seed in zip(chunk_sizes, seeds) if size
+        ]
+
+        if len(jobs) == 1:
+            chunks = [_fit_resamples(jobs[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                chunks = list(executor.map(_fit_resamples, jobs))
+
+        draws = cls(data.team_list, np.concatenate(chunks), model_version=model.version)
+
+        logger.info(
+            f"Fitted {draws.n_draws} bootstrap resamples in {time.perf_counter() - start:.1f}s "
+            f"({n_workers} workers)"
+        )
+        return draws
+
+    def save(self, filepath: str):
+        """Save draws to disk as a .npz archive"""
+        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+
+        # Write then rename, so readers never see a partially written file
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                team_list=np.array(self.team_list),
+                params=self.params,
+                model_version=np.array(self.model_version or ''),
+                model_fingerprint=np.array(self.model_fingerprint or '')
+            )
+        os.replace(tmp_path, filepath)
+
+        logger.info(f"Bootstrap draws saved to {filepath}")
+
+    @classmethod
+    def load(cls, filepath: str) -> 'BootstrapDraws':
+        """Load draws from disk"""
+        with np.load(filepath, allow_pickle=False) as data:
+            return cls(
+                team_list=[str(team) for team in data['team_list']],
+                params=data['params'],
+                model_version=str(data['model_version']) or None,
+                model_fingerprint=str(data['model_fingerprint']) or None
+            )
+
+    def predict_intervals(
+        self,
+        home_teams: Sequence[str],
+        away_teams: Sequence[str],
+        level: float = 0.9,
+        home_form_factors: Optional[Sequence[float]] = None,
+        away_form_factors: Optional[Sequence[float]] = None,
+        max_goals: int = 10
+    ) -> Dict[str, np.ndarray]:
+        """
+        Percentile intervals for expected goals and 1X2 probabilities.
+
+        Args:
+            home_teams: Home team names
+            away_teams: Away team names
+            level: Central interval coverage (default 0.9 -> 5th/95th percentiles)
+            home_form_factors: Optional multipliers applied to every draw's lambda
+            away_form_factors: Optional multipliers applied to every draw's mu
+            max_goals: Maximum goals in the scoreline grid
+
+        Returns:
+            Dict mapping each of INTERVAL_FIELDS to an (N, 3) array of
+            [lower, median, upper]
+        """
+        unknown = sorted({t for t in list(home_teams) + list(away_teams) if t not in self.team_to_idx})
+        if unknown:
+            raise ValueError(f"Teams not found in bootstrap draws: {', '.join(unknown)}")
+
+        n_teams = len(self.team_list)
+        home_idx = np.array([self.team_to_idx[t] for t in home_teams], dtype=np.intp)
+        away_idx = np.array([self.team_to_idx[t] for t in away_teams], dtype=np.intp)
+
+        params = self.params.astype(np.float64)
+        attack = params[:, :n_teams]
+        defense = params[:, n_teams:2 * n_teams]
+        home_adv = params[:, -2:-1]
+        rho = params[:, -1:]
+
+        # (B, N), same convention as DixonColesModel.predict_matches
+        lambdas = attack[:, home_idx] * defense[:, away_idx] * home_adv
+        mus = attack[:, away_idx] * defense[:, home_idx] / home_adv
+        if home_form_factors is not None:
+            lambdas = lambdas * np.asarray(home_form_factors, dtype=float)
+        if away_form_factors is not None:
+            mus = mus * np.asarray(away_form_factors, dtype=float)
+
+        shape = lambdas.shape
+        flat_lambdas = lambdas.ravel()
+        flat_mus = mus.ravel()
+        flat_rho = np.broadcast_to(rho, shape).ravel()
+
+        probs = (
+            poisson_pmf_matrix(flat_lambdas, max_goals)[:, :, None] *
+            poisson_pmf_matrix(flat_mus, max_goals)[:, None, :]
+        )
+        probs[:, 0, 0] *= 1 - flat_lambdas * flat_mus * flat_rho
+        if max_goals >= 1:
+            probs[:, 0, 1] *= 1 + flat_lambdas * flat_rho
+            probs[:, 1, 0] *= 1 + flat_mus * flat_rho
+            probs[:, 1, 1] *= 1 - flat_rho
+        probs /= probs.sum(axis=(1, 2), keepdims=True)
+
+        outcomes = probs.reshape(len(flat_lambdas), -1) @ market_masks(max_goals)[:3].T
+
+        values = {
+            'expected_home_goals': lambdas,
+            'expected_away_goals': mus,
+            'prob_home_win': outcomes[:, 0].reshape(shape),
+            'prob_draw': outcomes[:, 1].reshape(shape),
+            'prob_away_win': outcomes[:, 2].reshape(shape),
+        }
+
+        tail = (1.0 - level) / 2 * 100
+        return {
+            name: np.percentile(value, [tail, 50.0, 100.0 - tail], axis=0).T
+            for name, value in values.items()
+        }
@@ -10,15 +10,485 @@ This is an open-source implementation using numpy and scipy.
 
 import numpy as np
 from scipy.optimize import minimize
-from scipy.stats import poisson
-from typing import Tuple, Dict, List
+from scipy.special import gammaln, xlogy
+from typing import Tuple, Dict, List, Optional, Sequence, Union
+from collections.abc import MutableMapping
+from dataclasses import dataclass, field
+from functools import lru_cache
 import logging
+import os
 import pickle
+import sys
+import time
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class MatchArrays:
+    """
+    Array form of a list of match dictionaries.
+
+    Teams are mapped to integer indices into `team_list` once, so the
+    likelihood can be evaluated with NumPy instead of a Python loop.
+    """
+    team_list: List[str]
+    home_idx: np.ndarray
+    away_idx: np.ndarray
+    home_goals: np.ndarray
+    away_goals: np.ndarray
+    weights: np.ndarray
+    home_xg: np.ndarray = None
+    away_xg: np.ndarray = None
+    # External team ids by name, when the matches carry them
+    team_ids: Dict[str, int] = field(default_factory=dict)
+
+    # Masks for the low-score cells corrected by tau
+    mask_00: np.ndarray = field(init=False, repr=False)
+    mask_01: np.ndarray = field(init=False, repr=False)
+    mask_10: np.ndarray = field(init=False, repr=False)
+    mask_11: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        x, y = self.home_goals, self.away_goals
+        self.mask_00 = (x == 0) & (y == 0)
+        self.mask_01 = (x == 0) & (y == 1)
+        self.mask_10 = (x == 1) & (y == 0)
+        self.mask_11 = (x == 1) & (y == 1)
+
+    @property
+    def n_teams(self) -> int:
+        return len(self.team_list)
+
+    @property
+    def n_matches(self) -> int:
+        return len(self.home_idx)
+
+
+def dixon_coles_nll(params: np.ndarray, data: MatchArrays) -> Tuple[float, np.ndarray]:
+    """
+    Weighted negative log-likelihood of the Dixon-Coles model and its gradient.
+
+    Parameter layout: [attack (n), defense (n), home_advantage, rho].
+
+    Args:
+        params: Flat parameter vector
+        data: Match arrays built by DixonColesModel.build_match_arrays
+
+    Returns:
+        (negative log-likelihood, gradient with respect to params)
+    """
+    n_teams = data.n_teams
+    attack = params[:n_teams]
+    defense = params[n_teams:2 * n_teams]
+    home_adv = params[-2]
+    rho = params[-1]
+
+    i, j = data.home_idx, data.away_idx
+    x, y = data.home_goals, data.away_goals
+    w = data.weights
+
+    # Expected goals
+    lambda_ = attack[i] * defense[j] * home_adv
+    mu = attack[j] * defense[i]
+
+    # Dixon-Coles correction, only non-trivial on the four low-score cells
+    tau = np.ones_like(lambda_)
+    tau[data.mask_00] = 1 - lambda_[data.mask_00] * mu[data.mask_00] * rho
+    tau[data.mask_01] = 1 + lambda_[data.mask_01] * rho
+    tau[data.mask_10] = 1 + mu[data.mask_10] * rho
+    tau[data.mask_11] = 1 - rho
+
+    valid = tau > 0
+    log_tau = np.log(np.where(valid, tau, 1.0))
+
+    log_prob = (
+        xlogy(x, lambda_) - lambda_ - gammaln(x + 1) +
+        xlogy(y, mu) - mu - gammaln(y + 1) +
+        log_tau
+    )
+    # Matches with a non-positive tau get the same flat penalty as before
+    log_likelihood = np.sum(w[valid] * log_prob[valid]) - 1e6 * np.count_nonzero(~valid)
+
+    # Derivatives of log(tau) with respect to lambda, mu and rho
+    inv_tau = np.where(valid, 1.0 / np.where(valid, tau, 1.0), 0.0)
+    dtau_dlambda = np.zeros_like(lambda_)
+    dtau_dmu = np.zeros_like(lambda_)
+    dtau_drho = np.zeros_like(lambda_)
+
+    dtau_dlambda[data.mask_00] = -mu[data.mask_00] * rho
+    dtau_dmu[data.mask_00] = -lambda_[data.mask_00] * rho
+    dtau_drho[data.mask_00] = -lambda_[data.mask_00] * mu[data.mask_00]
+    dtau_dlambda[data.mask_01] = rho
+    dtau_drho[data.mask_01] = lambda_[data.mask_01]
+    dtau_dmu[data.mask_10] = rho
+    dtau_drho[data.mask_10] = mu[data.mask_10]
+    dtau_drho[data.mask_11] = -1.0
+
+    w_valid = np.where(valid, w, 0.0)
+
+    # Gradient with respect to log(lambda) and log(mu), weighted per match
+    g_lambda = w_valid * (x - lambda_ + lambda_ * dtau_dlambda * inv_tau)
+    g_mu = w_valid * (y - mu + mu * dtau_dmu * inv_tau)
+
+    grad_attack = (
+        np.bincount(i, weights=g_lambda, minlength=n_teams) +
+        np.bincount(j, weights=g_mu, minlength=n_teams)
+    ) / attack
+    grad_defense = (
+        np.bincount(j, weights=g_lambda, minlength=n_teams) +
+        np.bincount(i, weights=g_mu, minlength=n_teams)
+    ) / defense
+    grad_home_adv = g_lambda.sum() / home_adv
+    grad_rho = np.sum(w_valid * dtau_drho * inv_tau)
+
+    grad = np.concatenate([grad_attack, grad_defense, [grad_home_adv, grad_rho]])
+
+    return -log_likelihood, -grad
+
+
+XG_LOSSES = ('mse', 'poisson')
+
+
+def xg_loss(
+    params: np.ndarray,
+    data: MatchArrays,
+    loss: str = 'mse'
+) -> Tuple[float, np.ndarray]:
+    """
+    Weighted xG fitting loss and its gradient.
+
+    Parameter layout: [attack (n), defense (n), home_advantage].
+
+    Args:
+        params: Flat parameter vector
+        data: Match arrays with home_xg/away_xg targets
+        loss: 'mse' (squared error) or 'poisson' (Poisson deviance)
+
+    Returns:
+        (loss, gradient with respect to params)
+    """
+    n_teams = data.n_teams
+    attack = params[:n_teams]
+    defense = params[n_teams:2 * n_teams]
+    home_adv = params[-1]  # No rho for xG fitting
+
+    i, j = data.home_idx, data.away_idx
+    w = data.weights
+
+    # Predicted xG (no home advantage for away)
+    pred_home = attack[i] * defense[j] * home_adv
+    pred_away = attack[j] * defense[i]
+
+    if loss == 'mse':
+        res_home = pred_home - data.home_xg
+        res_away = pred_away - data.away_xg
+        value = np.sum(w * (res_home ** 2 + res_away ** 2))
+
+        # Gradient with respect to log(pred)
+        g_home = 2 * w * res_home * pred_home
+        g_away = 2 * w * res_away * pred_away
+    elif loss == 'poisson':
+        value = 2 * np.sum(w * (
+            xlogy(data.home_xg, data.home_xg / pred_home) - (data.home_xg - pred_home) +
+            xlogy(data.away_xg, data.away_xg / pred_away) - (data.away_xg - pred_away)
+        ))
+
+        g_home = 2 * w * (pred_home - data.home_xg)
+        g_away = 2 * w * (pred_away - data.away_xg)
+    else:
+        raise ValueError(f"Unknown xG loss '{loss}', expected one of {XG_LOSSES}")
+
+    grad_attack = (
+        np.bincount(i, weights=g_home, minlength=n_teams) +
+        np.bincount(j, weights=g_away, minlength=n_teams)
+    ) / attack
+    grad_defense = (
+        np.bincount(j, weights=g_home, minlength=n_teams) +
+        np.bincount(i, weights=g_away, minlength=n_teams)
+    ) / defense
+    grad_home_adv = g_home.sum() / home_adv
+
+    # Constraint: Avg Attack = 1.0 (to fix scale), added as a penalty
+    attack_gap = np.mean(attack) - 1.0
+    defense_gap = np.mean(defense) - 1.0
+    value += 1000 * (attack_gap ** 2 + defense_gap ** 2)
+    grad_attack += 2000 * attack_gap / n_teams
+    grad_defense += 2000 * defense_gap / n_teams
+
+    return value, np.concatenate([grad_attack, grad_defense, [grad_home_adv]])
+
+
+PARAMETERIZATIONS = ('bounded', 'log')
+
+
+@lru_cache(maxsize=None)
+def sum_to_zero_basis(n_teams: int) -> np.ndarray:
+    """
+    Orthonormal basis (n_teams, n_teams - 1) of the vectors summing to zero.
+
+    Strengths are written as `basis @ free`, so each block satisfies the
+    constraint exactly. An orthonormal basis (rather than pinning the last
+    team to minus the sum of the others) keeps the free coordinates as
+    well-conditioned as the centred strengths themselves.
+    """
+    centring = np.eye(n_teams) - 1.0 / n_teams
+    basis, _ = np.linalg.qr(centring[:, :n_teams - 1])
+    basis.setflags(write=False)
+    return basis
+
+
+def expand_log_params(theta: np.ndarray, n_teams: int) -> np.ndarray:
+    """
+    Map the identifiable log parameterization to the natural layout.
+
+    Free layout: [attack (n-1), defense (n-1), intercept, log home_advantage, *rest].
+    Log attack and log defense are each `sum_to_zero_basis(n) @ free`, so
+    every block sums to zero exactly; the intercept is split evenly between
+    the two blocks so fitted strengths stay centred on 1.0.
+
+    Returns:
+        Natural layout [attack (n), defense (n), home_advantage, *rest]
+    """
+    m = n_teams - 1
+    basis = sum_to_zero_basis(n_teams)
+    half_intercept = theta[2 * m] / 2
+
+    return np.concatenate([
+        np.exp(basis @ theta[:m] + half_intercept),
+        np.exp(basis @ theta[m:2 * m] + half_intercept),
+        np.exp(theta[2 * m + 1:2 * m + 2]),
+        theta[2 * m + 2:]
+    ])
+
+
+def compress_log_params(params: np.ndarray, n_teams: int) -> np.ndarray:
+    """Inverse of `expand_log_params` (natural layout -> free layout)"""
+    basis = sum_to_zero_basis(n_teams)
+    log_attack = np.log(params[:n_teams])
+    log_defense = np.log(params[n_teams:2 * n_teams])
+
+    return np.concatenate([
+        basis.T @ log_attack,
+        basis.T @ log_defense,
+        [log_attack.mean() + log_defense.mean(), np.log(params[2 * n_teams])],
+        params[2 * n_teams + 1:]
+    ])
+
+
+def contract_log_gradient(params: np.ndarray, grad: np.ndarray, n_teams: int) -> np.ndarray:
+    """
+    Chain rule from a gradient in the natural layout to the free layout.
+
+    Args:
+        params: Natural parameters returned by `expand_log_params`
+        grad: Gradient with respect to `params`
+        n_teams: Number of teams
+    """
+    basis = sum_to_zero_basis(n_teams)
+
+    # Gradients with respect to log(attack) and log(defense)
+    g_attack = grad[:n_teams] * params[:n_teams]
+    g_defense = grad[n_teams:2 * n_teams] * params[n_teams:2 * n_teams]
+
+    return np.concatenate([
+        basis.T @ g_attack,
+        basis.T @ g_defense,
+        [(g_attack.sum() + g_defense.sum()) / 2, grad[2 * n_teams] * params[2 * n_teams]],
+        grad[2 * n_teams + 1:]
+    ])
+
+
+def log_space_scale(data: MatchArrays, with_rho: bool = False) -> np.ndarray:
+    """
+    Diagonal preconditioner for the free log parameters.
+
+    Each coordinate is scaled by the square root of its approximate
+    curvature: the weighted goals that a log-rate
+    shift touches, averaged per team for the strength blocks. L-BFGS
+    starts from an identity Hessian, so putting all coordinates on one
+    scale saves the iterations otherwise spent learning it.
+
+    Args:
+        data: Match arrays being fitted
+        with_rho: Append a scale for rho (the weighted count of the
+            low-score matches its correction applies to)
+
+    Returns:
+        (2 * (n_teams - 1) + 2 [+ 1],) scale factors
+    """
+    curvature_home = max(float(np.sum(data.weights * data.home_goals)), 1e-6)
+    curvature = curvature_home + max(float(np.sum(data.weights * data.away_goals)), 1e-6)
+    m = data.n_teams - 1
+
+    scale = [
+        np.full(2 * m, np.sqrt(curvature / data.n_teams)),
+        [np.sqrt(curvature), np.sqrt(curvature_home)]
+    ]
+    if with_rho:
+        low_scores = data.mask_00 | data.mask_01 | data.mask_10 | data.mask_11
+        scale.append([np.sqrt(max(float(np.sum(data.weights[low_scores])), 1e-6))])
+
+    return np.concatenate(scale)
+
+
+def log_space_objective(objective, n_teams: int, scale: np.ndarray):
+    """
+    Wrap a natural-layout objective returning (value, gradient) so it can
+    be minimized over the scaled free log parameters `z = theta * scale`.
+    """
+    def wrapped(z):
+        theta = z / scale
+        with np.errstate(over='ignore', invalid='ignore'):
+            params = expand_log_params(theta, n_teams)
+            value, grad = objective(params)
+        if not np.isfinite(value) or not np.all(np.isfinite(grad)):
+            return 1e10, np.zeros_like(z)  # Overflowing step, let the line search back off
+        return value, contract_log_gradient(params, grad, n_teams) / scale
+
+    return wrapped
+
+
+def poisson_pmf_vector(rate: float, max_goals: int) -> np.ndarray:
+    """
+    Poisson pmf for 0..max_goals goals, built by the recurrence
+    p(k) = p(k-1) * rate / k instead of per-cell pmf calls.
+    """
+    ratios = np.empty(max_goals + 1)
+    ratios[0] = np.exp(-rate)
+    ratios[1:] = rate / np.arange(1, max_goals + 1)
+    return np.cumprod(ratios)
+
+
+# Rows of the market mask matrix returned by market_masks
+MARKET_NAMES = ('home_win', 'draw', 'away_win', 'over_25', 'btts_yes')
+
+
+@lru_cache(maxsize=None)
+def market_masks(max_goals: int) -> np.ndarray:
+    """
+    Market indicator masks over a flattened (max_goals+1)^2 scoreline grid.
+
+    Returns:
+        (len(MARKET_NAMES), (max_goals+1)**2) read-only float array, so that
+        `market_masks(g) @ prob_matrix.ravel()` yields every market at once
+    """
+    home, away = np.indices((max_goals + 1, max_goals + 1))
+    masks = np.stack([
+        home > away,                   # home_win
+        home == away,                  # draw
+        home < away,                   # away_win
+        home + away > 2.5,             # over_25
+        (home > 0) & (away > 0),       # btts_yes
+    ]).reshape(len(MARKET_NAMES), -1).astype(float)
+    masks.setflags(write=False)
+    return masks
+
+
+def poisson_pmf_matrix(rates: np.ndarray, max_goals: int) -> np.ndarray:
+    """Batched `poisson_pmf_vector`: one row of 0..max_goals pmf per rate"""
+    rates = np.asarray(rates, dtype=float)
+    ratios = np.empty((len(rates), max_goals + 1))
+    ratios[:, 0] = np.exp(-rates)
+    ratios[:, 1:] = rates[:, None] / np.arange(1, max_goals + 1)
+    return np.cumprod(ratios, axis=1)
+
+
+# Tail mass left outside an adaptive scoreline grid, and its hard size limit
+DEFAULT_TAIL_EPSILON = 1e-6
+MAX_GOALS_CAP = 30
+
+
+def adaptive_max_goals(
+    rates: np.ndarray,
+    epsilon: float = DEFAULT_TAIL_EPSILON,
+    min_goals: int = 1,
+    cap: int = MAX_GOALS_CAP
+) -> np.ndarray:
+    """
+    Smallest per-rate goal cap k with P(X > k) <= epsilon / 2.
+
+    Applied to both teams, the mass outside the (k+1) x (k+1) grid is at
+    most P(X > k) + P(Y > k) <= epsilon.
+
+    Returns:
+        Integer array of caps in [min_goals, cap]
+    """
+    rates = np.atleast_1d(np.asarray(rates, dtype=float))
+    return _caps_from_pmf(poisson_pmf_matrix(rates, cap), epsilon, min_goals)
+
+
+def _caps_from_pmf(pmf: np.ndarray, epsilon: float, min_goals: int = 1) -> np.ndarray:
+    """`adaptive_max_goals` on precomputed (N, cap+1) pmf rows"""
+    within = pmf.cumsum(axis=1) >= 1.0 - epsilon / 2
+    caps = np.where(within.any(axis=1), within.argmax(axis=1), pmf.shape[1] - 1)
+    return np.maximum(caps, min_goals)
+
+
+def truncated_mass(lambdas: np.ndarray, mus: np.ndarray, max_goals: int) -> np.ndarray:
+    """
+    Exact probability mass outside a (max_goals+1)^2 grid: 1 - F(lambda) * F(mu).
+
+    The tau correction moves mass only within the 2x2 low-score block and
+    preserves its total, so it does not change this quantity.
+    """
+    lambdas = np.atleast_1d(np.asarray(lambdas, dtype=float))
+    mus = np.atleast_1d(np.asarray(mus, dtype=float))
+    inside = (
+        poisson_pmf_matrix(lambdas, max_goals).sum(axis=1) *
+        poisson_pmf_matrix(mus, max_goals).sum(axis=1)
+    )
+    return np.maximum(1.0 - inside, 0.0)
+
+
+class TeamParams(MutableMapping):
+    """
+    Dict-style view (team name -> value) over one of a model's parameter
+    arrays. Reads and writes go straight to the array, so code written
+    against the old `attack_params`/`defense_params` dicts keeps working;
+    a write to a read-only (memory-mapped) array first swaps in a copy.
+    """
+
+    __slots__ = ('_model', '_attr')
+
+    def __init__(self, model: 'DixonColesModel', attr: str):
+        self._model = model
+        self._attr = attr
+
+    def __getitem__(self, team: str) -> float:
+        return float(getattr(self._model, self._attr)[self._model.team_to_idx[team]])
+
+    def __setitem__(self, team: str, value: float):
+        if team not in self._model.team_to_idx:
+            self._model.team_list = self._model.team_list + [team]
+        values = getattr(self._model, self._attr)
+        if not values.flags.writeable:
+            # Copy on write: loaded artifacts back the arrays with a
+            # read-only memory map shared by every worker
+            values = values.copy()
+            setattr(self._model, self._attr, values)
+        values[self._model.team_to_idx[team]] = value
+
+    def __delitem__(self, team: str):
+        raise TypeError("Teams cannot be removed from a parameter view; reassign team_list instead")
+
+    def __contains__(self, team) -> bool:
+        return team in self._model.team_to_idx
+
+    def __iter__(self):
+        return iter(self._model.team_list)
+
+    def __len__(self) -> int:
+        return len(self._model.team_list)
+
+    def __repr__(self) -> str:
+        return f"TeamParams({dict(self)!r})"
+
+
+TeamKey = Union[str, int]
+
+
 class DixonColesModel:
     """
     Dixon-Coles model for football predictions.
@@ -28,13 +498,22 @@ class DixonColesModel:
     - Attack and defense strengths for each team
     - Dependency correction for low scores (0-0, 1-0, 0-1, 1-1)
     - Optional time decay for weighting recent matches
+
+    Team strengths are stored in two contiguous float64 arrays (`attack`,
+    `defense`) indexed through a single `team_to_idx` map, so batches are
+    scored with one fancy-indexing gather and a memory-mapped artifact can
+    back the arrays directly. Teams can be addressed by name or, when the
+    training matches carried them, by database team id (`team_ids`).
+    `attack_params`/`defense_params` remain available as dict-style views.
     """
 
     def __init__(
         self,
         home_advantage: float = 1.3,
         rho: float = 0.03,
-        xi: float = 0.0018
+        xi: float = 0.0018,
+        rho_bounds: Tuple[float, float] = (-0.5, 0.5),
+        parameterization: str = 'bounded'
     ):
         """
         Initialize Dixon-Coles model.
@@ -43,17 +522,163 @@ class DixonColesModel:
             home_advantage: Home advantage multiplier (default 1.3 for Serie A)
             rho: Dependency parameter for low scores (default 0.03)
             xi: Time decay parameter (default 0.0018)
+            rho_bounds: Optimizer bounds for rho (default (-0.5, 0.5))
+            parameterization: 'bounded' optimizes raw strengths inside box
+                bounds; 'log' optimizes log-strengths with an exact
+                sum-to-zero constraint per block (n-1 free parameters each).
+                Only the goals fit uses it: the xG fit always runs bounded,
+                since its mean-1 penalty also pins the scoring level
         """
+        if parameterization not in PARAMETERIZATIONS:
+            raise ValueError(
+                f"Unknown parameterization '{parameterization}', expected one of {PARAMETERIZATIONS}"
+            )
+
         self.home_advantage = home_advantage
         self.rho = rho
         self.xi = xi
+        self.rho_bounds = tuple(rho_bounds)
+        self.parameterization = parameterization
+
+        self._team_list: List[str] = []
+        self.team_to_idx: Dict[str, int] = {}
+        self.team_ids: Dict[int, int] = {}
+        self.attack = np.empty(0)
+        self.defense = np.empty(0)
 
-        self.attack_params: Dict[str, float] = {}
-        self.defense_params: Dict[str, float] = {}
-        self.team_list: List[str] = []
+        # Version string recorded in saved artifacts (set by the training pipeline)
+        self.version: Optional[str] = None
+
+        # Optimizer statistics of the last fit (iterations, wall time, ...)
+        self.fit_stats: Dict = {}
 
         self._is_fitted = False
 
+    @property
+    def team_list(self) -> List[str]:
+        return self._team_list
+
+    @team_list.setter
+    def team_list(self, teams: Sequence[str]):
+        # Realign the arrays by name; new teams start at 1.0
+        attack, defense = self._realign(teams, fill=1.0)
+        self.set_params(teams, attack, defense)
+
+    @property
+    def attack_params(self) -> TeamParams:
+        return TeamParams(self, 'attack')
+
+    @attack_params.setter
+    def attack_params(self, values: Dict[str, float]):
+        self._assign_params('attack', values)
+
+    @property
+    def defense_params(self) -> TeamParams:
+        return TeamParams(self, 'defense')
+
+    @defense_params.setter
+    def defense_params(self, values: Dict[str, float]):
+        self._assign_params('defense', values)
+
+    def set_params(
+        self,
+        team_list: Sequence[str],
+        attack: np.ndarray,
+        defense: np.ndarray,
+        team_ids: Optional[Dict[str, int]] = None
+    ):
+        """
+        Replace the team index and strength arrays.
+
+        float64 arrays (including read-only memory maps) are used as given,
+        without copying.
+
+        Args:
+            team_list: Team names, in array order
+            attack: (n_teams,) attack strengths
+            defense: (n_teams,) defense strengths
+            team_ids: Optional team name -> database id mapping
+        """
+        attack = np.asarray(attack, dtype=np.float64)
+        defense = np.asarray(defense, dtype=np.float64)
+        if attack.shape != (len(team_list),) or defense.shape != (len(team_list),):
+            raise ValueError(
+                f"Parameter shapes {attack.shape}/{defense.shape} do not match {len(team_list)} teams"
+            )
+
+        # Interned names: the index lookups in hot paths compare by identity first
+        self._team_list = [sys.intern(str(team)) for team in team_list]
+        self.team_to_idx = {team: i for i, team in enumerate(self._team_list)}
+        self.attack = attack
+        self.defense = defense
+
+        if team_ids is not None:
+            self.set_team_ids(team_ids)
+        else:
+            self.team_ids = {}
+
+    def set_team_ids(self, team_ids: Dict[str, int]):
+        """Register database team ids (name -> id) for id-based lookups"""
+        self.team_ids = {
+            int(team_id): self.team_to_idx[team]
+            for team, team_id in team_ids.items()
+            if team_id is not None and team in self.team_to_idx
+        }
+
+    def team_ids_by_name(self) -> Dict[str, int]:
+        """Registered database team ids keyed by team name"""
+        return {self._team_list[idx]: team_id for team_id, idx in self.team_ids.items()}
+
+    def team_index(self, teams: Sequence[TeamKey]) -> np.ndarray:
+        """
+        Array indices of teams given by name or by database id.
+
+        Raises:
+            ValueError: If any team is not in the fitted model
+        """
+        idx = np.fromiter(
+            (
+                self.team_to_idx.get(team, -1) if isinstance(team, str)
+                else self.team_ids.get(int(team), -1)
+                for team in teams
+            ),
+            dtype=np.intp,
+            count=len(teams)
+        )
+
+        if (idx < 0).any():
+            missing = sorted({str(team) for team, i in zip(teams, idx) if i < 0})
+            raise ValueError(f"Teams not found in fitted model: {', '.join(missing)}")
+
+        return idx
+
+    def gather(self, teams: Sequence[TeamKey]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Attack and defense strengths of a batch of teams (names or ids).
+
+        Returns:
+            (attack, defense) arrays aligned with `teams`
+        """
+        idx = self.team_index(teams)
+        return self.attack[idx], self.defense[idx]
+
+    def _realign(self, teams: Sequence[str], fill: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Current strengths reordered to `teams`, `fill` for unknown teams"""
+        idx = np.array([self.team_to_idx.get(team, -1) for team in teams], dtype=np.intp)
+        known = idx >= 0
+        attack = np.full(len(teams), fill, dtype=np.float64)
+        defense = np.full(len(teams), fill, dtype=np.float64)
+        attack[known] = self.attack[idx[known]]
+        defense[known] = self.defense[idx[known]]
+        return attack, defense
+
+    def _assign_params(self, attr: str, values: Dict[str, float]):
+        """Set one strength array from a name -> value mapping"""
+        values = dict(values)
+        if set(values) != set(self.team_to_idx):
+            self.team_list = list(values)
+        setattr(self, attr, np.array([values[team] for team in self._team_list], dtype=np.float64))
+
     def tau(self, x: int, y: int, lambda_: float, mu: float) -> float:
         """
         Dependency function τ(x,y) for low score correction.
@@ -86,51 +711,216 @@ class DixonColesModel:
         self,
         lambda_: float,
         mu: float,
-        max_goals: int = 10
-    ) -> np.ndarray:
+        max_goals: Optional[int] = 10,
+        epsilon: float = DEFAULT_TAIL_EPSILON,
+        return_truncated: bool = False
+    ):
         """
         Calculate probability matrix for all scorelines.
 
         Args:
             lambda_: Expected home goals
             mu: Expected away goals
-            max_goals: Maximum goals to calculate (default 10)
+            max_goals: Maximum goals to calculate (default 10); None picks
+                the smallest grid holding all but `epsilon` of the mass
+            epsilon: Tail mass allowed outside an adaptive grid
+            return_truncated: Also return the probability mass outside the
+                grid (before renormalization)
 
         Returns:
-            (max_goals+1, max_goals+1) array of probabilities
+            (max_goals+1, max_goals+1) array of probabilities, or
+            (array, truncated_mass) if return_truncated
         """
-        prob_matrix = np.zeros((max_goals + 1, max_goals + 1))
-
-        for i in range(max_goals + 1):
-            for j in range(max_goals + 1):
-                # Independent Poisson probabilities
-                poisson_prob = poisson.pmf(i, lambda_) * poisson.pmf(j, mu)
-
-                # Dixon-Coles correction
-                tau_correction = self.tau(i, j, lambda_, mu)
+        if max_goals is None:
+            # Size the grid from pmfs up to the hard cap, then slice them
+            pmfs = poisson_pmf_matrix(np.array([lambda_, mu]), MAX_GOALS_CAP)
+            max_goals = int(_caps_from_pmf(pmfs, epsilon).max())
+            home_pmf, away_pmf = pmfs[:, :max_goals + 1]
+        else:
+            home_pmf = poisson_pmf_vector(lambda_, max_goals)
+            away_pmf = poisson_pmf_vector(mu, max_goals)
+
+        # Independent Poisson probabilities
+        prob_matrix = np.outer(home_pmf, away_pmf)
+
+        # Dixon-Coles correction, only the 2x2 low-score block differs from 1
+        if max_goals >= 1:
+            prob_matrix[:2, :2] *= [
+                [1 - lambda_ * mu * self.rho, 1 + lambda_ * self.rho],
+                [1 + mu * self.rho, 1 - self.rho]
+            ]
+        else:
+            prob_matrix[0, 0] *= 1 - lambda_ * mu * self.rho
 
-                prob_matrix[i, j] = poisson_prob * tau_correction
+        # The tau correction preserves total mass over the infinite grid, so
+        # whatever is missing here lies outside the grid
+        total = prob_matrix.sum()
 
         # Normalize to ensure sum = 1.0
-        prob_matrix /= prob_matrix.sum()
+        prob_matrix /= total
 
+        if return_truncated:
+            return prob_matrix, float(max(1.0 - total, 0.0))
         return prob_matrix
 
+    def predict_scoreline_tensor(
+        self,
+        lambdas: np.ndarray,
+        mus: np.ndarray,
+        max_goals: Optional[int] = 10,
+        epsilon: float = DEFAULT_TAIL_EPSILON,
+        return_truncated: bool = False
+    ):
+        """
+        Batched `predict_scoreline_probabilities`.
+
+        Args:
+            lambdas: (N,) expected home goals
+            mus: (N,) expected away goals
+            max_goals: Maximum goals to calculate (default 10); None sizes
+                the grid per fixture from the tail bound and pads the batch
+                to the largest one
+            epsilon: Tail mass allowed outside an adaptive grid
+            return_truncated: Also return the (N,) mass outside the grid
+
+        Returns:
+            (N, G, G) array, each matrix summing to 1.0, or
+            (array, truncated_mass) if return_truncated
+        """
+        lambdas = np.asarray(lambdas, dtype=float)
+        mus = np.asarray(mus, dtype=float)
+
+        if max_goals is None:
+            # Per-fixture caps from the tail bound; the batch is padded to the largest
+            home_pmf = poisson_pmf_matrix(lambdas, MAX_GOALS_CAP)
+            away_pmf = poisson_pmf_matrix(mus, MAX_GOALS_CAP)
+            max_goals = int(max(
+                _caps_from_pmf(home_pmf, epsilon).max(initial=0),
+                _caps_from_pmf(away_pmf, epsilon).max(initial=0)
+            ))
+            home_pmf = home_pmf[:, :max_goals + 1]
+            away_pmf = away_pmf[:, :max_goals + 1]
+        else:
+            home_pmf = poisson_pmf_matrix(lambdas, max_goals)
+            away_pmf = poisson_pmf_matrix(mus, max_goals)
+
+        probs = home_pmf[:, :, None] * away_pmf[:, None, :]
+
+        # Dixon-Coles correction on the low-score block
+        probs[:, 0, 0] *= 1 - lambdas * mus * self.rho
+        if max_goals >= 1:
+            probs[:, 0, 1] *= 1 + lambdas * self.rho
+            probs[:, 1, 0] *= 1 + mus * self.rho
+            probs[:, 1, 1] *= 1 - self.rho
+
+        totals = probs.sum(axis=(1, 2))
+        probs /= totals[:, None, None]
+
+        if return_truncated:
+            return probs, np.maximum(1.0 - totals, 0.0)
+        return probs
+
+    def predict_matches(
+        self,
+        home_teams: List[str],
+        away_teams: List[str],
+        form_factors: np.ndarray = None,
+        max_goals: Optional[int] = None,
+        epsilon: float = DEFAULT_TAIL_EPSILON
+    ) -> Dict[str, np.ndarray]:
+        """
+        Predict many fixtures in one vectorized pass.
+
+        Args:
+            home_teams: Home team names or database ids
+            away_teams: Away team names or ids (same length as home_teams)
+            form_factors: Optional (N, 2) array of [home, away] form
+                multipliers (default 1.0 for both)
+            max_goals: Fixed grid size; None (default) sizes it from the
+                Poisson tail bound, padded to the largest fixture
+            epsilon: Tail mass allowed outside an adaptive grid
+
+        Returns:
+            Dictionary of columnar arrays with the same keys as
+            `predict_match`, where 'scoreline_probs' is an (N, G, G) tensor
+            and 'most_likely_score' is an array of "h-a" strings
+        """
+        if not self._is_fitted:
+            raise ValueError("Model must be fitted before making predictions")
+
+        if len(home_teams) != len(away_teams):
+            raise ValueError("home_teams and away_teams must have the same length")
+
+        home_idx = self.team_index(home_teams)
+        away_idx = self.team_index(away_teams)
+
+        n_fixtures = len(home_teams)
+        if form_factors is None:
+            form_factors = np.ones((n_fixtures, 2))
+        else:
+            form_factors = np.asarray(form_factors, dtype=float).reshape(n_fixtures, 2)
+
+        # Gather team parameters
+        alpha_home = self.attack[home_idx]
+        beta_home = self.defense[home_idx]
+        alpha_away = self.attack[away_idx]
+        beta_away = self.defense[away_idx]
+
+        # Calculate expected goals
+        lambdas = alpha_home * beta_away * self.home_advantage * form_factors[:, 0]
+        mus = alpha_away * beta_home * (1 / self.home_advantage) * form_factors[:, 1]
+
+        probs, truncated_mass = self.predict_scoreline_tensor(
+            lambdas, mus, max_goals=max_goals, epsilon=epsilon, return_truncated=True
+        )
+        max_goals = probs.shape[-1] - 1
+        flat = probs.reshape(n_fixtures, -1)
+
+        markets = flat @ market_masks(max_goals).T
+        prob_home_win, prob_draw, prob_away_win, prob_over_25, prob_btts_yes = markets.T
+
+        most_likely_flat = flat.argmax(axis=1)
+        most_likely_home, most_likely_away = np.divmod(most_likely_flat, max_goals + 1)
+
+        return {
+            'prob_home_win': prob_home_win,
+            'prob_draw': prob_draw,
+            'prob_away_win': prob_away_win,
+            'prob_over_25': prob_over_25,
+            'prob_under_25': 1.0 - prob_over_25,
+            'prob_btts_yes': prob_btts_yes,
+            'prob_btts_no': 1.0 - prob_btts_yes,
+            'expected_home_goals': lambdas,
+            'expected_away_goals': mus,
+            'most_likely_score': np.char.add(
+                np.char.add(most_likely_home.astype(str), '-'),
+                most_likely_away.astype(str)
+            ),
+            'most_likely_score_prob': flat[np.arange(n_fixtures), most_likely_flat],
+            'truncated_mass': truncated_mass,
+            'scoreline_probs': probs
+        }
+
     def predict_match(
         self,
-        home_team: str,
-        away_team: str,
+        home_team: TeamKey,
+        away_team: TeamKey,
         home_form_factor: float = 1.0,
-        away_form_factor: float = 1.0
+        away_form_factor: float = 1.0,
+        max_goals: Optional[int] = None,
+        epsilon: float = DEFAULT_TAIL_EPSILON
     ) -> Dict:
         """
         Predict probabilities for a match.
 
         Args:
-            home_team: Home team name
-            away_team: Away team name
+            home_team: Home team name or database id
+            away_team: Away team name or database id
             home_form_factor: Multiplier for home form (default 1.0)
             away_form_factor: Multiplier for away form (default 1.0)
+            max_goals: Fixed grid size; None (default) picks the smallest
+                grid holding all but `epsilon` of the probability mass
+            epsilon: Tail mass allowed outside an adaptive grid
 
         Returns:
             Dictionary with predictions:
@@ -139,18 +929,18 @@ class DixonColesModel:
             - prob_btts_yes, prob_btts_no
             - expected_home_goals, expected_away_goals
             - most_likely_score
+            - truncated_mass (probability outside the scoreline grid)
         """
         if not self._is_fitted:
             raise ValueError("Model must be fitted before making predictions")
 
-        if home_team not in self.attack_params or away_team not in self.attack_params:
-            raise ValueError(f"Team not found in fitted model")
+        home_idx, away_idx = self.team_index([home_team, away_team])
 
         # Get team parameters
-        alpha_home = self.attack_params[home_team]
-        beta_home = self.defense_params[home_team]
-        alpha_away = self.attack_params[away_team]
-        beta_away = self.defense_params[away_team]
+        alpha_home = float(self.attack[home_idx])
+        beta_home = float(self.defense[home_idx])
+        alpha_away = float(self.attack[away_idx])
+        beta_away = float(self.defense[away_idx])
 
         # Calculate expected goals
         lambda_ = (
@@ -161,29 +951,17 @@ class DixonColesModel:
         )
 
         # Get scoreline probability matrix
-        prob_matrix = self.predict_scoreline_probabilities(lambda_, mu, max_goals=10)
-
-        # Calculate 1X2 probabilities
-        prob_home_win = np.tril(prob_matrix, -1).sum()  # i > j
-        prob_draw = np.diag(prob_matrix).sum()  # i == j
-        prob_away_win = np.triu(prob_matrix, 1).sum()  # i < j
-
-        # Over/Under 2.5
-        prob_over_25 = sum(
-            prob_matrix[i, j]
-            for i in range(11)
-            for j in range(11)
-            if i + j > 2.5
+        prob_matrix, truncated_mass = self.predict_scoreline_probabilities(
+            lambda_, mu, max_goals=max_goals, epsilon=epsilon, return_truncated=True
         )
-        prob_under_25 = 1.0 - prob_over_25
+        max_goals = prob_matrix.shape[0] - 1
 
-        # Both Teams To Score (BTTS)
-        prob_btts_no = (
-            prob_matrix[0, :].sum() +  # Home team 0 goals
-            prob_matrix[:, 0].sum() -  # Away team 0 goals
-            prob_matrix[0, 0]          # Avoid double counting 0-0
+        # All markets in one product with precomputed masks
+        prob_home_win, prob_draw, prob_away_win, prob_over_25, prob_btts_yes = (
+            market_masks(max_goals) @ prob_matrix.ravel()
         )
-        prob_btts_yes = 1.0 - prob_btts_no
+        prob_under_25 = 1.0 - prob_over_25
+        prob_btts_no = 1.0 - prob_btts_yes
 
         # Most likely scoreline
         most_likely_idx = np.unravel_index(
@@ -205,13 +983,164 @@ class DixonColesModel:
             'expected_away_goals': float(mu),
             'most_likely_score': most_likely_score,
             'most_likely_score_prob': float(most_likely_score_prob),
+            'truncated_mass': truncated_mass,
             'scoreline_probs': prob_matrix
         }
 
-    def fit(
+    def build_match_arrays(
         self,
         matches: List[Dict],
         time_decay: bool = True
+    ) -> MatchArrays:
+        """
+        Convert match dictionaries into integer-indexed arrays.
+
+        Args:
+            matches: List of match dictionaries (see `fit`)
+            time_decay: Whether to apply time decay weighting
+
+        Returns:
+            MatchArrays with teams sorted alphabetically
+        """
+        team_list = sorted(
+            {m['home_team'] for m in matches} | {m['away_team'] for m in matches}
+        )
+        team_to_idx = {team: i for i, team in enumerate(team_list)}
+
+        home_idx = np.fromiter(
+            (team_to_idx[m['home_team']] for m in matches), dtype=np.intp, count=len(matches)
+        )
+        away_idx = np.fromiter(
+            (team_to_idx[m['away_team']] for m in matches), dtype=np.intp, count=len(matches)
+        )
+        home_goals = np.array([m['home_score'] for m in matches], dtype=float)
+        away_goals = np.array([m['away_score'] for m in matches], dtype=float)
+
+        # Fallback to goals if xG missing
+        home_xg = np.array([
+            m['home_xg'] if m.get('home_xg') is not None else m['home_score'] for m in matches
+        ], dtype=float)
+        away_xg = np.array([
+            m['away_xg'] if m.get('away_xg') is not None else m['away_score'] for m in matches
+        ], dtype=float)
+
+        team_ids = {}
+        for m in matches:
+            if m.get('home_team_id') is not None:
+                team_ids[m['home_team']] = m['home_team_id']
+            if m.get('away_team_id') is not None:
+                team_ids[m['away_team']] = m['away_team_id']
+
+        # Calculate time weights if applicable
+        if time_decay and 'date' in matches[0]:
+            max_date = max(m['date'] for m in matches)
+            days_ago = np.array([(max_date - m['date']).days for m in matches], dtype=float)
+            weights = np.exp(-self.xi * days_ago)
+        else:
+            weights = np.ones(len(matches))
+
+        return MatchArrays(
+            team_list=team_list,
+            home_idx=home_idx,
+            away_idx=away_idx,
+            home_goals=home_goals,
+            away_goals=away_goals,
+            weights=weights,
+            home_xg=home_xg,
+            away_xg=away_xg,
+            team_ids=team_ids
+        )
+
+    def _warm_start_strengths(
+        self,
+        team_list: List[str],
+        warm_start: Optional['DixonColesModel']
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Initial attack/defense vectors, seeded from a previous model when given.
+
+        Teams are mapped by name. Teams unknown to the previous model (e.g.
+        promoted sides) start at the median of its parameters, so they sit
+        on the same scale as the rest; teams no longer present are dropped.
+        """
+        n_teams = len(team_list)
+        if warm_start is None or not warm_start._is_fitted or not len(warm_start.team_list):
+            return np.ones(n_teams), np.ones(n_teams)
+
+        idx = np.array([warm_start.team_to_idx.get(t, -1) for t in team_list], dtype=np.intp)
+        known = idx >= 0
+
+        attack = np.full(n_teams, float(np.median(warm_start.attack)))
+        defense = np.full(n_teams, float(np.median(warm_start.defense)))
+        attack[known] = warm_start.attack[idx[known]]
+        defense[known] = warm_start.defense[idx[known]]
+
+        n_new = int((~known).sum())
+        logger.info(f"Warm start from previous model ({n_new} new teams)")
+
+        return attack, defense
+
+    def _run_optimizer(
+        self,
+        objective,
+        x0: np.ndarray,
+        bounds: List[Tuple],
+        warm: bool,
+        parameterization: Optional[str] = None,
+        **options
+    ):
+        """
+        Run L-BFGS-B with an exact gradient and record the convergence
+        report in `fit_stats` (iterations, evaluations, projected gradient
+        norm, wall time, status).
+        """
+        lower = np.array([-np.inf if b[0] is None else b[0] for b in bounds], dtype=float)
+        upper = np.array([np.inf if b[1] is None else b[1] for b in bounds], dtype=float)
+        x0 = np.clip(x0, lower, upper)
+
+        start = time.perf_counter()
+        result = minimize(
+            objective,
+            x0,
+            method='L-BFGS-B',
+            jac=True,
+            bounds=bounds,
+            options=options or None
+        )
+        wall_time = time.perf_counter() - start
+
+        # Gradient components pushing against an active bound are not
+        # descent directions, so they are excluded (as L-BFGS-B's pgtol does)
+        projected = np.array(result.jac, dtype=float)
+        projected[(result.x <= lower) & (projected > 0)] = 0.0
+        projected[(result.x >= upper) & (projected < 0)] = 0.0
+
+        self.fit_stats = {
+            'iterations': int(result.nit),
+            'function_evals': int(result.nfev),
+            'grad_norm': float(np.abs(projected).max(initial=0.0)),  # In optimizer coordinates
+            'objective': float(result.fun),
+            'wall_time': wall_time,
+            'converged': bool(result.success),
+            'message': str(result.message),
+            'parameterization': parameterization or self.parameterization,
+            'n_free_params': len(x0),
+            'warm_start': warm,
+        }
+
+        if not result.success:
+            logger.warning(
+                f"Optimization did not converge after {result.nit} iterations "
+                f"(gradient norm {self.fit_stats['grad_norm']:.2e}): {result.message}"
+            )
+
+        return result
+
+    def fit(
+        self,
+        matches: List[Dict],
+        time_decay: bool = True,
+        warm_start: Optional['DixonColesModel'] = None
     ):
         """
         Fit the Dixon-Coles model to historical match data.
@@ -224,6 +1153,7 @@ class DixonColesModel:
                 - away_score: int
                 - date: datetime (optional, for time decay)
             time_decay: Whether to apply time decay weighting
+            warm_start: Previously fitted model used to seed the optimizer
 
         Returns:
             Optimization result
@@ -233,105 +1163,79 @@ class DixonColesModel:
 
         logger.info(f"Fitting Dixon-Coles model on {len(matches)} matches")
 
-        # Get unique teams
-        teams = set()
-        for match in matches:
-            teams.add(match['home_team'])
-            teams.add(match['away_team'])
+        data = self.build_match_arrays(matches, time_decay=time_decay)
+        return self.fit_arrays(data, warm_start=warm_start)
 
-        self.team_list = sorted(teams)
-        n_teams = len(self.team_list)
-        team_to_idx = {team: i for i, team in enumerate(self.team_list)}
-
-        logger.info(f"Found {n_teams} unique teams")
+    def fit_arrays(
+        self,
+        data: MatchArrays,
+        warm_start: Optional['DixonColesModel'] = None
+    ):
+        """
+        Fit on prebuilt match arrays (weights already applied).
 
-        # Calculate time weights if applicable
-        weights = []
-        if time_decay and 'date' in matches[0]:
-            max_date = max(m['date'] for m in matches)
-            for match in matches:
-                days_ago = (max_date - match['date']).days
-                weight = np.exp(-self.xi * days_ago)
-                weights.append(weight)
-        else:
-            weights = [1.0] * len(matches)
+        Args:
+            data: MatchArrays, e.g. from `build_match_arrays`
+            warm_start: Previously fitted model used to seed the optimizer
 
-        # Define negative log-likelihood function
-        def negative_log_likelihood(params):
-            """Objective function to minimize"""
+        Returns:
+            Optimization result
+        """
+        n_teams = data.n_teams
 
-            # Unpack parameters
-            attack = params[:n_teams]
-            defense = params[n_teams:2 * n_teams]
-            home_adv = params[-2]
-            rho = params[-1]
+        logger.info(f"Found {n_teams} unique teams")
 
+        def negative_log_likelihood(params):
+            """Objective function to minimize, with its exact gradient"""
             # Ensure all parameters are positive
-            if np.any(attack <= 0) or np.any(defense <= 0) or home_adv <= 0:
-                return 1e10  # Return large penalty
-
-            log_likelihood = 0.0
-
-            for idx, match in enumerate(matches):
-                i = team_to_idx[match['home_team']]
-                j = team_to_idx[match['away_team']]
-
-                # Expected goals
-                lambda_ = attack[i] * defense[j] * home_adv
-                mu = attack[j] * defense[i]
-
-                x = match['home_score']
-                y = match['away_score']
-
-                # Poisson probability with tau correction
-                poisson_prob = (
-                    poisson.pmf(x, lambda_) * poisson.pmf(y, mu)
-                )
-                tau_val = self.tau(x, y, lambda_, mu)
+            if np.any(params[:-1] <= 0):
+                return 1e10, np.zeros_like(params)  # Return large penalty
 
-                prob = poisson_prob * tau_val
-
-                # Weighted log likelihood
-                if prob > 0:
-                    log_likelihood += weights[idx] * np.log(prob)
-                else:
-                    log_likelihood -= 1e6  # Penalty for zero probability
-
-            return -log_likelihood
+            return dixon_coles_nll(params, data)
 
         # Initial parameters
-        init_attack = np.ones(n_teams)
-        init_defense = np.ones(n_teams)
-        init_home_adv = 1.3
-        init_rho = 0.03
+        init_attack, init_defense = self._warm_start_strengths(data.team_list, warm_start)
+        init_home_adv = warm_start.home_advantage if warm_start is not None and warm_start._is_fitted else 1.3
+        init_rho = warm_start.rho if warm_start is not None and warm_start._is_fitted else 0.03
 
         x0 = np.concatenate([init_attack, init_defense, [init_home_adv, init_rho]])
 
-        # Bounds
-        bounds = (
-            [(0.1, 5.0)] * (2 * n_teams) +  # attack, defense
-            [(1.0, 2.0)] +                   # home advantage
-            [(-0.5, 0.5)]                    # rho
-        )
+        if self.parameterization == 'log':
+            # Only rho is bounded; strengths and home advantage are exp() of free values
+            scale = log_space_scale(data, with_rho=True)
+            objective = log_space_objective(lambda params: dixon_coles_nll(params, data), n_teams, scale)
+            x0 = compress_log_params(np.maximum(x0, 1e-6), n_teams) * scale
+            bounds = [(None, None)] * (len(x0) - 1) + [
+                (self.rho_bounds[0] * scale[-1], self.rho_bounds[1] * scale[-1])
+            ]
+        else:
+            objective = negative_log_likelihood
+            bounds = (
+                [(0.1, 5.0)] * (2 * n_teams) +  # attack, defense
+                [(1.0, 2.0)] +                   # home advantage
+                [self.rho_bounds]                # rho
+            )
 
         # Optimize
         logger.info("Starting optimization...")
-        result = minimize(
-            negative_log_likelihood,
+        result = self._run_optimizer(
+            objective,
             x0,
-            method='L-BFGS-B',
-            bounds=bounds,
-            options={'maxiter': 1000}
+            bounds,
+            warm=warm_start is not None,
+            maxiter=1000
         )
 
-        if not result.success:
-            logger.warning(f"Optimization did not converge: {result.message}")
-
         # Extract fitted parameters
-        optimal_params = result.x
-        for idx, team in enumerate(self.team_list):
-            self.attack_params[team] = optimal_params[idx]
-            self.defense_params[team] = optimal_params[n_teams + idx]
+        optimal_params = (
+            expand_log_params(result.x / scale, n_teams) if self.parameterization == 'log' else result.x
+        )
+        self.set_params(
+            data.team_list,
+            optimal_params[:n_teams].copy(),
+            optimal_params[n_teams:2 * n_teams].copy(),
+            team_ids=data.team_ids
+        )
 
         self.home_advantage = optimal_params[-2]
         self.rho = optimal_params[-1]
@@ -340,7 +1244,7 @@ class DixonColesModel:
 
         logger.info(
             f"Model fitted successfully. Home advantage: {self.home_advantage:.3f}, "
-            f"rho: {self.rho:.4f}"
+            f"rho: {self.rho:.4f} ({result.nit} iterations, {self.fit_stats['wall_time']:.2f}s)"
         )
 
         return result
@@ -348,123 +1252,133 @@ class DixonColesModel:
     def fit_xg(
         self,
         matches: List[Dict],
-        time_decay: bool = True
+        time_decay: bool = True,
+        loss: str = 'mse',
+        warm_start: Optional['DixonColesModel'] = None
     ):
         """
         Fit model using Expected Goals (xG) instead of actual goals.
-        Minimizes Mean Squared Error between predicted lambda/mu and actual xG.
-        
+        Minimizes the error between predicted lambda/mu and actual xG.
+
         This is often more accurate as xG is less noisy than goals.
+
+        Args:
+            matches: List of match dictionaries (see `fit`), with optional
+                home_xg/away_xg keys (goals are used when xG is missing)
+            time_decay: Whether to apply time decay weighting
+            loss: 'mse' for squared error (default) or 'poisson' for
+                Poisson deviance
+            warm_start: Previously fitted model used to seed the optimizer
+
+        Returns:
+            Optimization result
         """
         if not matches:
             raise ValueError("No matches provided for fitting")
 
-        logger.info(f"Fitting Dixon-Coles model on {len(matches)} matches using xG")
-
-        # Get unique teams
-        teams = set()
-        for match in matches:
-            teams.add(match['home_team'])
-            teams.add(match['away_team'])
+        if loss not in XG_LOSSES:
+            raise ValueError(f"Unknown xG loss '{loss}', expected one of {XG_LOSSES}")
 
-        self.team_list = sorted(teams)
-        n_teams = len(self.team_list)
-        team_to_idx = {team: i for i, team in enumerate(self.team_list)}
-
-        # Weights
-        weights = []
-        if time_decay and 'date' in matches[0]:
-            max_date = max(m['date'] for m in matches)
-            for match in matches:
-                days_ago = (max_date - match['date']).days
-                weight = np.exp(-self.xi * days_ago)
-                weights.append(weight)
-        else:
-            weights = [1.0] * len(matches)
+        logger.info(f"Fitting Dixon-Coles model on {len(matches)} matches using xG ({loss})")
 
-        def loss_function(params):
-            # Unpack parameters
-            attack = params[:n_teams]
-            defense = params[n_teams:2 * n_teams]
-            home_adv = params[-1]  # No rho for xG fitting
+        data = self.build_match_arrays(matches, time_decay=time_decay)
+        return self.fit_xg_arrays(data, loss=loss, warm_start=warm_start)
 
-            if np.any(attack <= 0) or np.any(defense <= 0) or home_adv <= 0:
-                return 1e10
+    def fit_xg_arrays(
+        self,
+        data: MatchArrays,
+        loss: str = 'mse',
+        warm_start: Optional['DixonColesModel'] = None
+    ):
+        """
+        Fit on xG from prebuilt match arrays (weights already applied).
 
-            loss = 0.0
-            
-            # Constraint: Avg Attack = 1.0 (to fix scale)
-            # We add this as a penalty
-            scale_penalty = (np.mean(attack) - 1.0)**2 + (np.mean(defense) - 1.0)**2
+        Always optimizes the bounded strengths with the mean-1 penalty,
+        whatever `parameterization` is: the penalty pins the overall
+        scoring level as well as the attack/defense scale, which a
+        sum-to-zero constraint alone would leave free.
 
-            for idx, match in enumerate(matches):
-                i = team_to_idx[match['home_team']]
-                j = team_to_idx[match['away_team']]
+        Args:
+            data: MatchArrays, e.g. from `build_match_arrays`
+            loss: 'mse' or 'poisson' (see `fit_xg`)
+            warm_start: Previously fitted model used to seed the optimizer
 
-                # Predicted xG
-                pred_home_xg = attack[i] * defense[j] * home_adv
-                pred_away_xg = attack[j] * defense[i] # No home adv for away
+        Returns:
+            Optimization result
+        """
+        if loss not in XG_LOSSES:
+            raise ValueError(f"Unknown xG loss '{loss}', expected one of {XG_LOSSES}")
 
-                # Actual xG
-                actual_home_xg = match.get('home_xg', match['home_score']) # Fallback to goals if xG missing
-                actual_away_xg = match.get('away_xg', match['away_score'])
+        n_teams = data.n_teams
 
-                # Weighted Squared Error
-                error = (pred_home_xg - actual_home_xg)**2 + (pred_away_xg - actual_away_xg)**2
-                loss += weights[idx] * error
+        def loss_function(params):
+            if np.any(params <= 0):
+                return 1e10, np.zeros_like(params)
 
-            return loss + (scale_penalty * 1000)
+            return xg_loss(params, data, loss)
 
         # Initial parameters
+        init_attack, init_defense = self._warm_start_strengths(data.team_list, warm_start)
         x0 = np.concatenate([
-            np.ones(n_teams),          # Attack
-            np.ones(n_teams),          # Defense
-            [1.2]                      # Home Adv
+            init_attack,               # Attack
+            init_defense,              # Defense
+            [warm_start.home_advantage if warm_start is not None and warm_start._is_fitted else 1.2]
         ])
 
-        # Bounds
         bounds = (
             [(0.1, 5.0)] * (2 * n_teams) +
             [(0.8, 1.6)]  # Home Adv
         )
 
-        result = minimize(
+        result = self._run_optimizer(
             loss_function,
             x0,
-            method='L-BFGS-B',
-            bounds=bounds
+            bounds,
+            warm=warm_start is not None,
+            parameterization='bounded'
         )
 
         # Extract parameters
         optimal_params = result.x
-        for idx, team in enumerate(self.team_list):
-            self.attack_params[team] = optimal_params[idx]
-            self.defense_params[team] = optimal_params[n_teams + idx]
+        self.set_params(
+            data.team_list,
+            optimal_params[:n_teams].copy(),
+            optimal_params[n_teams:2 * n_teams].copy(),
+            team_ids=data.team_ids
+        )
 
         self.home_advantage = optimal_params[-1]
         self.rho = 0.0 # xG fitting doesn't estimate rho, assume independent
 
         self._is_fitted = True
-        logger.info(f"Model fitted with xG. Home Adv: {self.home_advantage:.3f}")
+        logger.info(
+            f"Model fitted with xG. Home Adv: {self.home_advantage:.3f} "
+            f"({result.nit} iterations, {self.fit_stats['wall_time']:.2f}s)"
+        )
         
         return result
 
     def save(self, filepath: str):
         """Save model to disk"""
         model_data = {
-            'attack_params': self.attack_params,
-            'defense_params': self.defense_params,
+            'attack_params': dict(self.attack_params),
+            'defense_params': dict(self.defense_params),
             'home_advantage': self.home_advantage,
             'rho': self.rho,
             'xi': self.xi,
-            'team_list': self.team_list,
-            'is_fitted': self._is_fitted
+            'team_list': list(self.team_list),
+            'team_ids': self.team_ids_by_name(),
+            'is_fitted': self._is_fitted,
+            'version': self.version
         }
 
         Path(filepath).parent.mkdir(parents=True, exist_ok=True)
 
-        with open(filepath, 'wb') as f:
+        # Write then rename, so readers never see a partially written file
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'wb') as f:
             pickle.dump(model_data, f)
+        os.replace(tmp_path, filepath)
 
         logger.info(f"Model saved to {filepath}")
 
@@ -480,10 +1394,15 @@ class DixonColesModel:
             xi=model_data['xi']
         )
 
-        model.attack_params = model_data['attack_params']
-        model.defense_params = model_data['defense_params']
-        model.team_list = model_data['team_list']
+        teams = model_data['team_list']
+        model.set_params(
+            teams,
+            [model_data['attack_params'][team] for team in teams],
+            [model_data['defense_params'][team] for team in teams],
+            team_ids=model_data.get('team_ids')
+        )
         model._is_fitted = model_data['is_fitted']
+        model.version = model_data.get('version')
 
         logger.info(f"Model loaded from {filepath}")
 
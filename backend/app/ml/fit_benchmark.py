@@ -0,0 +1,103 @@
+"""
+Parameterization Benchmark
+Bounded vs. log-space (sum-to-zero) fits of the same matches
+
+Each formulation is fitted cold on identical match arrays and compared on
+the convergence report recorded in `fit_stats` (iterations, function
+evaluations, projected gradient norm, wall time) and on how far apart the
+resulting 1X2 probabilities are, so a faster fit can be checked to land
+on the same model.
+"""
+
+import logging
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from app.ml.dixon_coles import PARAMETERIZATIONS, DixonColesModel
+
+logger = logging.getLogger(__name__)
+
+
+def benchmark_parameterizations(
+    matches: List[Dict],
+    use_xg: bool = False,
+    xg_loss: str = 'mse',
+    repeats: int = 3
+) -> List[Dict]:
+    """
+    Fit every parameterization on the same matches.
+
+    The xG fit always runs bounded (see `DixonColesModel.fit_xg_arrays`),
+    so with `use_xg` only that row is returned.
+
+    Args:
+        matches: Training matches (see `DixonColesModel.fit`)
+        use_xg: Fit on xG instead of goals
+        xg_loss: Objective used when fitting on xG
+        repeats: Fits per parameterization; the fastest wall time is kept
+
+    Returns:
+        One row per parameterization with its convergence report and
+        'max_prob_diff', the largest 1X2 probability difference to the
+        bounded fit over the training fixtures
+    """
+    data = DixonColesModel().build_match_arrays(matches)
+    home_teams = [data.team_list[i] for i in data.home_idx]
+    away_teams = [data.team_list[i] for i in data.away_idx]
+
+    rows = []
+    reference = None
+    for parameterization in (('bounded',) if use_xg else PARAMETERIZATIONS):
+        wall_times = []
+        for _ in range(repeats):
+            model = DixonColesModel(parameterization=parameterization)
+            start = time.perf_counter()
+            if use_xg:
+                model.fit_xg_arrays(data, loss=xg_loss)
+            else:
+                model.fit_arrays(data)
+            wall_times.append(time.perf_counter() - start)
+
+        predictions = model.predict_matches(home_teams, away_teams, max_goals=10)
+        probs = np.column_stack([
+            predictions['prob_home_win'], predictions['prob_draw'], predictions['prob_away_win']
+        ])
+        if reference is None:
+            reference = probs
+
+        rows.append({
+            **model.fit_stats,
+            'wall_time': min(wall_times),
+            'home_advantage': float(model.home_advantage),
+            'rho': float(model.rho),
+            'max_prob_diff': float(np.abs(probs - reference).max()),
+        })
+
+    return rows
+
+
+if __name__ == "__main__":
+    import asyncio
+    import sys
+
+    from app.ml.train import TrainingPipeline
+
+    logging.basicConfig(level=logging.WARNING)
+
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    matches, has_xg = asyncio.run(TrainingPipeline().fetch_training_data())
+
+    for use_xg in ([False, True] if has_xg else [False]):
+        print(f"\n{'xG' if use_xg else 'Goals'} fit on {len(matches)} matches")
+        print(
+            f"{'parameterization':>16} {'free':>5} {'iters':>6} {'evals':>6} "
+            f"{'grad norm':>10} {'objective':>12} {'time (s)':>9} {'max dP':>9}"
+        )
+        for row in benchmark_parameterizations(matches, use_xg=use_xg, repeats=repeats):
+            print(
+                f"{row['parameterization']:>16} {row['n_free_params']:>5} {row['iterations']:>6} "
+                f"{row['function_evals']:>6} {row['grad_norm']:>10.2e} {row['objective']:>12.4f} "
+                f"{row['wall_time']:>9.3f} {row['max_prob_diff']:>9.2e}"
+            )
@@ -0,0 +1,143 @@
+"""
+In-Play Probability Engine
+Final-score distribution from pre-match rates, the current score and the clock
+
+Goals in the remaining time are modelled as Poisson with the pre-match
+rates scaled by the fraction of regulation time left. The remaining-goals
+grid is shifted by the current score to give the final-score matrix, from
+which every market is derived. The Dixon-Coles low-score correction is
+kept only while the match is still 0-0, where the remaining goals decide
+whether a 0-0/1-0/0-1/1-1 result occurs.
+
+All live fixtures of a tick are computed in one batch.
+"""
+
+import numpy as np
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+from app.ml.dixon_coles import DEFAULT_TAIL_EPSILON, adaptive_max_goals, poisson_pmf_matrix
+from app.ml.markets import MarketSheet, market_sheet
+
+MATCH_MINUTES = 90
+HALF_TIME_BREAK_MINUTES = 15
+
+
+def estimate_elapsed_minute(kickoff: datetime, now: Optional[datetime] = None) -> int:
+    """
+    Estimate the match minute from the kickoff time when the provider does
+    not report it (assumes a 15 minute half-time break).
+    """
+    now = now or datetime.now(timezone.utc)
+    if kickoff.tzinfo is None:
+        kickoff = kickoff.replace(tzinfo=timezone.utc)
+
+    minutes = (now - kickoff).total_seconds() / 60.0
+    if minutes > 45 + HALF_TIME_BREAK_MINUTES:
+        minutes -= HALF_TIME_BREAK_MINUTES
+    elif minutes > 45:
+        minutes = 45
+
+    return int(min(max(minutes, 0), MATCH_MINUTES))
+
+
+def live_scoreline_tensor(
+    lambdas: Sequence[float],
+    mus: Sequence[float],
+    home_scores: Sequence[int],
+    away_scores: Sequence[int],
+    minutes: Sequence[float],
+    rho: float = 0.0,
+    epsilon: float = DEFAULT_TAIL_EPSILON
+) -> np.ndarray:
+    """
+    Final-score probabilities for a batch of live fixtures.
+
+    Args:
+        lambdas: Pre-match expected home goals
+        mus: Pre-match expected away goals
+        home_scores: Current home goals
+        away_scores: Current away goals
+        minutes: Elapsed minutes (stoppage time counts as 90)
+        rho: Dixon-Coles dependency parameter of the model
+        epsilon: Tail mass allowed outside the remaining-goals grid
+
+    Returns:
+        (N, G, G) final-score matrices, G large enough for every fixture
+    """
+    home_scores = np.asarray(home_scores, dtype=int)
+    away_scores = np.asarray(away_scores, dtype=int)
+    remaining = np.clip(MATCH_MINUTES - np.asarray(minutes, dtype=float), 0, MATCH_MINUTES) / MATCH_MINUTES
+
+    rem_lambdas = np.asarray(lambdas, dtype=float) * remaining
+    rem_mus = np.asarray(mus, dtype=float) * remaining
+
+    # Remaining-goals grid sized from the tail bound, padded over the batch
+    extra = int(adaptive_max_goals(np.concatenate([rem_lambdas, rem_mus]), epsilon).max())
+    probs = (
+        poisson_pmf_matrix(rem_lambdas, extra)[:, :, None] *
+        poisson_pmf_matrix(rem_mus, extra)[:, None, :]
+    )
+
+    level = (home_scores == 0) & (away_scores == 0)
+    if rho and level.any():
+        lam, mu = rem_lambdas[level], rem_mus[level]
+        probs[level, 0, 0] *= 1 - lam * mu * rho
+        probs[level, 0, 1] *= 1 + lam * rho
+        probs[level, 1, 0] *= 1 + mu * rho
+        probs[level, 1, 1] *= 1 - rho
+
+    probs /= probs.sum(axis=(1, 2), keepdims=True)
+
+    # Shift by the current score into a common square final-score grid
+    size = int(max(home_scores.max(initial=0), away_scores.max(initial=0))) + extra + 1
+    final = np.zeros((len(probs), size, size))
+    for i, (h, a) in enumerate(zip(home_scores, away_scores)):
+        final[i, h:h + extra + 1, a:a + extra + 1] = probs[i]
+
+    return final
+
+
+def live_predictions(
+    lambdas: Sequence[float],
+    mus: Sequence[float],
+    home_scores: Sequence[int],
+    away_scores: Sequence[int],
+    minutes: Sequence[float],
+    rho: float = 0.0
+) -> List[Dict]:
+    """
+    Live probabilities and full market sheet for a batch of fixtures.
+
+    Returns:
+        One dict per fixture with the headline probabilities, the final
+        expected goals, the most likely final score and 'markets' (see
+        `MarketSheet.fixture`)
+    """
+    if len(lambdas) == 0:
+        return []
+
+    final = live_scoreline_tensor(lambdas, mus, home_scores, away_scores, minutes, rho=rho)
+    sheet: MarketSheet = market_sheet(final, top_k=5)
+
+    goals = np.arange(final.shape[-1])
+    expected_home = final.sum(axis=2) @ goals
+    expected_away = final.sum(axis=1) @ goals
+    over_25 = sheet.prob_over[:, 2] if sheet.prob_over.shape[1] > 2 else np.zeros(len(final))
+
+    results = []
+    for i in range(len(final)):
+        home, away = sheet.top_scores[i, 0]
+        results.append({
+            'prob_home_win': float(sheet.prob_home_win[i]),
+            'prob_draw': float(sheet.prob_draw[i]),
+            'prob_away_win': float(sheet.prob_away_win[i]),
+            'prob_over_25': float(over_25[i]),
+            'prob_btts_yes': float(sheet.prob_btts_yes[i]),
+            'expected_home_goals': float(expected_home[i]),
+            'expected_away_goals': float(expected_away[i]),
+            'most_likely_score': f"{home}-{away}",
+            'markets': sheet.fixture(i),
+        })
+
+    return results
@@ -0,0 +1,229 @@
+"""
+Market Derivation Engine
+Full betting-market sheet from a batch of scoreline matrices
+
+Every market is a linear function of the scoreline grid, so a batch of
+(N, G, G) matrices is first collapsed onto total-goals, goal-margin and
+per-team marginals with precomputed index masks (one matrix product
+each); lines are then read off cumulative sums of those distributions.
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Tuple
+
+# Home handicaps quoted for Asian handicap markets (whole and half lines)
+HANDICAP_LINES = np.arange(-3.0, 3.01, 0.5)
+
+
+@lru_cache(maxsize=None)
+def grid_indices(max_goals: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    One-hot maps from the flattened (max_goals+1)^2 grid to total goals
+    (0..2*max_goals) and goal margin (home - away, -max_goals..max_goals).
+
+    Returns:
+        (total_onehot, margin_onehot), each ((max_goals+1)**2, 2*max_goals+1),
+        read-only
+    """
+    home, away = np.indices((max_goals + 1, max_goals + 1))
+    n_values = 2 * max_goals + 1
+
+    total_onehot = np.eye(n_values)[(home + away).ravel()]
+    margin_onehot = np.eye(n_values)[(home - away + max_goals).ravel()]
+    total_onehot.setflags(write=False)
+    margin_onehot.setflags(write=False)
+
+    return total_onehot, margin_onehot
+
+
+@lru_cache(maxsize=None)
+def handicap_masks(max_goals: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Masks over goal margins for HANDICAP_LINES.
+
+    Returns:
+        (home_covers, push), each (2*max_goals+1, len(HANDICAP_LINES)), read-only
+    """
+    margins = np.arange(-max_goals, max_goals + 1)[:, None]
+    adjusted = margins + HANDICAP_LINES[None, :]
+
+    home_covers = (adjusted > 0).astype(float)
+    push = (adjusted == 0).astype(float)
+    home_covers.setflags(write=False)
+    push.setflags(write=False)
+
+    return home_covers, push
+
+
+@dataclass
+class MarketSheet:
+    """
+    Markets for N fixtures. Arrays are indexed by fixture first.
+
+    Over/under probabilities are for half-goal lines (`goal_lines`,
+    `team_goal_lines`), so there is no push. Asian handicaps are quoted
+    from the home side on `handicap_lines`; whole lines can push.
+    """
+    prob_home_win: np.ndarray
+    prob_draw: np.ndarray
+    prob_away_win: np.ndarray
+    prob_1x: np.ndarray
+    prob_12: np.ndarray
+    prob_x2: np.ndarray
+
+    goal_lines: np.ndarray          # (L,) 0.5, 1.5, ...
+    prob_over: np.ndarray           # (N, L)
+
+    team_goal_lines: np.ndarray     # (M,) 0.5, 1.5, ...
+    prob_home_over: np.ndarray      # (N, M)
+    prob_away_over: np.ndarray      # (N, M)
+
+    handicap_lines: np.ndarray      # (H,)
+    prob_handicap_home: np.ndarray  # (N, H)
+    prob_handicap_push: np.ndarray  # (N, H)
+    prob_handicap_away: np.ndarray  # (N, H)
+
+    margins: np.ndarray             # (2G-1,) home - away
+    prob_margin: np.ndarray         # (N, 2G-1)
+
+    prob_btts_yes: np.ndarray
+    prob_home_clean_sheet: np.ndarray
+    prob_away_clean_sheet: np.ndarray
+
+    top_scores: np.ndarray          # (N, k, 2) [home, away]
+    top_score_probs: np.ndarray     # (N, k)
+
+    def fixture(self, i: int) -> Dict:
+        """JSON-friendly market sheet of fixture i"""
+        return {
+            '1x2': {
+                'home': float(self.prob_home_win[i]),
+                'draw': float(self.prob_draw[i]),
+                'away': float(self.prob_away_win[i]),
+            },
+            'double_chance': {
+                '1X': float(self.prob_1x[i]),
+                '12': float(self.prob_12[i]),
+                'X2': float(self.prob_x2[i]),
+            },
+            'over_under': {
+                f"{line:.1f}": {'over': float(p), 'under': float(1.0 - p)}
+                for line, p in zip(self.goal_lines, self.prob_over[i])
+            },
+            'home_team_total': {
+                f"{line:.1f}": {'over': float(p), 'under': float(1.0 - p)}
+                for line, p in zip(self.team_goal_lines, self.prob_home_over[i])
+            },
+            'away_team_total': {
+                f"{line:.1f}": {'over': float(p), 'under': float(1.0 - p)}
+                for line, p in zip(self.team_goal_lines, self.prob_away_over[i])
+            },
+            'asian_handicap': {
+                f"{line:+.1f}": {
+                    'home': float(home),
+                    'push': float(push),
+                    'away': float(away),
+                }
+                for line, home, push, away in zip(
+                    self.handicap_lines,
+                    self.prob_handicap_home[i],
+                    self.prob_handicap_push[i],
+                    self.prob_handicap_away[i]
+                )
+            },
+            'winning_margin': {
+                f"{int(margin):+d}" if margin else "0": float(p)
+                for margin, p in zip(self.margins, self.prob_margin[i])
+            },
+            'btts': {
+                'yes': float(self.prob_btts_yes[i]),
+                'no': float(1.0 - self.prob_btts_yes[i]),
+            },
+            'clean_sheet': {
+                'home': float(self.prob_home_clean_sheet[i]),
+                'away': float(self.prob_away_clean_sheet[i]),
+            },
+            'exact_scores': [
+                {'score': f"{h}-{a}", 'prob': float(p)}
+                for (h, a), p in zip(self.top_scores[i], self.top_score_probs[i])
+            ],
+        }
+
+
+def market_sheet(scoreline_probs: np.ndarray, top_k: int = 10) -> MarketSheet:
+    """
+    Derive every market from a batch of scoreline matrices.
+
+    Args:
+        scoreline_probs: (N, G, G) or (G, G) scoreline probabilities
+            (rows = home goals, columns = away goals)
+        top_k: Number of most likely exact scores to return
+
+    Returns:
+        MarketSheet for the N fixtures
+    """
+    probs = np.asarray(scoreline_probs, dtype=float)
+    if probs.ndim == 2:
+        probs = probs[None]
+
+    n_fixtures, grid, _ = probs.shape
+    max_goals = grid - 1
+    flat = probs.reshape(n_fixtures, -1)
+
+    total_onehot, margin_onehot = grid_indices(max_goals)
+    totals = flat @ total_onehot          # (N, 2G-1)
+    margin = flat @ margin_onehot         # (N, 2G-1)
+    home_goals = probs.sum(axis=2)        # (N, G)
+    away_goals = probs.sum(axis=1)        # (N, G)
+
+    # P(total > k + 0.5) = 1 - P(total <= k)
+    prob_over = 1.0 - np.cumsum(totals, axis=1)[:, :-1]
+    prob_home_over = 1.0 - np.cumsum(home_goals, axis=1)[:, :-1]
+    prob_away_over = 1.0 - np.cumsum(away_goals, axis=1)[:, :-1]
+
+    prob_away_win = margin[:, :max_goals].sum(axis=1)
+    prob_draw = margin[:, max_goals]
+    prob_home_win = margin[:, max_goals + 1:].sum(axis=1)
+
+    home_covers, push = handicap_masks(max_goals)
+    prob_handicap_home = margin @ home_covers
+    prob_handicap_push = margin @ push
+    prob_handicap_away = 1.0 - prob_handicap_home - prob_handicap_push
+
+    prob_home_clean_sheet = away_goals[:, 0]
+    prob_away_clean_sheet = home_goals[:, 0]
+    prob_btts_yes = 1.0 - prob_home_clean_sheet - prob_away_clean_sheet + probs[:, 0, 0]
+
+    top_k = min(top_k, flat.shape[1])
+    top_cells = np.argpartition(-flat, top_k - 1, axis=1)[:, :top_k]
+    top_probs = np.take_along_axis(flat, top_cells, axis=1)
+    order = np.argsort(-top_probs, axis=1)
+    top_cells = np.take_along_axis(top_cells, order, axis=1)
+    top_probs = np.take_along_axis(top_probs, order, axis=1)
+
+    return MarketSheet(
+        prob_home_win=prob_home_win,
+        prob_draw=prob_draw,
+        prob_away_win=prob_away_win,
+        prob_1x=prob_home_win + prob_draw,
+        prob_12=prob_home_win + prob_away_win,
+        prob_x2=prob_draw + prob_away_win,
+        goal_lines=np.arange(2 * max_goals) + 0.5,
+        prob_over=np.clip(prob_over, 0.0, 1.0),
+        team_goal_lines=np.arange(max_goals) + 0.5,
+        prob_home_over=np.clip(prob_home_over, 0.0, 1.0),
+        prob_away_over=np.clip(prob_away_over, 0.0, 1.0),
+        handicap_lines=HANDICAP_LINES,
+        prob_handicap_home=prob_handicap_home,
+        prob_handicap_push=prob_handicap_push,
+        prob_handicap_away=np.clip(prob_handicap_away, 0.0, 1.0),
+        margins=np.arange(-max_goals, max_goals + 1),
+        prob_margin=margin,
+        prob_btts_yes=prob_btts_yes,
+        prob_home_clean_sheet=prob_home_clean_sheet,
+        prob_away_clean_sheet=prob_away_clean_sheet,
+        top_scores=np.stack(np.divmod(top_cells, grid), axis=-1),
+        top_score_probs=top_probs
+    )
@@ -0,0 +1,340 @@
+"""
+Online Prediction Metrics
+Running sums of evaluation metrics, updated once per evaluated prediction
+
+Every metric the stats endpoints report is a mean, so it can be kept as a
+(count, sum) pair: adding an evaluation is O(1) and merging two periods is
+element-wise addition. Totals are stored per model version and scope
+(overall, per team, per confidence bucket), both all-time and per day, so a
+rolling window is the sum of at most one row per day in the window.
+`record_evaluations` applies new evaluations to the stored cells and
+`load_metric_totals` reads them back.
+
+Calibration keeps, for each of N_CALIBRATION_BINS equal-width bins of the
+top 1X2 probability, the count, the summed confidence and the hits, which
+is exactly what the expected calibration error needs (same binning as
+`PredictionEvaluator._expected_calibration_error`).
+"""
+
+import math
+from dataclasses import dataclass, field, fields
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, select
+
+from app.db.models import PredictionMetrics
+
+OVERALL = 'overall'
+TEAM = 'team'
+CONFIDENCE = 'confidence'
+ALL_TIME = 'all'
+
+N_CALIBRATION_BINS = 10
+
+# Lower bound of each confidence bucket (top 1X2 probability)
+CONFIDENCE_BUCKETS = (('low', 0.0), ('medium', 0.45), ('high', 0.60))
+
+# Probability floor for the log loss, so a confident miss is finite
+LOG_LOSS_EPS = 1e-15
+
+
+def confidence_bucket(confidence: float) -> str:
+    """Name of the bucket a top 1X2 probability falls into"""
+    bucket = CONFIDENCE_BUCKETS[0][0]
+    for name, lower in CONFIDENCE_BUCKETS:
+        if confidence >= lower:
+            bucket = name
+    return bucket
+
+
+def calibration_bin(confidence: float) -> int:
+    """Calibration bin index; bins are (lower, upper] as in the batch ECE"""
+    return min(max(math.ceil(confidence * N_CALIBRATION_BINS) - 1, 0), N_CALIBRATION_BINS - 1)
+
+
+def _zeros(kind=int) -> List:
+    return [kind(0)] * N_CALIBRATION_BINS
+
+
+@dataclass
+class MetricTotals:
+    """
+    Running sums for one (model version, scope, key, period) cell.
+
+    Field names match the `PredictionMetrics` columns.
+    """
+    n_evaluated: int = 0
+    correct_1x2: int = 0
+    correct_over_under: int = 0
+    correct_btts: int = 0
+    brier_1x2: float = 0.0
+    brier_over_under: float = 0.0
+    brier_btts: float = 0.0
+    log_loss_1x2: float = 0.0
+    rps_1x2: float = 0.0
+    confidence: float = 0.0
+    calibration_count: List[int] = field(default_factory=_zeros)
+    calibration_confidence: List[float] = field(default_factory=lambda: _zeros(float))
+    calibration_correct: List[int] = field(default_factory=_zeros)
+
+    @classmethod
+    def from_evaluation(
+        cls,
+        probs: Sequence[float],
+        actual_idx: int,
+        is_correct_over_under: bool,
+        is_correct_btts: bool,
+        brier_over_under: float,
+        brier_btts: float
+    ) -> 'MetricTotals':
+        """
+        Totals of a single evaluated prediction.
+
+        Args:
+            probs: 1X2 probabilities (home, draw, away)
+            actual_idx: Actual outcome (0=home, 1=draw, 2=away)
+            is_correct_over_under: Over/Under 2.5 call was right
+            is_correct_btts: BTTS call was right
+            brier_over_under: Over/Under Brier score
+            brier_btts: BTTS Brier score
+        """
+        probs = [float(p) for p in probs]
+        confidence = max(probs)
+        is_correct = probs.index(confidence) == actual_idx
+
+        # Ranked probability score over the ordered outcomes home < draw < away
+        cum_pred = cum_true = rps = 0.0
+        for i, p in enumerate(probs[:-1]):
+            cum_pred += p
+            cum_true += 1.0 if i == actual_idx else 0.0
+            rps += (cum_pred - cum_true) ** 2
+
+        totals = cls(
+            n_evaluated=1,
+            correct_1x2=int(is_correct),
+            correct_over_under=int(bool(is_correct_over_under)),
+            correct_btts=int(bool(is_correct_btts)),
+            brier_1x2=sum((p - (1.0 if i == actual_idx else 0.0)) ** 2 for i, p in enumerate(probs)) / 3.0,
+            brier_over_under=float(brier_over_under or 0.0),
+            brier_btts=float(brier_btts or 0.0),
+            log_loss_1x2=-math.log(min(max(probs[actual_idx], LOG_LOSS_EPS), 1.0)),
+            rps_1x2=rps / (len(probs) - 1),
+            confidence=confidence,
+        )
+        b = calibration_bin(confidence)
+        totals.calibration_count[b] = 1
+        totals.calibration_confidence[b] = confidence
+        totals.calibration_correct[b] = int(is_correct)
+        return totals
+
+    @classmethod
+    def from_row(cls, row) -> 'MetricTotals':
+        """Totals held by a `PredictionMetrics` row"""
+        totals = cls()
+        for f in fields(cls):
+            value = getattr(row, f.name)
+            if value is not None:
+                setattr(totals, f.name, list(value) if isinstance(value, list) else value)
+        return totals
+
+    def add(self, other: 'MetricTotals') -> 'MetricTotals':
+        """Add another cell's totals in place"""
+        for f in fields(self):
+            mine = getattr(self, f.name)
+            theirs = getattr(other, f.name)
+            if isinstance(mine, list):
+                setattr(self, f.name, [a + b for a, b in zip(mine, theirs)])
+            else:
+                setattr(self, f.name, mine + theirs)
+        return self
+
+    def as_dict(self) -> Dict:
+        """Column values (fresh lists, so ORM attribute changes are detected)"""
+        values = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            values[f.name] = list(value) if isinstance(value, list) else value
+        return values
+
+    def expected_calibration_error(self) -> Optional[float]:
+        if not self.n_evaluated:
+            return None
+        return sum(
+            abs(conf - hits) for conf, hits, n in zip(
+                self.calibration_confidence, self.calibration_correct, self.calibration_count
+            ) if n
+        ) / self.n_evaluated
+
+    def summary(self) -> Dict:
+        """
+        Mean metrics of the cell.
+
+        Returns:
+            Dictionary with n_evaluated, accuracies (0-1), Brier scores, log
+            loss, RPS, average confidence, ECE and the calibration curve
+            (None everywhere when nothing has been evaluated)
+        """
+        n = self.n_evaluated
+
+        def mean(total):
+            return total / n if n else None
+
+        return {
+            'n_evaluated': n,
+            'correct_1x2': self.correct_1x2,
+            'accuracy_1x2': mean(self.correct_1x2),
+            'accuracy_over_under': mean(self.correct_over_under),
+            'accuracy_btts': mean(self.correct_btts),
+            'brier_1x2': mean(self.brier_1x2),
+            'brier_over_under': mean(self.brier_over_under),
+            'brier_btts': mean(self.brier_btts),
+            'log_loss_1x2': mean(self.log_loss_1x2),
+            'rps_1x2': mean(self.rps_1x2),
+            'avg_confidence': mean(self.confidence),
+            'expected_calibration_error': self.expected_calibration_error(),
+            'calibration': [
+                {
+                    'bin': i,
+                    'count': count,
+                    'avg_confidence': conf / count,
+                    'accuracy': hits / count,
+                }
+                for i, (count, conf, hits) in enumerate(zip(
+                    self.calibration_count, self.calibration_confidence, self.calibration_correct
+                )) if count
+            ],
+        }
+
+
+def metric_cells(
+    model_version: str,
+    home_team_id: int,
+    away_team_id: int,
+    confidence: float,
+    day: str
+) -> List[tuple]:
+    """
+    Every (model_version, scope, scope_key, period) cell an evaluation counts in.
+
+    Args:
+        model_version: Version of the model that made the prediction
+        home_team_id: Home team id
+        away_team_id: Away team id
+        confidence: Top 1X2 probability
+        day: Evaluation day (ISO date)
+    """
+    keys = [
+        (OVERALL, ''),
+        (TEAM, str(home_team_id)),
+        (TEAM, str(away_team_id)),
+        (CONFIDENCE, confidence_bucket(confidence)),
+    ]
+    return [
+        (model_version, scope, scope_key, period)
+        for scope, scope_key in keys
+        for period in (ALL_TIME, day)
+    ]
+
+
+def accumulate(
+    cells: Dict[tuple, MetricTotals],
+    model_version: str,
+    home_team_id: int,
+    away_team_id: int,
+    day: str,
+    totals: MetricTotals
+):
+    """Add one evaluation's totals to every cell it counts in"""
+    for cell in metric_cells(model_version, home_team_id, away_team_id, totals.confidence, day):
+        cells.setdefault(cell, MetricTotals()).add(totals)
+
+
+async def record_evaluations(
+    session,
+    evaluations: Iterable[Tuple[str, int, int, str, MetricTotals]]
+) -> int:
+    """
+    Add evaluations to the stored running sums (caller commits).
+
+    Only the touched cells are read: the all-time cells of the evaluated
+    model versions and their rows for the evaluation days.
+
+    Args:
+        session: Async database session
+        evaluations: (model_version, home_team_id, away_team_id, day, totals)
+            for each new evaluation
+
+    Returns:
+        Number of cells written
+    """
+    cells: Dict[tuple, MetricTotals] = {}
+    for model_version, home_team_id, away_team_id, day, totals in evaluations:
+        accumulate(cells, model_version, home_team_id, away_team_id, day, totals)
+    if not cells:
+        return 0
+
+    rows = (await session.execute(
+        select(PredictionMetrics).where(
+            and_(
+                PredictionMetrics.model_version.in_({cell[0] for cell in cells}),
+                PredictionMetrics.period.in_({cell[3] for cell in cells})
+            )
+        )
+    )).scalars().all()
+    existing = {(r.model_version, r.scope, r.scope_key, r.period): r for r in rows}
+
+    for cell, totals in cells.items():
+        row = existing.get(cell)
+        if row is None:
+            model_version, scope, scope_key, period = cell
+            session.add(PredictionMetrics(
+                model_version=model_version, scope=scope, scope_key=scope_key, period=period,
+                **totals.as_dict()
+            ))
+        else:
+            for name, value in MetricTotals.from_row(row).add(totals).as_dict().items():
+                setattr(row, name, value)
+
+    return len(cells)
+
+
+async def load_metric_totals(
+    session,
+    scope: str = OVERALL,
+    days: Optional[int] = None,
+    model_version: Optional[str] = None,
+    today: Optional[date] = None
+) -> Dict[str, MetricTotals]:
+    """
+    Stored totals of one scope, merged over model versions (and days).
+
+    Args:
+        session: Async database session
+        scope: OVERALL, TEAM or CONFIDENCE
+        days: Rolling window length in days including today (None = all-time)
+        model_version: Restrict to one model version (None = all versions)
+        today: Last day of the window (default: current UTC date)
+
+    Returns:
+        {scope_key: MetricTotals} ('' is the key of the OVERALL scope)
+    """
+    conditions = [PredictionMetrics.scope == scope]
+    if days is None:
+        conditions.append(PredictionMetrics.period == ALL_TIME)
+    else:
+        today = today or datetime.utcnow().date()
+        conditions += [
+            PredictionMetrics.period != ALL_TIME,
+            PredictionMetrics.period >= (today - timedelta(days=days - 1)).isoformat(),
+            PredictionMetrics.period <= today.isoformat(),
+        ]
+    if model_version is not None:
+        conditions.append(PredictionMetrics.model_version == model_version)
+
+    rows = (await session.execute(select(PredictionMetrics).where(and_(*conditions)))).scalars().all()
+
+    totals: Dict[str, MetricTotals] = {}
+    for row in rows:
+        totals.setdefault(row.scope_key, MetricTotals()).add(MetricTotals.from_row(row))
+    return totals
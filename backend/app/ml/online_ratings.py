@@ -0,0 +1,282 @@
+"""
+Online Team Strengths
+Dynamic attack/defense ratings updated match by match
+
+Log attack and log defense strengths follow a Gaussian random walk (their
+variance grows by `drift_per_day` between matches). After each finished
+fixture the two goal counts are treated as Poisson observations of
+
+    log lambda = intercept + home_advantage + attack[home] + defense[away]
+    log mu     = intercept + attack[away] + defense[home]
+
+and every strength involved gets one extended-Kalman (Laplace) step: the
+Poisson likelihood is linearised around the prior mean, so an update is a
+handful of float operations per team, independent of how much history
+there is. As in DixonColesModel, a higher defense value means more goals
+conceded.
+
+Home and away observations touch disjoint strengths (home attack/away
+defense vs. away attack/home defense), so both are applied from the same
+prior.
+"""
+
+import bisect
+import json
+import logging
+import math
+import os
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "saved_models", "online_ratings.json")
+
+# Serie A averages: ~1.45 home and ~1.15 away goals per match
+DEFAULT_INTERCEPT = math.log(1.15)
+DEFAULT_HOME_ADVANTAGE = math.log(1.26)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes (SQLite, utcnow) as UTC so they compare with aware ones"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+@dataclass(frozen=True)
+class StrengthState:
+    """Posterior of one team's log strengths after its latest match"""
+    attack: float
+    defense: float
+    attack_var: float
+    defense_var: float
+    as_of: Optional[datetime] = None
+
+
+class OnlineStrengthModel:
+    """
+    Hyperparameters and the O(1) update step of the online ratings.
+    """
+
+    def __init__(
+        self,
+        intercept: float = DEFAULT_INTERCEPT,
+        home_advantage: float = DEFAULT_HOME_ADVANTAGE,
+        prior_var: float = 0.09,
+        drift_per_day: float = 1e-4
+    ):
+        """
+        Args:
+            intercept: Log expected away goals between average teams
+            home_advantage: Log home advantage multiplier
+            prior_var: Variance of a team's log strengths before its first match
+            drift_per_day: Random-walk variance added per day without a match
+        """
+        self.intercept = intercept
+        self.home_advantage = home_advantage
+        self.prior_var = prior_var
+        self.drift_per_day = drift_per_day
+
+    @classmethod
+    def estimate(cls, matches: List[Dict], **kwargs) -> 'OnlineStrengthModel':
+        """
+        Model with intercept and home advantage set from average goals.
+
+        Args:
+            matches: Match dictionaries with home_score/away_score
+            **kwargs: Other hyperparameters (see `__init__`)
+        """
+        home_goals = sum(m['home_score'] for m in matches)
+        away_goals = sum(m['away_score'] for m in matches)
+        if not matches or not home_goals or not away_goals:
+            return cls(**kwargs)
+
+        return cls(
+            intercept=math.log(away_goals / len(matches)),
+            home_advantage=math.log(home_goals / away_goals),
+            **kwargs
+        )
+
+    def initial_state(self, as_of: Optional[datetime] = None) -> StrengthState:
+        """State of a team with no matches yet (average strengths)"""
+        return StrengthState(0.0, 0.0, self.prior_var, self.prior_var, as_of)
+
+    def expected_goals(self, home: StrengthState, away: StrengthState) -> Tuple[float, float]:
+        """Expected (home, away) goals for a fixture between two states"""
+        lambda_ = math.exp(self.intercept + self.home_advantage + home.attack + away.defense)
+        mu = math.exp(self.intercept + away.attack + home.defense)
+        return lambda_, mu
+
+    def _drift(self, state: StrengthState, date: datetime) -> StrengthState:
+        """Random-walk variance accumulated since the state's last match"""
+        if state.as_of is None or date is None:
+            return state
+        days = max((_as_utc(date) - _as_utc(state.as_of)).total_seconds() / 86400.0, 0.0)
+        extra = self.drift_per_day * days
+        return replace(state, attack_var=state.attack_var + extra, defense_var=state.defense_var + extra)
+
+    def update(
+        self,
+        home: StrengthState,
+        away: StrengthState,
+        home_goals: int,
+        away_goals: int,
+        date: Optional[datetime] = None
+    ) -> Tuple[StrengthState, StrengthState]:
+        """
+        Posterior states of both teams after a finished match.
+
+        Args:
+            home: Home team state before the match
+            away: Away team state before the match
+            home_goals: Goals scored by the home team
+            away_goals: Goals scored by the away team
+            date: Match date (drives the random-walk drift)
+
+        Returns:
+            (home_state, away_state) as of `date`
+        """
+        home = self._drift(home, date)
+        away = self._drift(away, date)
+        lambda_, mu = self.expected_goals(home, away)
+
+        # Home goals: observe home attack + away defense
+        home_attack, home_attack_var, away_defense, away_defense_var = _poisson_step(
+            home.attack, home.attack_var, away.defense, away.defense_var, lambda_, home_goals
+        )
+        # Away goals: observe away attack + home defense
+        away_attack, away_attack_var, home_defense, home_defense_var = _poisson_step(
+            away.attack, away.attack_var, home.defense, home.defense_var, mu, away_goals
+        )
+
+        return (
+            StrengthState(home_attack, home_defense, home_attack_var, home_defense_var, date or home.as_of),
+            StrengthState(away_attack, away_defense, away_attack_var, away_defense_var, date or away.as_of),
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            'intercept': self.intercept,
+            'home_advantage': self.home_advantage,
+            'prior_var': self.prior_var,
+            'drift_per_day': self.drift_per_day,
+        }
+
+    def save(self, filepath: str = CONFIG_PATH):
+        """Save hyperparameters as JSON"""
+        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+
+        # Write then rename, so readers never see a partially written file
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, filepath)
+
+    @classmethod
+    def load(cls, filepath: str = CONFIG_PATH) -> 'OnlineStrengthModel':
+        """Load hyperparameters (defaults when no file has been written)"""
+        if not os.path.exists(filepath):
+            return cls()
+        try:
+            with open(filepath) as f:
+                return cls(**json.load(f))
+        except Exception as e:
+            logger.error(f"Failed to load online rating config from {filepath}: {e}")
+            return cls()
+
+
+def _poisson_step(
+    first: float,
+    first_var: float,
+    second: float,
+    second_var: float,
+    rate: float,
+    goals: int
+) -> Tuple[float, float, float, float]:
+    """
+    One Laplace step for a Poisson count whose log rate is the sum of two
+    independent Gaussian strengths. Each strength moves in proportion to its
+    share of the prior variance.
+    """
+    total_var = first_var + second_var
+    denom = 1.0 + total_var * rate
+    residual = (goals - rate) / denom
+    shrink = rate / denom
+
+    return (
+        first + first_var * residual,
+        first_var - first_var * first_var * shrink,
+        second + second_var * residual,
+        second_var - second_var * second_var * shrink,
+    )
+
+
+class OnlineRatings:
+    """
+    In-memory rating tracker with a per-team strength time series.
+
+    Teams are keyed by any hashable (database id or name).
+    """
+
+    def __init__(self, model: Optional[OnlineStrengthModel] = None):
+        self.model = model or OnlineStrengthModel()
+        self.states: Dict[Hashable, StrengthState] = {}
+        self.history: Dict[Hashable, List[StrengthState]] = {}
+        self._dates: Dict[Hashable, List[datetime]] = {}
+
+    def state(self, team: Hashable) -> StrengthState:
+        """Current state of a team (prior if it has not played)"""
+        return self.states.get(team) or self.model.initial_state()
+
+    def apply(
+        self,
+        home_team: Hashable,
+        away_team: Hashable,
+        home_goals: int,
+        away_goals: int,
+        date: Optional[datetime] = None
+    ) -> Tuple[StrengthState, StrengthState]:
+        """Update both teams with a finished match and record the new states"""
+        home_state, away_state = self.model.update(
+            self.state(home_team), self.state(away_team), home_goals, away_goals, date
+        )
+
+        for team, state in ((home_team, home_state), (away_team, away_state)):
+            self.states[team] = state
+            self.history.setdefault(team, []).append(state)
+            self._dates.setdefault(team, []).append(state.as_of)
+
+        return home_state, away_state
+
+    def replay(self, matches: List[Dict], key: str = 'team') -> int:
+        """
+        Apply matches in chronological order.
+
+        Args:
+            matches: Match dictionaries with date, home_score, away_score and
+                home_<key>/away_<key> team keys
+            key: Team key suffix ('team' for names, 'team_id' for ids)
+
+        Returns:
+            Number of matches applied
+        """
+        for m in sorted(matches, key=lambda m: m['date']):
+            self.apply(m[f'home_{key}'], m[f'away_{key}'], m['home_score'], m['away_score'], m['date'])
+        return len(matches)
+
+    def as_of(self, team: Hashable, date: datetime) -> StrengthState:
+        """
+        State of a team after its last match on or before `date`.
+
+        States are kept in date order, so this is a binary search.
+        """
+        i = bisect.bisect_right(self._dates.get(team, []), date)
+        if i == 0:
+            return self.model.initial_state()
+        return self.history[team][i - 1]
+
+    def table(self) -> List[Dict]:
+        """Current states as rows, strongest (attack - defense) first"""
+        rows = [{'team': team, **asdict(state)} for team, state in self.states.items()]
+        return sorted(rows, key=lambda row: row['attack'] - row['defense'], reverse=True)
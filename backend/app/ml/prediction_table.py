@@ -0,0 +1,245 @@
+"""
+All-Pairs Prediction Table
+Precomputed scoreline matrices and markets for every (home, away) pairing
+
+With 20 teams there are only 380 ordered pairings, so the trained model is
+scored once at neutral form and the result is stored next to the model
+artifact. Lookups are O(1); form factors are applied as an exact
+exponential tilt of the stored matrix instead of a full recompute.
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import logging
+import os
+from pathlib import Path
+
+from app.ml.dixon_coles import DixonColesModel, MARKET_NAMES, market_masks, truncated_mass
+
+logger = logging.getLogger(__name__)
+
+
+def model_fingerprint(filepath: str) -> str:
+    """SHA-256 of a model artifact, used to detect stale tables"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PredictionTable:
+    """
+    Scoreline matrices and derived markets for all ordered team pairings.
+
+    Arrays are indexed [home_idx, away_idx, ...] following `team_list`.
+    """
+
+    def __init__(
+        self,
+        model_version: str,
+        team_list: List[str],
+        lambdas: np.ndarray,
+        mus: np.ndarray,
+        rho: float,
+        scoreline_probs: np.ndarray,
+        markets: np.ndarray,
+        model_fingerprint: Optional[str] = None
+    ):
+        self.model_version = model_version
+        self.team_list = list(team_list)
+        self.team_to_idx = {team: i for i, team in enumerate(self.team_list)}
+        self.lambdas = lambdas
+        self.mus = mus
+        self.rho = float(rho)
+        self.scoreline_probs = scoreline_probs
+        self.markets = markets
+        self.model_fingerprint = model_fingerprint
+
+    @property
+    def max_goals(self) -> int:
+        return self.scoreline_probs.shape[-1] - 1
+
+    @classmethod
+    def build(
+        cls,
+        model: DixonColesModel,
+        model_version: str,
+        model_fingerprint: Optional[str] = None,
+        max_goals: int = 10
+    ) -> 'PredictionTable':
+        """
+        Score every ordered pairing of the model's teams at neutral form.
+
+        Args:
+            model: Fitted Dixon-Coles model
+            model_version: Version string the table is keyed by
+            model_fingerprint: Fingerprint of the artifact the model was loaded from
+            max_goals: Maximum goals in the scoreline grid (default 10)
+        """
+        teams = model.team_list
+        n_teams = len(teams)
+
+        home_teams = [home for home in teams for _ in teams]
+        away_teams = [away for _ in teams for away in teams]
+        batch = model.predict_matches(home_teams, away_teams, max_goals=max_goals)
+
+        shape = (n_teams, n_teams)
+        markets = np.stack(
+            [batch[f'prob_{name}'] for name in MARKET_NAMES], axis=-1
+        ).reshape(shape + (len(MARKET_NAMES),))
+
+        logger.info(f"Built prediction table for {n_teams} teams (model {model_version})")
+
+        return cls(
+            model_version=model_version,
+            team_list=teams,
+            lambdas=batch['expected_home_goals'].reshape(shape),
+            mus=batch['expected_away_goals'].reshape(shape),
+            rho=model.rho,
+            scoreline_probs=batch['scoreline_probs'].reshape(
+                shape + (max_goals + 1, max_goals + 1)
+            ).astype(np.float32),
+            markets=markets,
+            model_fingerprint=model_fingerprint
+        )
+
+    def save(self, filepath: str):
+        """Save table to disk as a compressed .npz archive"""
+        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+
+        # Write then rename, so readers never see a partially written file
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                model_version=np.array(self.model_version),
+                team_list=np.array(self.team_list),
+                lambdas=self.lambdas,
+                mus=self.mus,
+                rho=np.array(self.rho),
+                scoreline_probs=self.scoreline_probs,
+                markets=self.markets,
+                model_fingerprint=np.array(self.model_fingerprint or '')
+            )
+        os.replace(tmp_path, filepath)
+
+        logger.info(f"Prediction table saved to {filepath}")
+
+    @classmethod
+    def load(cls, filepath: str) -> 'PredictionTable':
+        """Load table from disk"""
+        with np.load(filepath, allow_pickle=False) as data:
+            return cls(
+                model_version=str(data['model_version']),
+                team_list=[str(team) for team in data['team_list']],
+                lambdas=data['lambdas'],
+                mus=data['mus'],
+                rho=float(data['rho']),
+                scoreline_probs=data['scoreline_probs'],
+                markets=data['markets'],
+                model_fingerprint=str(data['model_fingerprint']) or None
+            )
+
+    def __contains__(self, pairing: Tuple[str, str]) -> bool:
+        home_team, away_team = pairing
+        return home_team in self.team_to_idx and away_team in self.team_to_idx
+
+    def lookup(
+        self,
+        home_team: str,
+        away_team: str,
+        home_form_factor: float = 1.0,
+        away_form_factor: float = 1.0
+    ) -> Dict:
+        """
+        Look up a fixture, with the same output as `DixonColesModel.predict_match`.
+
+        Scaling lambda by f multiplies the Poisson pmf at k goals by f^k (up
+        to a constant), so form factors are applied by tilting the stored
+        matrix and swapping the tau correction, then renormalizing.
+        """
+        if (home_team, away_team) not in self:
+            raise ValueError("Team not found in prediction table")
+
+        i = self.team_to_idx[home_team]
+        j = self.team_to_idx[away_team]
+        lambda_ = float(self.lambdas[i, j])
+        mu = float(self.mus[i, j])
+
+        if home_form_factor == 1.0 and away_form_factor == 1.0:
+            prob_matrix = self.scoreline_probs[i, j].astype(float)
+            prob_home_win, prob_draw, prob_away_win, prob_over_25, prob_btts_yes = self.markets[i, j]
+        else:
+            goals = np.arange(self.max_goals + 1)
+            prob_matrix = np.outer(
+                home_form_factor ** goals, away_form_factor ** goals
+            ) * self.scoreline_probs[i, j]
+
+            old_tau = self._tau_block(lambda_, mu)
+            lambda_ *= home_form_factor
+            mu *= away_form_factor
+            prob_matrix[:2, :2] *= self._tau_block(lambda_, mu) / old_tau
+            prob_matrix /= prob_matrix.sum()
+
+            prob_home_win, prob_draw, prob_away_win, prob_over_25, prob_btts_yes = (
+                market_masks(self.max_goals) @ prob_matrix.ravel()
+            )
+
+        most_likely_idx = np.unravel_index(prob_matrix.argmax(), prob_matrix.shape)
+
+        return {
+            'prob_home_win': float(prob_home_win),
+            'prob_draw': float(prob_draw),
+            'prob_away_win': float(prob_away_win),
+            'prob_over_25': float(prob_over_25),
+            'prob_under_25': float(1.0 - prob_over_25),
+            'prob_btts_yes': float(prob_btts_yes),
+            'prob_btts_no': float(1.0 - prob_btts_yes),
+            'expected_home_goals': lambda_,
+            'expected_away_goals': mu,
+            'most_likely_score': f"{most_likely_idx[0]}-{most_likely_idx[1]}",
+            'most_likely_score_prob': float(prob_matrix[most_likely_idx]),
+            'truncated_mass': float(truncated_mass(lambda_, mu, self.max_goals)[0]),
+            'scoreline_probs': prob_matrix
+        }
+
+    def _tau_block(self, lambda_: float, mu: float) -> np.ndarray:
+        """Dixon-Coles tau over the 2x2 low-score block"""
+        return np.array([
+            [1 - lambda_ * mu * self.rho, 1 + lambda_ * self.rho],
+            [1 + mu * self.rho, 1 - self.rho]
+        ])
+
+
+def load_or_build_table(
+    model: DixonColesModel,
+    model_version: str,
+    fingerprint: str,
+    table_path: str,
+    max_goals: int = 10
+) -> PredictionTable:
+    """
+    Load the table saved next to a model artifact, rebuilding it in memory
+    when it is missing, was built from a different artifact or with a
+    different grid size.
+
+    Args:
+        model: Loaded model
+        model_version: Version string the table is keyed by
+        fingerprint: Fingerprint of the model artifact
+        table_path: Path of the saved table
+        max_goals: Grid size the model was tuned with (from its manifest)
+    """
+    if os.path.exists(table_path):
+        try:
+            table = PredictionTable.load(table_path)
+            if (table.model_fingerprint == fingerprint and table.model_version == model_version
+                    and table.max_goals == max_goals):
+                return table
+        except Exception as e:
+            logger.error(f"Failed to load prediction table: {e}")
+
+    logger.info(f"Prediction table missing or stale for model {model_version}, rebuilding")
+    return PredictionTable.build(model, model_version, model_fingerprint=fingerprint, max_goals=max_goals)
@@ -0,0 +1,195 @@
+"""
+Model Registry
+Process-wide loader for the trained Dixon-Coles model
+
+API workers and Celery workers share this loader so each model artifact is
+read once per process instead of once per prediction. The artifact's
+mtime/size is checked on every access; when training writes a new file the
+registry verifies its SHA-256 fingerprint, loads it and swaps the active
+entry in a single assignment. The bootstrap draws file is stamped too, so
+draws saved after the model was loaded are still picked up.
+
+The manifest artifact is preferred; the legacy pickle is used only when no
+manifest has been written yet.
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Optional, Tuple
+
+from app.ml.artifacts import load_model, read_manifest
+from app.ml.bootstrap import BootstrapDraws
+from app.ml.dixon_coles import DixonColesModel
+from app.ml.prediction_table import PredictionTable, load_or_build_table, model_fingerprint
+from app.ml.train import (
+    BOOTSTRAP_PATH, LEGACY_MODEL_PATH, MODEL_PATH, MODEL_VERSION, PREDICTION_TABLE_PATH
+)
+
+logger = logging.getLogger(__name__)
+
+# Grid size for artifacts whose manifest does not record one
+DEFAULT_MAX_GOALS = 10
+
+
+@dataclass(frozen=True)
+class ModelEntry:
+    """A loaded model artifact and its all-pairs prediction table"""
+    version: str
+    fingerprint: str
+    model: DixonColesModel
+    table: PredictionTable
+    loaded_at: datetime
+    bootstrap: Optional[BootstrapDraws] = None
+
+
+class ModelRegistry:
+    """
+    Hot-reloading holder for the active model.
+
+    Readers never see a half-loaded model: a new ModelEntry is fully built
+    before it replaces the previous one.
+    """
+
+    def __init__(
+        self,
+        model_path: str = MODEL_PATH,
+        table_path: str = PREDICTION_TABLE_PATH,
+        default_version: str = MODEL_VERSION,
+        legacy_path: Optional[str] = LEGACY_MODEL_PATH,
+        bootstrap_path: Optional[str] = BOOTSTRAP_PATH
+    ):
+        self.model_path = model_path
+        self.bootstrap_path = bootstrap_path
+        self.legacy_path = legacy_path
+        self.table_path = table_path
+        self.default_version = default_version
+
+        self._lock = threading.Lock()
+        self._entry: Optional[ModelEntry] = None
+        self._stamp: Optional[Tuple[str, int, int]] = None
+        self._bootstrap_stamp: Optional[Tuple[int, int]] = None
+
+    def _artifact_stamp(self) -> Optional[Tuple[str, int, int]]:
+        for path in (self.model_path, self.legacy_path):
+            if not path:
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            return (path, stat.st_mtime_ns, stat.st_size)
+        return None
+
+    def _bootstrap_file_stamp(self) -> Optional[Tuple[int, int]]:
+        if not self.bootstrap_path:
+            return None
+        try:
+            stat = os.stat(self.bootstrap_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self) -> Optional[ModelEntry]:
+        """
+        Return the active model entry, reloading it if the artifact changed.
+
+        Returns:
+            ModelEntry, or None if no fitted model is available
+        """
+        stamp = self._artifact_stamp()
+        bootstrap_stamp = self._bootstrap_file_stamp()
+        if stamp is not None and stamp == self._stamp:
+            if bootstrap_stamp == self._bootstrap_stamp:
+                return self._entry
+            return self._reload_bootstrap(bootstrap_stamp)
+
+        with self._lock:
+            # Another thread may have reloaded while we waited
+            if stamp == self._stamp:
+                return self._entry
+
+            if stamp is None:
+                if self._entry is not None:
+                    logger.warning("Model artifact disappeared, keeping loaded model")
+                return self._entry
+
+            try:
+                self._entry = self._load(stamp)
+            except Exception as e:
+                logger.error(f"Failed to load model: {e}")
+                return self._entry
+
+            self._stamp = stamp
+            self._bootstrap_stamp = bootstrap_stamp
+            return self._entry
+
+    def _reload_bootstrap(self, bootstrap_stamp: Optional[Tuple[int, int]]) -> Optional[ModelEntry]:
+        """Swap in bootstrap draws written after the model was loaded"""
+        with self._lock:
+            if bootstrap_stamp != self._bootstrap_stamp and self._entry is not None:
+                self._entry = replace(self._entry, bootstrap=self._load_bootstrap(self._entry.fingerprint))
+            self._bootstrap_stamp = bootstrap_stamp
+            return self._entry
+
+    def _load(self, stamp: Tuple[str, int, int]) -> Optional[ModelEntry]:
+        path = stamp[0]
+        fingerprint = model_fingerprint(path)
+
+        # Same content rewritten (e.g. touched or copied): keep current entry
+        if self._entry is not None and self._entry.fingerprint == fingerprint:
+            return self._entry
+
+        model = load_model(path)
+        if not model._is_fitted:
+            logger.warning(f"Model at {path} is not fitted")
+            return None
+
+        version = model.version or self.default_version
+        max_goals = read_manifest(path).get('max_goals', DEFAULT_MAX_GOALS)
+        table = load_or_build_table(model, version, fingerprint, self.table_path, max_goals=max_goals)
+
+        logger.info(f"Model registry loaded version {version} ({fingerprint[:12]})")
+
+        return ModelEntry(
+            version=version,
+            fingerprint=fingerprint,
+            model=model,
+            table=table,
+            loaded_at=datetime.utcnow(),
+            bootstrap=self._load_bootstrap(fingerprint)
+        )
+
+    def _load_bootstrap(self, fingerprint: str) -> Optional[BootstrapDraws]:
+        """Bootstrap draws saved for this artifact, if any"""
+        if not self.bootstrap_path or not os.path.exists(self.bootstrap_path):
+            return None
+        try:
+            draws = BootstrapDraws.load(self.bootstrap_path)
+        except Exception as e:
+            logger.error(f"Failed to load bootstrap draws: {e}")
+            return None
+        if draws.model_fingerprint != fingerprint:
+            logger.info("Bootstrap draws belong to a different model artifact, ignoring")
+            return None
+        return draws
+
+    @property
+    def active_version(self) -> str:
+        """Version string of the active model (default version if none loaded)"""
+        entry = self.get()
+        return entry.version if entry else self.default_version
+
+
+# Singleton instance
+_registry = None
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get model registry singleton instance"""
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry()
+    return _registry
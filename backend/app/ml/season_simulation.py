@@ -0,0 +1,197 @@
+"""
+Monte Carlo Season Simulation
+Projects the final table from current standings and remaining fixtures
+
+Every remaining fixture's scoreline is sampled from the Dixon-Coles
+scoreline matrix, for many seasons at once in vectorized NumPy batches.
+Teams are ranked with the same ordering used by the standings endpoint
+(points, goal difference, goals scored), with random tie-breaks beyond
+that. Batches can be spread over a process pool.
+"""
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from app.ml.dixon_coles import DixonColesModel
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SeasonSimulationResult:
+    """Finishing position distribution for every team"""
+    team_list: List[str]
+    position_counts: np.ndarray  # (n_teams, n_teams): team x final position (0 = first)
+    expected_points: np.ndarray  # (n_teams,)
+    n_simulations: int
+
+    @property
+    def position_probs(self) -> np.ndarray:
+        return self.position_counts / self.n_simulations
+
+    def prob_top(self, n_positions: int) -> np.ndarray:
+        """Probability of finishing in the first n positions"""
+        return self.position_probs[:, :n_positions].sum(axis=1)
+
+    def prob_bottom(self, n_positions: int) -> np.ndarray:
+        """Probability of finishing in the last n positions"""
+        return self.position_probs[:, -n_positions:].sum(axis=1)
+
+
+def _simulate_chunk(args: Tuple) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simulate a chunk of seasons (module-level so it can run in a worker process).
+
+    Returns:
+        (position_counts, points_sum) for the chunk
+    """
+    (cdfs, home_onehot, away_onehot, base_points, base_gd, base_gs,
+     n_sims, batch_size, seed) = args
+
+    rng = np.random.default_rng(seed)
+    n_fixtures = cdfs.shape[0]
+    n_teams = base_points.shape[0]
+    grid = int(round(np.sqrt(cdfs.shape[1])))
+
+    position_counts = np.zeros((n_teams, n_teams), dtype=np.int64)
+    points_sum = np.zeros(n_teams)
+
+    remaining = n_sims
+    while remaining > 0:
+        batch = min(batch_size, remaining)
+        remaining -= batch
+
+        # Sample a flat scoreline index per fixture by inverse CDF
+        # (fixture-major so each searchsorted reads a contiguous row)
+        u = rng.random((n_fixtures, batch))
+        cells = np.empty((n_fixtures, batch), dtype=np.int64)
+        for f in range(n_fixtures):
+            cells[f] = np.searchsorted(cdfs[f], u[f], side='right')
+        np.minimum(cells, grid * grid - 1, out=cells)
+        home_goals, away_goals = np.divmod(cells.T, grid)
+
+        home_pts = 3.0 * (home_goals > away_goals) + (home_goals == away_goals)
+        away_pts = 3.0 * (away_goals > home_goals) + (home_goals == away_goals)
+        margin = (home_goals - away_goals).astype(float)
+
+        # Accumulate per team with dense one-hot products (fixtures x teams)
+        points = base_points + home_pts @ home_onehot + away_pts @ away_onehot
+        goal_diff = base_gd + margin @ home_onehot - margin @ away_onehot
+        goals = base_gs + home_goals.astype(float) @ home_onehot + away_goals.astype(float) @ away_onehot
+
+        # Points, then goal difference, then goals scored, then random
+        sort_key = (
+            points * 1e8 +
+            (goal_diff + 5000) * 1e4 +
+            goals +
+            rng.random((batch, n_teams)) * 0.5
+        )
+        order = np.argsort(-sort_key, axis=1)
+        positions = np.empty_like(order)
+        positions[np.arange(batch)[:, None], order] = np.arange(n_teams)
+
+        position_counts += np.bincount(
+            (np.arange(n_teams) * n_teams + positions).ravel(),
+            minlength=n_teams * n_teams
+        ).reshape(n_teams, n_teams)
+        points_sum += points.sum(axis=0)
+
+    return position_counts, points_sum
+
+
+class SeasonSimulator:
+    """
+    Vectorized Monte Carlo simulator for the rest of a season.
+    """
+
+    def __init__(self, model: DixonColesModel, max_goals: Optional[int] = None):
+        """
+        Args:
+            model: Fitted Dixon-Coles model
+            max_goals: Scoreline grid size; None sizes it from the Poisson
+                tail bound of the remaining fixtures
+        """
+        self.model = model
+        self.max_goals = max_goals
+
+    def simulate(
+        self,
+        standings: Dict[str, Tuple[int, int, int]],
+        remaining_fixtures: List[Tuple[str, str]],
+        n_simulations: int = 100_000,
+        batch_size: int = 10_000,
+        n_workers: int = 1,
+        seed: Optional[int] = None
+    ) -> SeasonSimulationResult:
+        """
+        Simulate the remaining fixtures many times.
+
+        Args:
+            standings: team -> (points, goal_difference, goals_scored) so far
+            remaining_fixtures: (home_team, away_team) pairs still to play;
+                every team must be known to the model and present in standings
+            n_simulations: Number of simulated seasons
+            batch_size: Seasons simulated per vectorized batch
+            n_workers: Worker processes (1 = run in this process)
+            seed: Random seed for reproducible results
+
+        Returns:
+            SeasonSimulationResult
+        """
+        team_list = sorted(standings)
+        team_to_idx = {team: i for i, team in enumerate(team_list)}
+        n_teams = len(team_list)
+
+        base = np.array([standings[t] for t in team_list], dtype=float).reshape(n_teams, 3)
+
+        home_onehot = np.zeros((len(remaining_fixtures), n_teams))
+        away_onehot = np.zeros((len(remaining_fixtures), n_teams))
+
+        if remaining_fixtures:
+            home_teams = [home for home, _ in remaining_fixtures]
+            away_teams = [away for _, away in remaining_fixtures]
+
+            home_onehot[np.arange(len(home_teams)), [team_to_idx[t] for t in home_teams]] = 1.0
+            away_onehot[np.arange(len(away_teams)), [team_to_idx[t] for t in away_teams]] = 1.0
+
+            probs = self.model.predict_matches(
+                home_teams, away_teams, max_goals=self.max_goals
+            )['scoreline_probs']
+            cdfs = np.cumsum(probs.reshape(len(remaining_fixtures), -1), axis=1)
+        else:
+            cdfs = np.zeros((0, 1))
+
+        n_workers = max(1, min(n_workers, n_simulations // batch_size or 1))
+        chunk_sizes = [n_simulations // n_workers] * n_workers
+        chunk_sizes[-1] += n_simulations - sum(chunk_sizes)
+        seeds = np.random.SeedSequence(seed).spawn(n_workers)
+
+        chunks = [
+            (cdfs, home_onehot, away_onehot, base[:, 0], base[:, 1], base[:, 2],
+             size, batch_size, chunk_seed)
+            for size, chunk_seed in zip(chunk_sizes, seeds)
+        ]
+
+        logger.info(
+            f"Simulating {n_simulations} seasons over {len(remaining_fixtures)} fixtures "
+            f"({n_workers} workers)"
+        )
+
+        if n_workers == 1:
+            results = [_simulate_chunk(chunks[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                results = list(executor.map(_simulate_chunk, chunks))
+
+        position_counts = sum(r[0] for r in results)
+        points_sum = sum(r[1] for r in results)
+
+        return SeasonSimulationResult(
+            team_list=team_list,
+            position_counts=position_counts,
+            expected_points=points_sum / n_simulations,
+            n_simulations=n_simulations
+        )
@@ -1,98 +1,207 @@
 
 import logging
 import asyncio
+import json
 import os
 import sys
-from datetime import datetime
-from typing import List, Dict
-from sqlalchemy import select, and_
-from sqlalchemy.orm import selectinload
+import time
+from datetime import timedelta
+from typing import List, Dict, Optional
+import numpy as np
+from sqlalchemy import select
 
 # Add parent directory to path to allow imports from app
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from app.db.engine import AsyncSessionLocal
-from app.db.models import Fixture, MatchStats
+from app.db.models import Team
 from app.ml.dixon_coles import DixonColesModel
+from app.ml.artifacts import load_model, publish_artifact, stage_artifact
+from app.ml.bootstrap import BootstrapDraws
+from app.ml.prediction_table import PredictionTable, model_fingerprint
+from app.services.fixture_history import get_fixture_history
 
 logger = logging.getLogger(__name__)
 
-MODEL_PATH = os.path.join(os.path.dirname(__file__), "saved_models", "dixon_coles_latest.pkl")
+MODEL_PATH = os.path.join(os.path.dirname(__file__), "saved_models", "dixon_coles_latest.json")
+LEGACY_MODEL_PATH = os.path.join(os.path.dirname(__file__), "saved_models", "dixon_coles_latest.pkl")
+MODEL_VERSION = "1.2.0-xg"
+PREDICTION_TABLE_PATH = os.path.join(os.path.dirname(__file__), "saved_models", "dixon_coles_latest.table.npz")
+TUNED_CONFIG_PATH = os.path.join(os.path.dirname(__file__), "saved_models", "dixon_coles_latest.tuning.json")
+BOOTSTRAP_PATH = os.path.join(os.path.dirname(__file__), "saved_models", "dixon_coles_latest.bootstrap.npz")
+
+
+def load_tuned_config(filepath: str = TUNED_CONFIG_PATH) -> Dict:
+    """Load hyperparameters written by `app.ml.tuning` (empty if none)"""
+    if not os.path.exists(filepath):
+        return {}
+    try:
+        with open(filepath) as f:
+            return json.load(f)
+    except Exception as e:
+        logger.error(f"Failed to load tuned config from {filepath}: {e}")
+        return {}
 
 class TrainingPipeline:
     """
     Pipeline for training the Dixon-Coles model on historical data.
+
+    In incremental mode the optimizer is seeded with the parameters of the
+    previously saved artifact and only the last season of matches (at most
+    `max_window_days`, fewer if their time-decay weight drops below
+    `min_weight` sooner) is used, so a refit after one matchday converges
+    in a few iterations.
     """
-    
-    def __init__(self):
-        self.model = DixonColesModel()
+
+    def __init__(
+        self,
+        xg_loss: str = 'mse',
+        incremental: bool = False,
+        min_weight: float = 0.01,
+        max_window_days: int = 365,
+        bootstrap_resamples: int = 0,
+        bootstrap_workers: Optional[int] = None,
+        parameterization: Optional[str] = None
+    ):
+        """
+        Args:
+            xg_loss: Objective used when fitting on xG ('mse' or 'poisson')
+            incremental: Warm-start from the previous artifact and fit only
+                on the decayed window
+            min_weight: Smallest time-decay weight kept in incremental mode
+            max_window_days: Longest window kept in incremental mode (one
+                season); with the default xi, min_weight alone would keep
+                about seven years
+            bootstrap_resamples: Bootstrap resamples fitted for prediction
+                intervals (0 = disabled)
+            bootstrap_workers: Worker processes for the bootstrap (default: CPU count)
+            parameterization: 'bounded' or 'log' (default: tuned config,
+                else 'bounded'; see `app.ml.fit_benchmark`)
+        """
+        self.config = load_tuned_config()
+        self.model = DixonColesModel(
+            xi=self.config.get('xi', 0.0018),
+            rho_bounds=tuple(self.config.get('rho_bounds', (-0.5, 0.5))),
+            parameterization=parameterization or self.config.get('parameterization', 'bounded')
+        )
+        self.max_goals = self.config.get('max_goals', 10)
+        self.xg_loss = xg_loss
+        self.incremental = incremental
+        self.min_weight = min_weight
+        self.max_window_days = max_window_days
+        self.bootstrap_resamples = bootstrap_resamples
+        self.bootstrap_workers = bootstrap_workers
+        self.report: Dict = {}
+
+    def load_previous_model(self) -> Optional[DixonColesModel]:
+        """Load the last saved artifact (manifest, or legacy pickle)"""
+        for path in (MODEL_PATH, LEGACY_MODEL_PATH):
+            if os.path.exists(path):
+                try:
+                    return load_model(path)
+                except Exception as e:
+                    logger.error(f"Failed to load previous model from {path}: {e}")
+        return None
+
+    def decayed_window(self, matches: List[Dict]) -> List[Dict]:
+        """
+        Keep only matches whose weight exp(-xi * days_ago) >= min_weight,
+        within the last `max_window_days`.
+        """
+        if not matches or 'date' not in matches[0]:
+            return matches
+
+        window_days = min(np.log(1.0 / self.min_weight) / self.model.xi, self.max_window_days)
+        cutoff = max(m['date'] for m in matches) - timedelta(days=window_days)
+        return [m for m in matches if m['date'] >= cutoff]
         
     async def fetch_training_data(self) -> List[Dict]:
-        """Fetch finished matches with xG data from DB"""
+        """Fetch finished matches with xG data from the fixture history snapshot"""
         async with AsyncSessionLocal() as session:
-            # Fetch finished fixtures with match stats
-            stmt = select(Fixture).options(
-                selectinload(Fixture.match_stats),
-                selectinload(Fixture.home_team),
-                selectinload(Fixture.away_team)
-            ).where(
-                and_(
-                    Fixture.status == 'finished',
-                    Fixture.home_score.isnot(None),
-                    Fixture.away_score.isnot(None)
-                )
-            ).order_by(Fixture.match_date.asc())
-            
-            fixtures = (await session.execute(stmt)).scalars().all()
-            
-            training_data = []
-            xg_count = 0
-            
-            for f in fixtures:
-                match_data = {
-                    'home_team': f.home_team.name,
-                    'away_team': f.away_team.name,
-                    'home_score': f.home_score,
-                    'away_score': f.away_score,
-                    'date': f.match_date
-                }
-                
-                # Add xG if available
-                if f.match_stats and f.match_stats.home_xg is not None:
-                    match_data['home_xg'] = f.match_stats.home_xg
-                    match_data['away_xg'] = f.match_stats.away_xg
-                    xg_count += 1
-                
-                training_data.append(match_data)
-                
-            logger.info(f"Fetched {len(training_data)} matches. {xg_count} have xG data.")
-            return training_data, xg_count > 0
-
-    async def run(self):
-        """Run the full training pipeline"""
+            history = await get_fixture_history().refresh(session)
+            team_names = dict((await session.execute(select(Team.id, Team.name))).all())
+
+        training_data = history.training_matches(team_names)
+        xg_count = sum(1 for m in training_data if 'home_xg' in m)
+
+        logger.info(f"Fetched {len(training_data)} matches. {xg_count} have xG data.")
+        return training_data, xg_count > 0
+
+    async def run(self) -> Dict:
+        """Run the training pipeline and return the fit report"""
         logger.info("Starting training pipeline...")
         
         matches, has_xg = await self.fetch_training_data()
         
         if not matches:
             logger.warning("No matches found for training.")
-            return
+            return {}
             
         # Ensure directory exists
         os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
-        
+
+        warm_start = None
+        if self.incremental:
+            warm_start = self.load_previous_model()
+            if warm_start is None:
+                logger.info("No previous model found, falling back to a cold fit")
+            matches = self.decayed_window(matches)
+            logger.info(f"Incremental refit on {len(matches)} matches in the decayed window")
+
+        start = time.perf_counter()
+
         # Fit model
         if has_xg:
-            logger.info("Training with Expected Goals (xG)...")
-            self.model.fit_xg(matches)
+            logger.info(f"Training with Expected Goals (xG), loss={self.xg_loss}...")
+            self.model.fit_xg(matches, loss=self.xg_loss, warm_start=warm_start)
         else:
             logger.info("Training with Actual Goals (Standard Dixon-Coles)...")
-            self.model.fit(matches)
-            
-        # Save model
-        self.model.save(MODEL_PATH)
+            self.model.fit(matches, warm_start=warm_start)
+
+        self.report = {
+            'mode': 'incremental' if warm_start is not None else 'full',
+            'n_matches': len(matches),
+            'fit_wall_time': time.perf_counter() - start,
+            **self.model.fit_stats,
+        }
+        logger.info(
+            f"Fit completed ({self.report['mode']}): {self.report['iterations']} iterations, "
+            f"{self.report['function_evals']} evaluations, {self.report['fit_wall_time']:.2f}s"
+        )
+
+        # Stage the artifact: companion files are keyed by its fingerprint
+        # and must be on disk before the manifest is published, otherwise a
+        # registry reload in between would cache stale ones
+        self.model.version = MODEL_VERSION
+        staged = stage_artifact(self.model, MODEL_PATH, max_goals=self.max_goals)
+        fingerprint = model_fingerprint(staged)
+
+        # Precompute all-pairs predictions for the saved artifact
+        table = PredictionTable.build(
+            self.model,
+            MODEL_VERSION,
+            model_fingerprint=fingerprint,
+            max_goals=self.max_goals
+        )
+        table.save(PREDICTION_TABLE_PATH)
+
+        # Optional parameter draws for prediction intervals
+        if self.bootstrap_resamples > 0:
+            draws = BootstrapDraws.fit(
+                self.model,
+                matches,
+                n_resamples=self.bootstrap_resamples,
+                use_xg=has_xg,
+                xg_loss=self.xg_loss,
+                n_workers=self.bootstrap_workers
+            )
+            draws.model_fingerprint = fingerprint
+            draws.save(BOOTSTRAP_PATH)
+            self.report['bootstrap_resamples'] = draws.n_draws
+
+        publish_artifact(staged, MODEL_PATH)
         logger.info(f"Model saved to {MODEL_PATH}")
-        
+
         # Print some stats
         print(f"Training completed.")
         print(f"Teams: {len(self.model.team_list)}")
@@ -104,9 +213,21 @@ class TrainingPipeline:
         for team, strength in sorted_attack[:5]:
             print(f"{team}: {strength:.3f}")
 
+        return self.report
+
 if __name__ == "__main__":
     # Setup basic logging
     logging.basicConfig(level=logging.INFO)
     
-    pipeline = TrainingPipeline()
+    bootstrap = next(
+        (int(arg.split("=", 1)[1]) for arg in sys.argv if arg.startswith("--bootstrap=")), 0
+    )
+    parameterization = next(
+        (arg.split("=", 1)[1] for arg in sys.argv if arg.startswith("--parameterization=")), None
+    )
+    pipeline = TrainingPipeline(
+        incremental="--incremental" in sys.argv,
+        bootstrap_resamples=bootstrap,
+        parameterization=parameterization
+    )
     asyncio.run(pipeline.run())
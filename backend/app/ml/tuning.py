@@ -0,0 +1,311 @@
+"""
+Hyperparameter Search
+Grid search over time decay (xi), rho bounds, goal truncation and the
+optimizer parameterization
+
+Matches are split by date into a training period and a holdout period;
+each candidate is fitted on the training period and scored by the 1X2
+log loss of its holdout predictions. The match arrays are placed once in
+a shared memory block that every worker process attaches to, so only the
+candidate settings are sent to the pool.
+"""
+
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.ml.dixon_coles import PARAMETERIZATIONS, DixonColesModel, MatchArrays
+
+logger = logging.getLogger(__name__)
+
+# Rows of the shared match block
+_HOME_IDX, _AWAY_IDX, _HOME_GOALS, _AWAY_GOALS, _HOME_XG, _AWAY_XG, _DAY = range(7)
+
+
+@dataclass(frozen=True)
+class TuningCandidate:
+    """One point of the search grid"""
+    xi: float
+    rho_bounds: Tuple[float, float] = (-0.5, 0.5)
+    max_goals: int = 10
+    parameterization: str = 'bounded'
+
+
+def pack_matches(matches: List[Dict]) -> Tuple[np.ndarray, List[str]]:
+    """
+    Pack match dictionaries into a (7, n_matches) float64 block.
+
+    Rows: home_idx, away_idx, home_goals, away_goals, home_xg, away_xg,
+    day number (days since the first match). Missing xG falls back to goals.
+
+    Returns:
+        (block, team_list)
+    """
+    arrays = DixonColesModel().build_match_arrays(matches, time_decay=False)
+    first_date = min(m['date'] for m in matches)
+
+    block = np.empty((7, arrays.n_matches), dtype=np.float64)
+    block[_HOME_IDX] = arrays.home_idx
+    block[_AWAY_IDX] = arrays.away_idx
+    block[_HOME_GOALS] = arrays.home_goals
+    block[_AWAY_GOALS] = arrays.away_goals
+    block[_HOME_XG] = arrays.home_xg
+    block[_AWAY_XG] = arrays.away_xg
+    block[_DAY] = [(m['date'] - first_date).days for m in matches]
+
+    return block, arrays.team_list
+
+
+def _evaluate_candidate(args: Tuple) -> Dict:
+    """
+    Fit one candidate on the training period and score the holdout (module-level
+    so it can run in a worker process).
+    """
+    shm_name, shape, team_list, split_day, candidate, use_xg, xg_loss = args
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+        train = block[:, block[_DAY] < split_day]
+        test = block[:, block[_DAY] >= split_day]
+
+        last_day = train[_DAY].max()
+        data = MatchArrays(
+            team_list=team_list,
+            home_idx=train[_HOME_IDX].astype(np.intp),
+            away_idx=train[_AWAY_IDX].astype(np.intp),
+            home_goals=train[_HOME_GOALS].copy(),
+            away_goals=train[_AWAY_GOALS].copy(),
+            weights=np.exp(-candidate.xi * (last_day - train[_DAY])),
+            home_xg=train[_HOME_XG].copy(),
+            away_xg=train[_AWAY_XG].copy()
+        )
+
+        # Only score holdout matches between teams seen in training
+        seen = np.zeros(len(team_list), dtype=bool)
+        seen[data.home_idx] = True
+        seen[data.away_idx] = True
+        test_home = test[_HOME_IDX].astype(np.intp)
+        test_away = test[_AWAY_IDX].astype(np.intp)
+        keep = seen[test_home] & seen[test_away]
+        home_goals = test[_HOME_GOALS][keep].astype(int)
+        away_goals = test[_AWAY_GOALS][keep].astype(int)
+    finally:
+        shm.close()
+
+    start = time.perf_counter()
+    model = DixonColesModel(
+        xi=candidate.xi, rho_bounds=candidate.rho_bounds, parameterization=candidate.parameterization
+    )
+    if use_xg:
+        model.fit_xg_arrays(data, loss=xg_loss)
+    else:
+        model.fit_arrays(data)
+
+    batch = model.predict_matches(
+        [team_list[i] for i in test_home[keep]],
+        [team_list[i] for i in test_away[keep]],
+        max_goals=candidate.max_goals
+    )
+
+    proba = np.clip(np.column_stack([
+        batch['prob_home_win'], batch['prob_draw'], batch['prob_away_win']
+    ]), 1e-12, None)
+    proba /= proba.sum(axis=1, keepdims=True)
+    outcome = np.where(home_goals > away_goals, 0, np.where(home_goals == away_goals, 1, 2))
+
+    # Scores beyond the grid get the smallest representable probability
+    n = len(outcome)
+    in_grid = (home_goals <= candidate.max_goals) & (away_goals <= candidate.max_goals)
+    scoreline_p = np.full(n, 1e-12)
+    rows = np.flatnonzero(in_grid)
+    scoreline_p[rows] = batch['scoreline_probs'][rows, home_goals[rows], away_goals[rows]]
+
+    return {
+        **asdict(candidate),
+        'log_loss': float(-np.log(proba[np.arange(n), outcome]).mean()) if n else float('inf'),
+        'scoreline_log_loss': float(-np.log(np.clip(scoreline_p, 1e-12, None)).mean()) if n else float('inf'),
+        'rho': float(model.rho),
+        'home_advantage': float(model.home_advantage),
+        'n_train': int(data.n_matches),
+        'n_test': int(n),
+        'iterations': model.fit_stats.get('iterations'),
+        'fit_wall_time': time.perf_counter() - start,
+    }
+
+
+class HyperparameterSearch:
+    """
+    Parallel grid search over Dixon-Coles hyperparameters.
+    """
+
+    def __init__(
+        self,
+        xi_grid: Sequence[float] = (0.0005, 0.001, 0.0018, 0.0025, 0.0035, 0.005),
+        rho_bounds_grid: Sequence[Tuple[float, float]] = ((-0.5, 0.5),),
+        max_goals_grid: Sequence[int] = (10,),
+        parameterization_grid: Sequence[str] = ('bounded',),
+        holdout_fraction: float = 0.2,
+        xg_loss: str = 'mse',
+        min_train_matches: int = 100
+    ):
+        """
+        Args:
+            xi_grid: Time decay values to try
+            rho_bounds_grid: (lower, upper) rho bounds to try
+            max_goals_grid: Goal truncation values to try
+            parameterization_grid: Optimizer parameterizations to try
+                ('bounded', 'log'; xG fits are always bounded)
+            holdout_fraction: Share of the most recent matches held out for scoring
+            xg_loss: Objective used when fitting on xG
+            min_train_matches: Smallest training period the search runs on
+        """
+        self.candidates = [
+            TuningCandidate(
+                xi=xi, rho_bounds=tuple(rho_bounds), max_goals=max_goals, parameterization=parameterization
+            )
+            for xi, rho_bounds, max_goals, parameterization in itertools.product(
+                xi_grid, rho_bounds_grid, max_goals_grid, parameterization_grid
+            )
+        ]
+        self.holdout_fraction = holdout_fraction
+        self.xg_loss = xg_loss
+        self.min_train_matches = min_train_matches
+
+    def run(
+        self,
+        matches: List[Dict],
+        use_xg: bool = False,
+        n_workers: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Evaluate every candidate.
+
+        Args:
+            matches: Finished matches sorted by date (see
+                `TrainingPipeline.fetch_training_data`)
+            use_xg: Fit on xG instead of goals
+            n_workers: Worker processes (default: CPU count)
+
+        Returns:
+            Leaderboard: candidate results sorted by holdout log loss
+        """
+        if not matches:
+            raise ValueError("No matches provided for tuning")
+
+        block, team_list = pack_matches(matches)
+        split_day = np.quantile(block[_DAY], 1.0 - self.holdout_fraction)
+
+        # Matches on the split day itself are held out, so few distinct
+        # dates can leave the training period short or empty
+        n_train = int(np.count_nonzero(block[_DAY] < split_day))
+        if n_train < self.min_train_matches:
+            raise ValueError(
+                f"Only {n_train} of {block.shape[1]} matches fall before the holdout period, "
+                f"need at least {self.min_train_matches} to tune"
+            )
+
+        # The xG fit ignores the parameterization, so its candidates collapse
+        candidates = self.candidates
+        if use_xg:
+            candidates = list(dict.fromkeys(replace(c, parameterization='bounded') for c in candidates))
+
+        n_workers = max(1, min(n_workers or os.cpu_count() or 1, len(candidates)))
+        logger.info(
+            f"Evaluating {len(candidates)} candidates on {block.shape[1]} matches "
+            f"({n_workers} workers)"
+        )
+
+        shm = shared_memory.SharedMemory(create=True, size=block.nbytes)
+        try:
+            np.ndarray(block.shape, dtype=np.float64, buffer=shm.buf)[:] = block
+            jobs = [
+                (shm.name, block.shape, team_list, split_day, candidate, use_xg, self.xg_loss)
+                for candidate in candidates
+            ]
+
+            if n_workers == 1:
+                results = [_evaluate_candidate(job) for job in jobs]
+            else:
+                with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                    results = list(executor.map(_evaluate_candidate, jobs))
+        finally:
+            shm.close()
+            shm.unlink()
+
+        leaderboard = sorted(results, key=lambda r: (r['log_loss'], r['scoreline_log_loss']))
+        for rank, row in enumerate(leaderboard, 1):
+            row['rank'] = rank
+
+        return leaderboard
+
+
+def save_tuned_config(leaderboard: List[Dict], filepath: str):
+    """
+    Write the winning candidate as JSON (read by `TrainingPipeline`).
+
+    Args:
+        leaderboard: Output of `HyperparameterSearch.run`
+        filepath: Target path, next to the model artifact
+    """
+    best = leaderboard[0]
+    config = {
+        'xi': best['xi'],
+        'rho_bounds': list(best['rho_bounds']),
+        'max_goals': best['max_goals'],
+        'parameterization': best['parameterization'],
+        'log_loss': best['log_loss'],
+        'scoreline_log_loss': best['scoreline_log_loss'],
+        'n_candidates': len(leaderboard),
+        'created_at': datetime.utcnow().isoformat(),
+    }
+
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(config, f, indent=2)
+    os.replace(tmp_path, filepath)
+
+    logger.info(f"Tuned config saved to {filepath}")
+
+
+if __name__ == "__main__":
+    import asyncio
+    import sys
+
+    from app.ml.train import TUNED_CONFIG_PATH, TrainingPipeline
+
+    logging.basicConfig(level=logging.INFO)
+
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    matches, has_xg = asyncio.run(TrainingPipeline().fetch_training_data())
+
+    search = HyperparameterSearch(
+        rho_bounds_grid=((-0.5, 0.5), (-0.2, 0.2)),
+        max_goals_grid=(8, 10, 12),
+        parameterization_grid=PARAMETERIZATIONS
+    )
+    leaderboard = search.run(matches, use_xg=has_xg, n_workers=workers)
+
+    print(
+        f"{'rank':>4} {'xi':>8} {'rho bounds':>14} {'goals':>5} {'param':>7} "
+        f"{'log loss':>9} {'score ll':>9}"
+    )
+    for row in leaderboard:
+        print(
+            f"{row['rank']:>4} {row['xi']:>8.4f} {str(row['rho_bounds']):>14} "
+            f"{row['max_goals']:>5} {row['parameterization']:>7} "
+            f"{row['log_loss']:>9.4f} {row['scoreline_log_loss']:>9.4f}"
+        )
+
+    save_tuned_config(leaderboard, TUNED_CONFIG_PATH)
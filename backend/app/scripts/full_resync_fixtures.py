@@ -16,6 +16,7 @@ from sqlalchemy import select
 from app.db.engine import AsyncSessionLocal
 from app.db.models import Fixture, Team, Competition
 from app.services.providers.orchestrator import DataProviderOrchestrator
+from app.tasks.sync_tasks import update_feature_stores
 
 async def full_resync():
     """
@@ -144,6 +145,10 @@ async def full_resync():
                     print(f"   ❌ Error processing fixture {i}: {e}")
                     continue
 
+            # Results were rewritten in bulk: replay the feature stores
+            await session.flush()
+            await update_feature_stores(session, [], rebuild=True)
+
             # Commit all changes
             await session.commit()
 
@@ -10,6 +10,7 @@ from sqlalchemy import select
 
 from app.db.engine import AsyncSessionLocal
 from app.db.models import Team, Fixture, Competition, FixtureStatus
+from app.tasks.sync_tasks import update_feature_stores
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -166,6 +167,9 @@ async def seed_fixtures_g18():
                     f"Created: {fixture_data['home_team']} vs {fixture_data['away_team']}"
                 )
 
+        # Seeded results bypass the sync tasks: replay the feature stores
+        await session.flush()
+        await update_feature_stores(session, [], rebuild=True)
         await session.commit()
         logger.info(
             f"✅ Giornata 18 fixtures seeding completed! "
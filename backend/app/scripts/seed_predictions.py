@@ -18,31 +18,26 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from app.db.engine import AsyncSessionLocal
 from app.db.models import Fixture, Prediction
-from app.ml.dixon_coles import DixonColesModel
+from app.ml.registry import get_model_registry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ml", "saved_models", "dixon_coles_latest.pkl")
-
 async def seed_predictions():
     """
     Generate predictions for all scheduled fixtures using the trained model.
     """
     logger.info("Starting prediction seeding...")
 
-    # Load Model
-    if not os.path.exists(MODEL_PATH):
-        logger.error(f"Trained model not found at {MODEL_PATH}. Run training first.")
-        return
-        
-    try:
-        model = DixonColesModel.load(MODEL_PATH)
-        logger.info(f"Loaded model version 1.2.0-xg (Home Adv: {model.home_advantage:.3f})")
-    except Exception as e:
-        logger.error(f"Failed to load model: {e}")
+    # Load Model (manifest artifact, or legacy pickle)
+    entry = get_model_registry().get()
+    if entry is None:
+        logger.error("Trained model not found. Run training first.")
         return
 
+    model = entry.model
+    logger.info(f"Loaded model version {entry.version} (Home Adv: {model.home_advantage:.3f})")
+
     async with AsyncSessionLocal() as session:
         # Get all scheduled fixtures
         stmt = select(Fixture).options(
@@ -87,14 +82,14 @@ async def seed_predictions():
                     existing_pred.confidence_score = confidence
                     existing_pred.expected_home_goals = pred_data['expected_home_goals']
                     existing_pred.expected_away_goals = pred_data['expected_away_goals']
-                    existing_pred.model_version = "1.2.0-xg"
+                    existing_pred.model_version = entry.version
                     existing_pred.created_at = datetime.utcnow()
                     predictions_updated += 1
                 else:
                     # Create new
                     prediction = Prediction(
                         fixture_id=fixture.id,
-                        model_version="1.2.0-xg",
+                        model_version=entry.version,
                         prob_home_win=pred_data['prob_home_win'],
                         prob_draw=pred_data['prob_draw'],
                         prob_away_win=pred_data['prob_away_win'],
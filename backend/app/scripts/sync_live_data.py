@@ -21,6 +21,7 @@ from app.db.models import (
     TeamStats
 )
 from app.services.providers.orchestrator import DataProviderOrchestrator
+from app.tasks.sync_tasks import rewrites_result, update_feature_stores
 from app.config import get_settings
 
 logging.basicConfig(
@@ -187,6 +188,9 @@ class LiveDataSynchronizer:
                 logger.info(f"Team external IDs in DB: {list(teams_by_external_id.keys())[:10]}...")
 
                 updated = 0
+                finished_ids = []
+                new_fixtures = []
+                rewritten = False
                 for match_data in recent_fixtures:
                     # Find teams
                     home_team = teams_by_external_id.get(match_data.home_team_id)
@@ -207,8 +211,13 @@ class LiveDataSynchronizer:
                     fixture = (await session.execute(fixture_stmt)).scalar_one_or_none()
 
                     if fixture:
+                        status = self._map_status(match_data.status)
+                        if fixture.status != FixtureStatus.FINISHED and status == FixtureStatus.FINISHED:
+                            finished_ids.append(fixture.id)
+                        rewritten |= rewrites_result(fixture, status, match_data.home_score, match_data.away_score)
+
                         # Update existing fixture
-                        fixture.status = self._map_status(match_data.status)
+                        fixture.status = status
                         fixture.home_score = match_data.home_score
                         fixture.away_score = match_data.away_score
                         fixture.match_date = match_data.match_date
@@ -227,8 +236,13 @@ class LiveDataSynchronizer:
                             away_score=match_data.away_score
                         )
                         session.add(new_fixture)
+                        new_fixtures.append(new_fixture)
                         updated += 1
 
+                # Keep the feature stores in step with the results written
+                await session.flush()
+                finished_ids.extend(f.id for f in new_fixtures if f.status == FixtureStatus.FINISHED)
+                await update_feature_stores(session, finished_ids, rebuild=rewritten)
                 await session.commit()
 
             logger.info(f"✅ Updated {updated} fixtures")
@@ -0,0 +1,170 @@
+"""
+Point-in-Time Feature Cache
+Team and head-to-head state as of any kick-off, for backtests and training
+
+Features for a past fixture must only use matches played before its
+kick-off. `AsOfFeatureCache.build` replays the fixture history snapshot
+once, in date order, through the same O(1) updates as the live stores
+(`TeamFeatureState`, `HeadToHeadState`, `EloEngine.update`) and, whenever
+the sweep reaches a requested kick-off, records the state of the teams
+playing then. Entries are keyed by (team, kick-off) and (pair, kick-off),
+so a whole season of fixtures costs one pass over history.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.ml.elo import INITIAL_RATING, EloEngine
+from app.services.feature_store import FORM_MATCHES, VENUE_MATCHES, TeamFeatureState, naive_utc
+from app.services.fixture_history import FixtureColumns, as_datetime64
+from app.services.h2h_index import RECENT_MEETINGS, HeadToHeadState, meetings, pair_key
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TeamSnapshot:
+    """
+    One team's state just before a kick-off.
+
+    `elo_rating`, `matches_played`, `goals_scored` and `goals_conceded`
+    mirror the `TeamStats` columns the strength features read.
+    """
+    elo_rating: float = INITIAL_RATING
+    matches_played: int = 0
+    goals_scored: int = 0
+    goals_conceded: int = 0
+    form: List[Tuple[int, int]] = field(default_factory=list)
+    home_venue: List[Tuple[int, int]] = field(default_factory=list)
+    away_venue: List[Tuple[int, int]] = field(default_factory=list)
+    xg: Optional[Tuple[float, float]] = None
+    last_match_date: Optional[datetime] = None
+
+    @classmethod
+    def from_state(cls, state: Optional[TeamFeatureState], season: str, elo_rating: float) -> 'TeamSnapshot':
+        """
+        Snapshot of a team's feature state for a fixture of `season`.
+
+        A state from an earlier season only contributes its form results,
+        as in the feature store.
+        """
+        if state is None:
+            return cls(elo_rating=elo_rating)
+        if state.season != season:
+            state = TeamFeatureState.new_season(state.team_id, season, state)
+        return cls(
+            elo_rating=elo_rating,
+            matches_played=state.matches_played,
+            goals_scored=state.goals_for,
+            goals_conceded=state.goals_against,
+            form=state.recent_results(FORM_MATCHES),
+            home_venue=state.recent_results(VENUE_MATCHES, 'home'),
+            away_venue=state.recent_results(VENUE_MATCHES, 'away'),
+            xg=(state.xg_for / state.xg_matches, state.xg_against / state.xg_matches) if state.xg_matches else None,
+            last_match_date=state.last_match_date,
+        )
+
+
+class AsOfFeatureCache:
+    """
+    Point-in-time team and head-to-head state, keyed by kick-off.
+    """
+
+    def __init__(self):
+        self.teams: Dict[Tuple[int, datetime], TeamSnapshot] = {}
+        self.h2h: Dict[Tuple[Tuple[int, int], datetime], List[Tuple[int, int, int]]] = {}
+
+    @classmethod
+    def build(
+        cls,
+        history: FixtureColumns,
+        fixtures: Iterable[Tuple[int, int, str, datetime]],
+        elo: Optional[EloEngine] = None
+    ) -> 'AsOfFeatureCache':
+        """
+        Cache the state of every requested fixture's teams in one sweep.
+
+        Args:
+            history: Finished fixtures (see `get_fixture_history`)
+            fixtures: (home_team_id, away_team_id, season, kick-off) of the
+                fixtures to serve; finished or not
+            elo: Elo engine replayed over history (default parameters)
+
+        Returns:
+            Cache with one entry per (team, kick-off) and (pair, kick-off)
+        """
+        start = time.perf_counter()
+        elo = elo or EloEngine()
+
+        by_kickoff: Dict[datetime, List[Tuple[int, int, str]]] = {}
+        for home_team_id, away_team_id, season, kickoff in fixtures:
+            by_kickoff.setdefault(naive_utc(kickoff), []).append((home_team_id, away_team_id, season))
+
+        cache = cls()
+        states: Dict[int, TeamFeatureState] = {}
+        pairs: Dict[Tuple[int, int], HeadToHeadState] = {}
+        ratings: Dict[int, float] = {}
+
+        columns = list(zip(
+            history.fixture_id.tolist(), history.date.tolist(), history.season.tolist(),
+            history.home_team_id.tolist(), history.away_team_id.tolist(),
+            history.home_score.tolist(), history.away_score.tolist(),
+            history.home_xg.tolist(), history.away_xg.tolist()
+        ))
+        applied = 0
+
+        for kickoff in sorted(by_kickoff):
+            # Everything that kicked off strictly before this time
+            until = int(np.searchsorted(history.date, as_datetime64(kickoff), side='left'))
+            for fixture_id, date, season, home, away, home_score, away_score, home_xg, away_xg in columns[applied:until]:
+                season = history.seasons[season]
+                home_xg = None if np.isnan(home_xg) else home_xg
+                away_xg = None if np.isnan(away_xg) else away_xg
+                for team_id, is_home, goals_for, goals_against, xg_for, xg_against in (
+                    (home, True, home_score, away_score, home_xg, away_xg),
+                    (away, False, away_score, home_score, away_xg, home_xg),
+                ):
+                    state = states.get(team_id)
+                    if state is None or state.season != season:
+                        state = states[team_id] = TeamFeatureState.new_season(team_id, season, state)
+                    state.apply(fixture_id, date, is_home, goals_for, goals_against, xg_for, xg_against)
+
+                key = pair_key(home, away)
+                pairs.setdefault(key, HeadToHeadState(*key)).apply(fixture_id, date, home, home_score, away_score)
+
+                ratings[home], ratings[away] = elo.update(ratings.get(home), ratings.get(away), home_score, away_score)
+            applied = max(applied, until)
+
+            for home_team_id, away_team_id, season in by_kickoff[kickoff]:
+                for team_id in (home_team_id, away_team_id):
+                    cache.teams[(team_id, kickoff)] = TeamSnapshot.from_state(
+                        states.get(team_id), season, ratings.get(team_id, elo.initial_rating)
+                    )
+                pair = pair_key(home_team_id, away_team_id)
+                state = pairs.get(pair)
+                cache.h2h[(pair, kickoff)] = meetings(state.recent, RECENT_MEETINGS) if state else []
+
+        logger.info(
+            f"As-of cache: {len(cache.teams)} team and {len(cache.h2h)} pair entries "
+            f"over {applied} fixtures in {time.perf_counter() - start:.3f}s"
+        )
+        return cache
+
+    def covers(self, fixtures: Iterable[Tuple[int, int, str, datetime]]) -> bool:
+        """True if every (team, kick-off) of the fixtures is cached"""
+        return all(
+            (home_team_id, naive_utc(kickoff)) in self.teams and (away_team_id, naive_utc(kickoff)) in self.teams
+            for home_team_id, away_team_id, _, kickoff in fixtures
+        )
+
+    def team(self, team_id: int, kickoff: datetime) -> TeamSnapshot:
+        return self.teams[(team_id, naive_utc(kickoff))]
+
+    def meetings(self, team1_id: int, team2_id: int, kickoff: datetime) -> List[Tuple[int, int, int]]:
+        """(home_team_id, home_score, away_score) of the pair's meetings before kick-off"""
+        return self.h2h[(pair_key(team1_id, team2_id), naive_utc(kickoff))]
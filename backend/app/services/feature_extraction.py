@@ -4,17 +4,23 @@ Extracts features from database for ML prediction models
 """
 
 import logging
-from typing import Dict, Optional
-from datetime import datetime, timedelta
-from decimal import Decimal
-from sqlalchemy import select, and_, or_, func, desc
+from typing import Dict, List, Optional, Set, Tuple
+from datetime import datetime
+from sqlalchemy import select, and_, or_, func, literal, tuple_, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
-import numpy as np
-
+from sqlalchemy.orm import aliased
 from app.db.models import (
     Fixture, Team, TeamStats, Injury, Suspension,
-    MatchStats, Stadium
+    MatchStats, TeamFeatures, HeadToHead
+)
+from app.ml.elo import INITIAL_RATING
+from app.services.feature_store import (
+    FORM_MATCHES, TEAM_FEATURES_RESOURCE, VENUE_MATCHES,
+    backfilled_resources, naive_utc, weighted_form_points, win_rate
 )
+from app.services.asof_features import AsOfFeatureCache
+from app.services.fixture_history import FixtureColumns, get_fixture_history
+from app.services.h2h_index import HEAD_TO_HEAD_RESOURCE, meetings, pair_key
 
 logger = logging.getLogger(__name__)
 
@@ -31,10 +37,41 @@ class FeatureExtractor:
     - Injuries/Suspensions severity
     - Head-to-head history
     - xG statistics (if available)
+
+    `extract_features_batch` describes the fixtures as of now (current
+    stats, active injuries, latest form); `extract_features_as_of` only
+    uses what was known before each kick-off, for backtests and training.
     """
 
-    def __init__(self, session: AsyncSession):
+    # Matches looked back over per feature group
+    FORM_MATCHES = FORM_MATCHES
+    VENUE_MATCHES = VENUE_MATCHES
+    H2H_MATCHES = 10
+
+    INJURY_SEVERITY_WEIGHTS = {
+        'minor': 5,
+        'moderate': 15,
+        'major': 30,
+        'severe': 50
+    }
+
+    # Simple derby detection (TODO: improve with city mapping)
+    DERBY_PAIRS = [
+        ('Inter', 'AC Milan'),
+        ('Roma', 'Lazio'),
+        ('Juventus', 'Torino'),
+    ]
+
+    def __init__(self, session: AsyncSession, history: Optional[FixtureColumns] = None):
+        """
+        Args:
+            session: Async database session
+            history: Fixture history snapshot (see `get_fixture_history`);
+                when given, lookbacks the feature store and head-to-head
+                index cannot serve are sliced from it instead of queried
+        """
         self.session = session
+        self.history = history
 
     async def extract_features(self, fixture_id: int) -> Dict:
         """
@@ -46,189 +83,566 @@ class FeatureExtractor:
         Returns:
             Dictionary of features
         """
-        # Get fixture with relationships
-        stmt = select(Fixture).where(Fixture.id == fixture_id)
-        result = await self.session.execute(stmt)
-        fixture = result.scalar_one_or_none()
+        features = (await self.extract_features_batch([fixture_id])).get(fixture_id)
 
-        if not fixture:
+        if features is None:
             raise ValueError(f"Fixture {fixture_id} not found")
 
+        return features
+
+    async def extract_features_batch(self, fixture_ids: List[int]) -> Dict[int, Dict]:
+        """
+        Extract features for several fixtures (e.g. a whole matchday).
+
+        Everything is loaded with a fixed number of set-based queries (IN
+        lists, and window functions for the last-N match lookbacks), then
+        every feature is computed in memory, so the query count does not
+        grow with the number of fixtures.
+
+        Form, venue win rates and xG come from the team feature store (one
+        row per team) when the team's row is up to date for the fixture,
+        i.e. its latest applied match is before kick-off. Only fixtures
+        with a missing or newer row fall back to scanning fixture history
+        (the in-memory snapshot when one was given, else window queries).
+
+        Args:
+            fixture_ids: Fixture IDs to extract features for
+
+        Returns:
+            {fixture_id: features} for the fixtures that exist
+        """
+        fixtures = await self._load_fixtures(fixture_ids)
+        if not fixtures:
+            return {}
+
+        team_ids = {f.home_team_id for f in fixtures} | {f.away_team_id for f in fixtures}
+        seasons = {f.season for f in fixtures}
+
+        teams = await self._load_teams(team_ids)
+        stats = await self._load_team_stats(team_ids, seasons)
+        history = await self._load_team_history(fixtures, team_ids, seasons)
+        h2h = await self._load_h2h(fixtures)
+        injuries = await self._load_injuries(team_ids)
+        suspensions = await self._load_suspensions(team_ids)
+
+        timestamp = datetime.utcnow()
+        results = {}
+        for fixture in fixtures:
+            results[fixture.id] = self._fixture_features(
+                fixture,
+                (stats.get((fixture.home_team_id, fixture.season)), *history[(fixture.id, 'home')]),
+                (stats.get((fixture.away_team_id, fixture.season)), *history[(fixture.id, 'away')]),
+                h2h.get(fixture.id, []),
+                (injuries.get(fixture.home_team_id, []), injuries.get(fixture.away_team_id, [])),
+                (suspensions.get(fixture.home_team_id, []), suspensions.get(fixture.away_team_id, [])),
+                (teams.get(fixture.home_team_id), teams.get(fixture.away_team_id)),
+                timestamp
+            )
+
+        logger.info(f"Extracted features for {len(results)} fixtures")
+
+        return results
+
+    async def extract_features_as_of(
+        self,
+        fixture_ids: List[int],
+        cache: Optional[AsOfFeatureCache] = None
+    ) -> Dict[int, Dict]:
+        """
+        Extract features using only data known before each fixture's kick-off.
+
+        Strength (Elo and season goals), form, venue results, xG and
+        head-to-head come from an `AsOfFeatureCache`, built in one
+        chronological sweep of the fixture history for all requested
+        fixtures, so a full season of backtest or training rows costs a
+        handful of queries. Injuries and suspensions count when they were
+        recorded before kick-off and were still open then (closed ones are
+        taken to have run until their last update).
+
+        Args:
+            fixture_ids: Fixture IDs to extract features for (any status)
+            cache: Cache from an earlier call; rebuilt when it does not
+                cover every requested fixture
+
+        Returns:
+            {fixture_id: features} for the fixtures that exist
+        """
+        fixtures = await self._load_fixtures(fixture_ids)
+        if not fixtures:
+            return {}
+
+        history = self.history if self.history is not None else await get_fixture_history().refresh(self.session)
+        requests = [(f.home_team_id, f.away_team_id, f.season, f.match_date) for f in fixtures]
+        if cache is None or not cache.covers(requests):
+            cache = AsOfFeatureCache.build(history, requests)
+
+        team_ids = {f.home_team_id for f in fixtures} | {f.away_team_id for f in fixtures}
+        teams = await self._load_teams(team_ids)
+        injuries = await self._load_injuries(team_ids, active_only=False)
+        suspensions = await self._load_suspensions(team_ids, active_only=False)
+
+        timestamp = datetime.utcnow()
+        results = {}
+        for fixture in fixtures:
+            home = cache.team(fixture.home_team_id, fixture.match_date)
+            away = cache.team(fixture.away_team_id, fixture.match_date)
+            results[fixture.id] = self._fixture_features(
+                fixture,
+                (home, home.form, home.home_venue, home.xg),
+                (away, away.form, away.away_venue, away.xg),
+                cache.meetings(fixture.home_team_id, fixture.away_team_id, fixture.match_date)[:self.H2H_MATCHES],
+                tuple(
+                    self._known_at(injuries.get(team_id, []), fixture.match_date)
+                    for team_id in (fixture.home_team_id, fixture.away_team_id)
+                ),
+                tuple(
+                    self._known_at(suspensions.get(team_id, []), fixture.match_date)
+                    for team_id in (fixture.home_team_id, fixture.away_team_id)
+                ),
+                (teams.get(fixture.home_team_id), teams.get(fixture.away_team_id)),
+                timestamp
+            )
+
+        logger.info(f"Extracted as-of features for {len(results)} fixtures")
+
+        return results
+
+    def _fixture_features(
+        self,
+        fixture: Fixture,
+        home: Tuple,
+        away: Tuple,
+        h2h_matches: list,
+        injuries: Tuple[list, list],
+        suspensions: Tuple[list, list],
+        teams: Tuple[Optional[Team], Optional[Team]],
+        timestamp: datetime
+    ) -> Dict:
+        """
+        Feature dictionary of one fixture.
+
+        `home`/`away` are (stats, form_results, venue_results, xg) of each
+        side, where stats is a `TeamStats` row or anything with the same
+        elo_rating/matches_played/goals_scored/goals_conceded attributes.
+        """
+        home_stats, home_form, home_venue, home_xg = home
+        away_stats, away_form, away_venue, away_xg = away
+
         features = {}
 
         # Team strength features
-        features.update(await self._get_team_strength_features(fixture))
+        features.update(self._team_strength_features(home_stats, away_stats))
 
         # Home advantage
-        features.update(await self._get_home_advantage_features(fixture))
+        features.update(self._home_advantage_features(home_venue, away_venue))
 
         # Recent form
-        features.update(await self._get_form_features(fixture))
+        features.update(self._form_features(home_form, away_form))
 
         # Injuries and suspensions
-        features.update(await self._get_injury_features(fixture))
-        features.update(await self._get_suspension_features(fixture))
+        features.update(self._injury_features(fixture, *injuries))
+        features.update(self._suspension_features(*suspensions))
 
         # Head-to-head
-        features.update(await self._get_h2h_features(fixture))
+        features.update(self._h2h_features(fixture, h2h_matches))
 
         # Advanced stats (xG if available)
-        features.update(await self._get_advanced_stats_features(fixture))
+        features.update(self._advanced_stats_features(home_xg, away_xg))
 
         # Context features
-        features.update(await self._get_context_features(fixture))
+        features.update(self._context_features(*teams))
 
         # Calculate data completeness
         total_features = len(features)
         non_null_features = sum(1 for v in features.values() if v is not None and v != 0.0)
         features['data_completeness'] = non_null_features / total_features if total_features > 0 else 0.0
 
-        features['timestamp'] = datetime.utcnow()
-
-        logger.info(
-            f"Extracted {len(features)} features for fixture {fixture_id}, "
-            f"completeness: {features['data_completeness']:.2%}"
-        )
+        features['timestamp'] = timestamp
 
         return features
 
-    async def _get_team_strength_features(self, fixture: Fixture) -> Dict:
-        """Extract team strength features (ELO, goals)"""
+    @staticmethod
+    def _known_at(records: list, kickoff: datetime) -> list:
+        """Injuries/suspensions recorded before kick-off and still open at it"""
+        kickoff = naive_utc(kickoff)
+        return [
+            r for r in records
+            if r.created_at is not None and naive_utc(r.created_at) < kickoff and (
+                r.status == 'active' or r.updated_at is None or naive_utc(r.updated_at) >= kickoff
+            )
+        ]
+
+    # ============= BATCH LOADERS =============
+
+    async def _load_fixtures(self, fixture_ids: List[int]) -> List[Fixture]:
+        fixture_ids = list(dict.fromkeys(fixture_ids))
+        if not fixture_ids:
+            return []
+
+        fixtures = (await self.session.execute(
+            select(Fixture).where(Fixture.id.in_(fixture_ids))
+        )).scalars().all()
 
-        # Get home team
-        home_team_stmt = select(Team).where(Team.id == fixture.home_team_id)
-        home_team = (await self.session.execute(home_team_stmt)).scalar_one()
+        missing = set(fixture_ids) - {f.id for f in fixtures}
+        if missing:
+            logger.warning(f"Fixtures not found: {sorted(missing)}")
+        return fixtures
 
-        # Get away team
-        away_team_stmt = select(Team).where(Team.id == fixture.away_team_id)
-        away_team = (await self.session.execute(away_team_stmt)).scalar_one()
+    async def _load_team_history(self, fixtures: List[Fixture], team_ids: Set[int], seasons: Set[str]) -> Dict:
+        """
+        Form results, venue results and season xG of each fixture side.
+
+        Returns:
+            {(fixture_id, side): (form_results, venue_results, xg)} with
+            (goals_for, goals_against) results most recent first and xG as
+            (for, against) per game or None
+        """
+        store = await self._load_feature_store(team_ids, seasons)
+
+        history = {}
+        stale = []
+        for fixture in fixtures:
+            for side, team_id in (('home', fixture.home_team_id), ('away', fixture.away_team_id)):
+                row = store.get((team_id, fixture.season))
+                if row is None or row.last_match_date is None or (
+                    naive_utc(row.last_match_date) >= naive_utc(fixture.match_date)
+                ):
+                    stale.append(fixture)
+                    continue
+
+                # A row from an earlier season only carries the form results
+                same_season = row.season == fixture.season
+                venue = (row.recent_home if side == 'home' else row.recent_away) if same_season else []
+                history[(fixture.id, side)] = (
+                    [(gf, ga) for _, _, gf, ga in (row.recent or [])[:self.FORM_MATCHES]],
+                    [(gf, ga) for _, _, gf, ga in (venue or [])[:self.VENUE_MATCHES]],
+                    (row.xg_for / row.xg_matches, row.xg_against / row.xg_matches)
+                    if same_season and row.xg_matches else None,
+                )
 
-        # Get team stats for current season
-        home_stats_stmt = select(TeamStats).where(
-            and_(
-                TeamStats.team_id == fixture.home_team_id,
-                TeamStats.season == fixture.season
+        from_store = len(history)
+        stale = list({f.id: f for f in stale}.values())
+        if stale and self.history is not None:
+            for fixture in stale:
+                for side, team_id in (('home', fixture.home_team_id), ('away', fixture.away_team_id)):
+                    history.setdefault((fixture.id, side), (
+                        self.history.team_results(
+                            team_id, before=fixture.match_date, exclude=fixture.id, last=self.FORM_MATCHES
+                        ),
+                        self.history.team_results(
+                            team_id, season=fixture.season, venue=side, exclude=fixture.id, last=self.VENUE_MATCHES
+                        ),
+                        self.history.xg_average(team_id, fixture.season),
+                    ))
+        elif stale:
+            targets = self._targets([f.id for f in stale])
+            form = await self._load_form_history(targets)
+            venue = await self._load_venue_history(targets)
+            xg = await self._load_xg_averages(
+                {f.home_team_id for f in stale} | {f.away_team_id for f in stale}, {f.season for f in stale}
             )
-        )
-        home_stats = (await self.session.execute(home_stats_stmt)).scalar_one_or_none()
+            for fixture in stale:
+                for side, team_id in (('home', fixture.home_team_id), ('away', fixture.away_team_id)):
+                    history.setdefault((fixture.id, side), (
+                        self._team_results(form.get((fixture.id, side), []), team_id),
+                        self._team_results(venue.get((fixture.id, side), []), team_id),
+                        xg.get((team_id, fixture.season)),
+                    ))
+
+        logger.debug(f"Team history: {from_store}/{len(history)} fixture sides from the feature store")
+        return history
+
+    async def _load_feature_store(self, team_ids: Set[int], seasons: Set[str]) -> Dict[Tuple[int, str], TeamFeatures]:
+        """
+        Latest feature store row of each team up to each requested season.
 
-        away_stats_stmt = select(TeamStats).where(
-            and_(
-                TeamStats.team_id == fixture.away_team_id,
-                TeamStats.season == fixture.season
+        Nothing is served before the store has been backfilled; after that
+        the rows are trusted, as every writer of results keeps them current
+        (see `update_feature_stores` in the sync tasks).
+        """
+        if TEAM_FEATURES_RESOURCE not in await backfilled_resources(self.session):
+            return {}
+
+        rows = (await self.session.execute(
+            select(TeamFeatures).where(
+                and_(TeamFeatures.team_id.in_(team_ids), TeamFeatures.season <= max(seasons))
             )
+        )).scalars().all()
+
+        store = {}
+        for season in seasons:
+            for row in rows:
+                key = (row.team_id, season)
+                if row.season <= season and (key not in store or row.season > store[key].season):
+                    store[key] = row
+        return store
+
+    def _targets(self, fixture_ids: List[int]):
+        """
+        One row per (fixture, side): the side's team, its opponent and the
+        fixture's season and kick-off (the lookback cutoff).
+        """
+        def side(name, team, opponent):
+            return select(
+                Fixture.id.label('fixture_id'),
+                literal(name).label('side'),
+                team.label('team_id'),
+                opponent.label('opponent_id'),
+                Fixture.season.label('season'),
+                Fixture.match_date.label('cutoff')
+            ).where(Fixture.id.in_(fixture_ids))
+
+        return union_all(
+            side('home', Fixture.home_team_id, Fixture.away_team_id),
+            side('away', Fixture.away_team_id, Fixture.home_team_id)
+        ).cte('targets')
+
+    async def _ranked_history(self, targets, past, on, conditions, partition_by, limit: int) -> Dict:
+        """
+        Latest `limit` finished fixtures per partition of the targets.
+
+        Args:
+            targets: Targets CTE (see `_targets`)
+            past: Fixture alias joined to the targets
+            on: Join condition between targets and `past`
+            conditions: Extra filters on the joined rows
+            partition_by: Target columns a lookback is computed for
+            limit: Fixtures kept per partition (most recent first)
+
+        Returns:
+            {(fixture_id, side): rows} ordered most recent first
+        """
+        rank = func.row_number().over(
+            partition_by=partition_by, order_by=(past.match_date.desc(), past.id.desc())
+        ).label('rank')
+
+        ranked = select(
+            targets.c.fixture_id,
+            targets.c.side,
+            past.home_team_id,
+            past.away_team_id,
+            past.home_score,
+            past.away_score,
+            rank
+        ).select_from(targets).join(past, on).where(
+            and_(past.status == 'finished', *conditions)
+        ).subquery()
+
+        rows = (await self.session.execute(
+            select(ranked).where(ranked.c.rank <= limit).order_by(
+                ranked.c.fixture_id, ranked.c.side, ranked.c.rank
+            )
+        )).all()
+
+        history = {}
+        for row in rows:
+            history.setdefault((row.fixture_id, row.side), []).append(row)
+        return history
+
+    async def _load_form_history(self, targets) -> Dict:
+        """Last matches of each side before the fixture (any venue, any season)"""
+        past = aliased(Fixture)
+        return await self._ranked_history(
+            targets, past,
+            or_(past.home_team_id == targets.c.team_id, past.away_team_id == targets.c.team_id),
+            [past.match_date < targets.c.cutoff, past.id != targets.c.fixture_id],
+            (targets.c.fixture_id, targets.c.side),
+            self.FORM_MATCHES
+        )
+
+    async def _load_venue_history(self, targets) -> Dict:
+        """Home team's home and away team's away matches in the fixture's season"""
+        past = aliased(Fixture)
+        return await self._ranked_history(
+            targets, past,
+            or_(
+                and_(targets.c.side == 'home', past.home_team_id == targets.c.team_id),
+                and_(targets.c.side == 'away', past.away_team_id == targets.c.team_id)
+            ),
+            [past.season == targets.c.season, past.id != targets.c.fixture_id],
+            (targets.c.fixture_id, targets.c.side),
+            self.VENUE_MATCHES
+        )
+
+    async def _load_h2h(self, fixtures: List[Fixture]) -> Dict[int, list]:
+        """
+        Latest meetings of each fixture's teams before kick-off.
+
+        Read from the head-to-head index (one primary-key row per pair, no
+        row meaning the teams never met) once the index has been backfilled,
+        unless a row already holds meetings from the fixture's kick-off on;
+        otherwise from history.
+
+        Returns:
+            {fixture_id: [(home_team_id, home_score, away_score), ...]}
+        """
+        pairs = {pair_key(f.home_team_id, f.away_team_id) for f in fixtures}
+        indexed = HEAD_TO_HEAD_RESOURCE in await backfilled_resources(self.session)
+        index = {}
+        if indexed:
+            index = {
+                (row.team_a_id, row.team_b_id): row
+                for row in (await self.session.execute(
+                    select(HeadToHead).where(tuple_(HeadToHead.team_a_id, HeadToHead.team_b_id).in_(list(pairs)))
+                )).scalars().all()
+            }
+
+        h2h = {}
+        stale = []
+        for fixture in fixtures:
+            row = index.get(pair_key(fixture.home_team_id, fixture.away_team_id))
+            if not indexed or (row is not None and (
+                row.last_match_date is None or naive_utc(row.last_match_date) >= naive_utc(fixture.match_date)
+            )):
+                stale.append(fixture.id)
+            else:
+                h2h[fixture.id] = meetings(row.recent if row is not None else None, self.H2H_MATCHES)
+
+        if stale and self.history is not None:
+            for fixture in fixtures:
+                if fixture.id in stale:
+                    h2h[fixture.id] = self.history.meetings(
+                        fixture.home_team_id, fixture.away_team_id,
+                        before=fixture.match_date, last=self.H2H_MATCHES
+                    )
+        elif stale:
+            history = await self._load_h2h_history(self._targets(stale))
+            for fixture_id in stale:
+                h2h[fixture_id] = [
+                    (m.home_team_id, m.home_score, m.away_score) for m in history.get(fixture_id, [])
+                ]
+
+        return h2h
+
+    async def _load_h2h_history(self, targets) -> Dict[int, list]:
+        """Meetings of the two teams before the fixture, either venue"""
+        past = aliased(Fixture)
+        history = await self._ranked_history(
+            targets, past,
+            or_(
+                and_(past.home_team_id == targets.c.team_id, past.away_team_id == targets.c.opponent_id),
+                and_(past.home_team_id == targets.c.opponent_id, past.away_team_id == targets.c.team_id)
+            ),
+            [targets.c.side == 'home', past.match_date < targets.c.cutoff],
+            (targets.c.fixture_id,),
+            self.H2H_MATCHES
         )
-        away_stats = (await self.session.execute(away_stats_stmt)).scalar_one_or_none()
+        return {fixture_id: rows for (fixture_id, _), rows in history.items()}
+
+    async def _load_teams(self, team_ids: Set[int]) -> Dict[int, Team]:
+        teams = (await self.session.execute(
+            select(Team).where(Team.id.in_(team_ids))
+        )).scalars().all()
+        return {team.id: team for team in teams}
+
+    async def _load_team_stats(self, team_ids: Set[int], seasons: Set[str]) -> Dict[Tuple[int, str], TeamStats]:
+        rows = (await self.session.execute(
+            select(TeamStats).where(
+                and_(TeamStats.team_id.in_(team_ids), TeamStats.season.in_(seasons))
+            )
+        )).scalars().all()
+        return {(stats.team_id, stats.season): stats for stats in rows}
+
+    async def _load_xg_averages(self, team_ids: Set[int], seasons: Set[str]) -> Dict[Tuple[int, str], Tuple]:
+        """Season xG for/against per game from the match stats"""
+        def side(team, xg_for, xg_against):
+            return select(
+                team.label('team_id'),
+                Fixture.season.label('season'),
+                xg_for.label('xg_for'),
+                xg_against.label('xg_against')
+            ).join(MatchStats, MatchStats.fixture_id == Fixture.id).where(
+                and_(
+                    team.in_(team_ids),
+                    Fixture.season.in_(seasons),
+                    Fixture.status == 'finished',
+                    xg_for.isnot(None),
+                    xg_against.isnot(None)
+                )
+            )
+
+        sides = union_all(
+            side(Fixture.home_team_id, MatchStats.home_xg, MatchStats.away_xg),
+            side(Fixture.away_team_id, MatchStats.away_xg, MatchStats.home_xg)
+        ).subquery()
+
+        rows = (await self.session.execute(
+            select(
+                sides.c.team_id, sides.c.season, func.avg(sides.c.xg_for), func.avg(sides.c.xg_against)
+            ).group_by(sides.c.team_id, sides.c.season)
+        )).all()
+        return {(team_id, season): (xg_for, xg_against) for team_id, season, xg_for, xg_against in rows}
+
+    async def _load_injuries(self, team_ids: Set[int], active_only: bool = True) -> Dict[int, list]:
+        conditions = [Injury.team_id.in_(team_ids)]
+        if active_only:
+            conditions.append(Injury.status == 'active')
+        rows = (await self.session.execute(
+            select(Injury).where(and_(*conditions))
+        )).scalars().all()
+        injuries = {}
+        for injury in rows:
+            injuries.setdefault(injury.team_id, []).append(injury)
+        return injuries
+
+    async def _load_suspensions(self, team_ids: Set[int], active_only: bool = True) -> Dict[int, list]:
+        conditions = [Suspension.team_id.in_(team_ids)]
+        if active_only:
+            conditions += [Suspension.status == 'active', Suspension.matches_remaining > 0]
+        rows = (await self.session.execute(
+            select(Suspension).where(and_(*conditions))
+        )).scalars().all()
+        suspensions = {}
+        for suspension in rows:
+            suspensions.setdefault(suspension.team_id, []).append(suspension)
+        return suspensions
+
+    # ============= FEATURES =============
+
+    def _team_strength_features(self, home_stats: Optional[TeamStats], away_stats: Optional[TeamStats]) -> Dict:
+        """Extract team strength features (ELO, goals)"""
+
+        # Elo lives on the season stats row (maintained by the Elo engine)
+        home_elo = float(home_stats.elo_rating) if home_stats and home_stats.elo_rating is not None else INITIAL_RATING
+        away_elo = float(away_stats.elo_rating) if away_stats and away_stats.elo_rating is not None else INITIAL_RATING
 
         return {
-            'home_elo': float(home_team.elo_rating),
-            'away_elo': float(away_team.elo_rating),
-            'elo_diff': float(home_team.elo_rating - away_team.elo_rating),
+            'home_elo': home_elo,
+            'away_elo': away_elo,
+            'elo_diff': home_elo - away_elo,
 
             'home_goals_scored_avg': (
                 float(home_stats.goals_scored / home_stats.matches_played)
-                if home_stats and home_stats.matches_played > 0 else 0.0
+                if home_stats and home_stats.matches_played else 0.0
             ),
             'home_goals_conceded_avg': (
                 float(home_stats.goals_conceded / home_stats.matches_played)
-                if home_stats and home_stats.matches_played > 0 else 0.0
+                if home_stats and home_stats.matches_played else 0.0
             ),
             'away_goals_scored_avg': (
                 float(away_stats.goals_scored / away_stats.matches_played)
-                if away_stats and away_stats.matches_played > 0 else 0.0
+                if away_stats and away_stats.matches_played else 0.0
             ),
             'away_goals_conceded_avg': (
                 float(away_stats.goals_conceded / away_stats.matches_played)
-                if away_stats and away_stats.matches_played > 0 else 0.0
+                if away_stats and away_stats.matches_played else 0.0
             ),
         }
 
-    async def _get_home_advantage_features(self, fixture: Fixture) -> Dict:
-        """Extract home advantage features"""
-
-        if not fixture.stadium_id:
-            return {
-                'stadium_home_advantage': 1.0,
-                'home_win_rate_home': 0.0,
-                'away_win_rate_away': 0.0,
-            }
-
-        # Get stadium
-        stadium_stmt = select(Stadium).where(Stadium.id == fixture.stadium_id)
-        stadium = (await self.session.execute(stadium_stmt)).scalar_one_or_none()
-
-        # Get home team performance at home
-        home_fixtures_stmt = select(Fixture).where(
-            and_(
-                Fixture.home_team_id == fixture.home_team_id,
-                Fixture.season == fixture.season,
-                Fixture.status == 'finished',
-                Fixture.id != fixture.id
-            )
-        ).limit(10)
-        home_fixtures = (await self.session.execute(home_fixtures_stmt)).scalars().all()
-
-        home_wins = sum(
-            1 for f in home_fixtures
-            if f.home_score is not None and f.away_score is not None and f.home_score > f.away_score
-        )
-        home_win_rate = home_wins / len(home_fixtures) if home_fixtures else 0.0
-
-        # Get away team performance away
-        away_fixtures_stmt = select(Fixture).where(
-            and_(
-                Fixture.away_team_id == fixture.away_team_id,
-                Fixture.season == fixture.season,
-                Fixture.status == 'finished',
-                Fixture.id != fixture.id
-            )
-        ).limit(10)
-        away_fixtures = (await self.session.execute(away_fixtures_stmt)).scalars().all()
-
-        away_wins = sum(
-            1 for f in away_fixtures
-            if f.home_score is not None and f.away_score is not None and f.away_score > f.home_score
-        )
-        away_win_rate = away_wins / len(away_fixtures) if away_fixtures else 0.0
-
+    def _home_advantage_features(self, home_venue: list, away_venue: list) -> Dict:
+        """Extract home advantage features (home team at home, away team away)"""
         return {
-            'stadium_home_advantage': float(stadium.home_advantage_factor) if stadium else 1.0,
-            'home_win_rate_home': home_win_rate,
-            'away_win_rate_away': away_win_rate,
+            # Fixtures are not linked to stadiums in the schema yet
+            'stadium_home_advantage': 1.0,
+            'home_win_rate_home': win_rate(home_venue),
+            'away_win_rate_away': win_rate(away_venue),
         }
 
-    async def _get_form_features(self, fixture: Fixture) -> Dict:
+    def _form_features(self, home_last5: list, away_last5: list) -> Dict:
         """Extract recent form features (last 5 matches)"""
 
-        # Home team last 5 matches
-        home_last5_stmt = select(Fixture).where(
-            or_(
-                Fixture.home_team_id == fixture.home_team_id,
-                Fixture.away_team_id == fixture.home_team_id
-            ),
-            Fixture.status == 'finished',
-            Fixture.match_date < fixture.match_date,
-            Fixture.id != fixture.id
-        ).order_by(desc(Fixture.match_date)).limit(5)
-
-        home_last5 = (await self.session.execute(home_last5_stmt)).scalars().all()
-
-        home_form_points = self._calculate_form_points(home_last5, fixture.home_team_id)
-
-        # Away team last 5 matches
-        away_last5_stmt = select(Fixture).where(
-            or_(
-                Fixture.home_team_id == fixture.away_team_id,
-                Fixture.away_team_id == fixture.away_team_id
-            ),
-            Fixture.status == 'finished',
-            Fixture.match_date < fixture.match_date,
-            Fixture.id != fixture.id
-        ).order_by(desc(Fixture.match_date)).limit(5)
-
-        away_last5 = (await self.session.execute(away_last5_stmt)).scalars().all()
-
-        away_form_points = self._calculate_form_points(away_last5, fixture.away_team_id)
+        home_form_points = weighted_form_points(home_last5)
+        away_form_points = weighted_form_points(away_last5)
 
         return {
             'home_form_points': home_form_points,
@@ -236,82 +650,32 @@ class FeatureExtractor:
             'form_diff': home_form_points - away_form_points,
         }
 
-    def _calculate_form_points(self, fixtures: list, team_id: int) -> float:
-        """Calculate weighted form points for a team"""
-        if not fixtures:
-            return 0.0
-
-        total_points = 0.0
-        total_weight = 0.0
-
-        for i, match in enumerate(fixtures):
-            # Exponential decay weight (recent matches more important)
-            weight = np.exp(-0.2 * i)
-
-            # Determine result
-            is_home = match.home_team_id == team_id
-
-            if is_home:
-                goals_for = match.home_score or 0
-                goals_against = match.away_score or 0
-            else:
-                goals_for = match.away_score or 0
-                goals_against = match.home_score or 0
-
-            # Points
-            if goals_for > goals_against:
-                points = 3
-            elif goals_for == goals_against:
-                points = 1
-            else:
-                points = 0
-
-            total_points += points * weight
-            total_weight += weight
-
-        return total_points / total_weight if total_weight > 0 else 0.0
+    def _team_results(self, fixtures: list, team_id: int) -> List[Tuple[Optional[int], Optional[int]]]:
+        """(goals_for, goals_against) of a team in each fixture"""
+        return [
+            (f.home_score, f.away_score) if f.home_team_id == team_id else (f.away_score, f.home_score)
+            for f in fixtures
+        ]
 
-    async def _get_injury_features(self, fixture: Fixture) -> Dict:
+    def _injury_features(self, fixture: Fixture, home_injuries: list, away_injuries: list) -> Dict:
         """Extract injury severity features"""
 
-        # Home team injuries
-        home_injuries_stmt = select(Injury).where(
-            and_(
-                Injury.team_id == fixture.home_team_id,
-                Injury.status == 'active',
-                or_(
-                    Injury.expected_return_date.is_(None),
-                    Injury.expected_return_date > fixture.match_date.date()
-                )
-            )
-        )
-        home_injuries = (await self.session.execute(home_injuries_stmt)).scalars().all()
-
-        # Away team injuries
-        away_injuries_stmt = select(Injury).where(
-            and_(
-                Injury.team_id == fixture.away_team_id,
-                Injury.status == 'active',
-                or_(
-                    Injury.expected_return_date.is_(None),
-                    Injury.expected_return_date > fixture.match_date.date()
-                )
-            )
-        )
-        away_injuries = (await self.session.execute(away_injuries_stmt)).scalars().all()
-
-        severity_weights = {
-            'minor': 5,
-            'moderate': 15,
-            'major': 30,
-            'severe': 50
-        }
+        # Only injuries still running at kick-off
+        match_day = fixture.match_date.date()
+        home_injuries = [
+            inj for inj in home_injuries
+            if inj.expected_return_date is None or inj.expected_return_date > match_day
+        ]
+        away_injuries = [
+            inj for inj in away_injuries
+            if inj.expected_return_date is None or inj.expected_return_date > match_day
+        ]
 
         home_injury_score = sum(
-            severity_weights.get(inj.severity, 0) for inj in home_injuries
+            self.INJURY_SEVERITY_WEIGHTS.get(inj.severity, 0) for inj in home_injuries
         )
         away_injury_score = sum(
-            severity_weights.get(inj.severity, 0) for inj in away_injuries
+            self.INJURY_SEVERITY_WEIGHTS.get(inj.severity, 0) for inj in away_injuries
         )
 
         return {
@@ -321,54 +685,20 @@ class FeatureExtractor:
             'away_injuries_count': len(away_injuries),
         }
 
-    async def _get_suspension_features(self, fixture: Fixture) -> Dict:
+    def _suspension_features(self, home_suspensions: list, away_suspensions: list) -> Dict:
         """Extract suspension features"""
-
-        # Home team suspensions
-        home_suspensions_stmt = select(Suspension).where(
-            and_(
-                Suspension.team_id == fixture.home_team_id,
-                Suspension.status == 'active',
-                Suspension.matches_remaining > 0
-            )
-        )
-        home_suspensions = (await self.session.execute(home_suspensions_stmt)).scalars().all()
-
-        # Away team suspensions
-        away_suspensions_stmt = select(Suspension).where(
-            and_(
-                Suspension.team_id == fixture.away_team_id,
-                Suspension.status == 'active',
-                Suspension.matches_remaining > 0
-            )
-        )
-        away_suspensions = (await self.session.execute(away_suspensions_stmt)).scalars().all()
-
         return {
             'home_suspensions_count': len(home_suspensions),
             'away_suspensions_count': len(away_suspensions),
         }
 
-    async def _get_h2h_features(self, fixture: Fixture) -> Dict:
-        """Extract head-to-head features"""
-
-        # Get last 10 H2H matches
-        h2h_stmt = select(Fixture).where(
-            or_(
-                and_(
-                    Fixture.home_team_id == fixture.home_team_id,
-                    Fixture.away_team_id == fixture.away_team_id
-                ),
-                and_(
-                    Fixture.home_team_id == fixture.away_team_id,
-                    Fixture.away_team_id == fixture.home_team_id
-                )
-            ),
-            Fixture.status == 'finished',
-            Fixture.match_date < fixture.match_date
-        ).order_by(desc(Fixture.match_date)).limit(10)
+    def _h2h_features(self, fixture: Fixture, h2h_matches: list) -> Dict:
+        """
+        Extract head-to-head features (last 10 meetings).
 
-        h2h_matches = (await self.session.execute(h2h_stmt)).scalars().all()
+        `h2h_matches` holds (home_team_id, home_score, away_score) per
+        meeting, most recent first.
+        """
 
         if not h2h_matches:
             return {
@@ -383,27 +713,27 @@ class FeatureExtractor:
         away_wins = 0
         total_goals = 0
 
-        for match in h2h_matches:
-            if match.home_score is None or match.away_score is None:
+        for home_team_id, home_score, away_score in h2h_matches:
+            if home_score is None or away_score is None:
                 continue
 
             # Determine from perspective of current fixture's home team
-            if match.home_team_id == fixture.home_team_id:
-                if match.home_score > match.away_score:
+            if home_team_id == fixture.home_team_id:
+                if home_score > away_score:
                     home_wins += 1
-                elif match.home_score == match.away_score:
+                elif home_score == away_score:
                     draws += 1
                 else:
                     away_wins += 1
             else:
-                if match.away_score > match.home_score:
+                if away_score > home_score:
                     home_wins += 1
-                elif match.home_score == match.away_score:
+                elif home_score == away_score:
                     draws += 1
                 else:
                     away_wins += 1
 
-            total_goals += match.home_score + match.away_score
+            total_goals += home_score + away_score
 
         return {
             'h2h_home_wins': home_wins,
@@ -412,66 +742,21 @@ class FeatureExtractor:
             'h2h_avg_goals': total_goals / len(h2h_matches) if h2h_matches else 0.0,
         }
 
-    async def _get_advanced_stats_features(self, fixture: Fixture) -> Dict:
-        """Extract advanced statistics (xG) if available"""
-
-        # Get home team xG stats
-        home_stats_stmt = select(TeamStats).where(
-            and_(
-                TeamStats.team_id == fixture.home_team_id,
-                TeamStats.season == fixture.season
-            )
-        )
-        home_stats = (await self.session.execute(home_stats_stmt)).scalar_one_or_none()
-
-        # Get away team xG stats
-        away_stats_stmt = select(TeamStats).where(
-            and_(
-                TeamStats.team_id == fixture.away_team_id,
-                TeamStats.season == fixture.season
-            )
-        )
-        away_stats = (await self.session.execute(away_stats_stmt)).scalar_one_or_none()
-
+    def _advanced_stats_features(self, home_xg: Optional[Tuple], away_xg: Optional[Tuple]) -> Dict:
+        """Extract advanced statistics (xG per game) if available"""
         return {
-            'home_xg_per_game': (
-                float(home_stats.xg_for / home_stats.matches_played)
-                if home_stats and home_stats.matches_played > 0 else 0.0
-            ),
-            'away_xg_per_game': (
-                float(away_stats.xg_for / away_stats.matches_played)
-                if away_stats and away_stats.matches_played > 0 else 0.0
-            ),
-            'home_xga_per_game': (
-                float(home_stats.xg_against / home_stats.matches_played)
-                if home_stats and home_stats.matches_played > 0 else 0.0
-            ),
-            'away_xga_per_game': (
-                float(away_stats.xg_against / away_stats.matches_played)
-                if away_stats and away_stats.matches_played > 0 else 0.0
-            ),
+            'home_xg_per_game': float(home_xg[0]) if home_xg else 0.0,
+            'away_xg_per_game': float(away_xg[0]) if away_xg else 0.0,
+            'home_xga_per_game': float(home_xg[1]) if home_xg else 0.0,
+            'away_xga_per_game': float(away_xg[1]) if away_xg else 0.0,
         }
 
-    async def _get_context_features(self, fixture: Fixture) -> Dict:
+    def _context_features(self, home_team: Optional[Team], away_team: Optional[Team]) -> Dict:
         """Extract context features (derby, top6 clash, etc.)"""
 
-        # Derby check (same city)
-        home_team_stmt = select(Team).where(Team.id == fixture.home_team_id)
-        home_team = (await self.session.execute(home_team_stmt)).scalar_one()
-
-        away_team_stmt = select(Team).where(Team.id == fixture.away_team_id)
-        away_team = (await self.session.execute(away_team_stmt)).scalar_one()
-
-        # Simple derby detection (TODO: improve with city mapping)
-        derby_pairs = [
-            ('Inter', 'AC Milan'),
-            ('Roma', 'Lazio'),
-            ('Juventus', 'Torino'),
-        ]
-
-        is_derby = any(
+        is_derby = bool(home_team and away_team) and any(
             (home_team.name in pair and away_team.name in pair)
-            for pair in derby_pairs
+            for pair in self.DERBY_PAIRS
         )
 
         return {
@@ -0,0 +1,270 @@
+"""
+Team Feature Store
+Per-team, per-season rolling aggregates maintained match by match
+
+Each `TeamFeatures` row holds the running totals of one team in one season
+(home/away splits, goals and xG for/against, clean sheets, streaks) and
+short lists of its latest results, so the form and venue features are read
+from one row per team instead of being recomputed from fixture history.
+
+A finished fixture is applied once, in O(1), to the rows of both teams
+(see `_update_team_features` in the sync tasks). The result lists and the
+streaks carry over from a team's previous season, like the form lookback
+they serve.
+
+Result entries are `[fixture_id, date, goals_for, goals_against]` with the
+date as a naive-UTC ISO string, most recent first.
+
+Rows are trusted once the store has been backfilled from the whole
+fixture history: `rebuild_team_features` records a `DataSyncLog` marker
+(see `backfill_log`), and the first incremental update on a database
+without one runs the backfill instead. From then on every writer of
+results keeps the store current through `update_feature_stores`, and
+`reconcile_feature_stores` checks the match counts against fixture
+history out of band.
+"""
+
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import and_, select
+
+from app.db.models import DataSyncLog
+
+# Results kept for the form features (any venue, across seasons)
+RECENT_MATCHES = 10
+# Results kept per venue for the home/away win rates (current season)
+VENUE_MATCHES = 10
+# Matches the weighted form points are computed over
+FORM_MATCHES = 5
+
+# DataSyncLog provider/resource recording a completed backfill of the store
+BACKFILL_PROVIDER = 'backfill'
+TEAM_FEATURES_RESOURCE = 'team_features'
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Aware datetimes converted to naive UTC, so they compare with SQLite values"""
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def match_points(goals_for: int, goals_against: int) -> int:
+    if goals_for > goals_against:
+        return 3
+    return 1 if goals_for == goals_against else 0
+
+
+def weighted_form_points(results: Sequence[Tuple[Optional[int], Optional[int]]]) -> float:
+    """
+    Exponentially weighted points per match (recent matches count more).
+
+    Args:
+        results: (goals_for, goals_against) per match, most recent first
+            (missing scores count as 0)
+
+    Returns:
+        Weighted average points (0 when there are no results)
+    """
+    if not results:
+        return 0.0
+
+    total_points = 0.0
+    total_weight = 0.0
+
+    for i, (goals_for, goals_against) in enumerate(results):
+        # Exponential decay weight (recent matches more important)
+        weight = np.exp(-0.2 * i)
+        total_points += match_points(goals_for or 0, goals_against or 0) * weight
+        total_weight += weight
+
+    return total_points / total_weight if total_weight > 0 else 0.0
+
+
+def win_rate(results: Sequence[Tuple[Optional[int], Optional[int]]]) -> float:
+    """Share of results won (matches without a score count as not won)"""
+    if not results:
+        return 0.0
+    wins = sum(
+        1 for goals_for, goals_against in results
+        if goals_for is not None and goals_against is not None and goals_for > goals_against
+    )
+    return wins / len(results)
+
+
+@dataclass
+class TeamFeatureState:
+    """
+    Rolling aggregates of one team in one season.
+
+    Field names match the `TeamFeatures` columns.
+    """
+    team_id: int
+    season: str
+    matches_played: int = 0
+    home_played: int = 0
+    home_wins: int = 0
+    home_draws: int = 0
+    home_losses: int = 0
+    away_played: int = 0
+    away_wins: int = 0
+    away_draws: int = 0
+    away_losses: int = 0
+    goals_for: int = 0
+    goals_against: int = 0
+    home_goals_for: int = 0
+    home_goals_against: int = 0
+    away_goals_for: int = 0
+    away_goals_against: int = 0
+    xg_for: float = 0.0
+    xg_against: float = 0.0
+    xg_matches: int = 0
+    clean_sheets: int = 0
+    failed_to_score: int = 0
+    win_streak: int = 0
+    unbeaten_streak: int = 0
+    winless_streak: int = 0
+    form_points: float = 0.0
+    last_match_date: Optional[datetime] = None
+    recent: List[list] = field(default_factory=list)
+    recent_home: List[list] = field(default_factory=list)
+    recent_away: List[list] = field(default_factory=list)
+    fixture_ids: List[int] = field(default_factory=list)
+
+    @classmethod
+    def new_season(
+        cls,
+        team_id: int,
+        season: str,
+        previous: Optional['TeamFeatureState'] = None
+    ) -> 'TeamFeatureState':
+        """Empty season, carrying recent results and streaks from `previous`"""
+        state = cls(team_id=team_id, season=season)
+        if previous is not None:
+            state.recent = [list(entry) for entry in previous.recent]
+            state.win_streak = previous.win_streak
+            state.unbeaten_streak = previous.unbeaten_streak
+            state.winless_streak = previous.winless_streak
+            state.form_points = previous.form_points
+            state.last_match_date = previous.last_match_date
+        return state
+
+    @classmethod
+    def from_row(cls, row) -> 'TeamFeatureState':
+        """State held by a `TeamFeatures` row"""
+        state = cls(team_id=row.team_id, season=row.season)
+        for f in fields(cls):
+            value = getattr(row, f.name)
+            if value is not None:
+                setattr(state, f.name, list(value) if isinstance(value, list) else value)
+        return state
+
+    def as_dict(self) -> Dict:
+        """Column values (fresh lists, so ORM attribute changes are detected)"""
+        values = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            values[f.name] = [list(v) if isinstance(v, list) else v for v in value] if isinstance(value, list) else value
+        return values
+
+    def apply(
+        self,
+        fixture_id: int,
+        date: datetime,
+        is_home: bool,
+        goals_for: int,
+        goals_against: int,
+        xg_for: Optional[float] = None,
+        xg_against: Optional[float] = None
+    ) -> bool:
+        """
+        Add one finished match of this team (O(1)).
+
+        Matches should arrive in date order; an older match is still counted
+        and slotted into the result lists, but does not move the streaks.
+
+        Returns:
+            False if the fixture had already been applied
+        """
+        if fixture_id in self.fixture_ids:
+            return False
+        self.fixture_ids.append(fixture_id)
+
+        date = naive_utc(date)
+        is_latest = self.last_match_date is None or date >= naive_utc(self.last_match_date)
+        points = match_points(goals_for, goals_against)
+        venue = 'home' if is_home else 'away'
+
+        self.matches_played += 1
+        setattr(self, f'{venue}_played', getattr(self, f'{venue}_played') + 1)
+        outcome = {3: 'wins', 1: 'draws', 0: 'losses'}[points]
+        setattr(self, f'{venue}_{outcome}', getattr(self, f'{venue}_{outcome}') + 1)
+
+        self.goals_for += goals_for
+        self.goals_against += goals_against
+        setattr(self, f'{venue}_goals_for', getattr(self, f'{venue}_goals_for') + goals_for)
+        setattr(self, f'{venue}_goals_against', getattr(self, f'{venue}_goals_against') + goals_against)
+        self.clean_sheets += int(goals_against == 0)
+        self.failed_to_score += int(goals_for == 0)
+
+        if xg_for is not None and xg_against is not None:
+            self.xg_for += float(xg_for)
+            self.xg_against += float(xg_against)
+            self.xg_matches += 1
+
+        if is_latest:
+            self.win_streak = self.win_streak + 1 if points == 3 else 0
+            self.unbeaten_streak = self.unbeaten_streak + 1 if points > 0 else 0
+            self.winless_streak = self.winless_streak + 1 if points < 3 else 0
+            self.last_match_date = date
+
+        entry = [fixture_id, date.isoformat(), goals_for, goals_against]
+        self.recent = _insert_result(self.recent, entry, RECENT_MATCHES)
+        if is_home:
+            self.recent_home = _insert_result(self.recent_home, entry, VENUE_MATCHES)
+        else:
+            self.recent_away = _insert_result(self.recent_away, entry, VENUE_MATCHES)
+
+        self.form_points = weighted_form_points(self.recent_results(FORM_MATCHES))
+        return True
+
+    def recent_results(self, n: int = FORM_MATCHES, venue: Optional[str] = None) -> List[Tuple[int, int]]:
+        """
+        Latest (goals_for, goals_against), most recent first.
+
+        Args:
+            n: Number of results
+            venue: 'home' or 'away' for this season's venue split (None = any)
+        """
+        entries = {None: self.recent, 'home': self.recent_home, 'away': self.recent_away}[venue]
+        return [(goals_for, goals_against) for _, _, goals_for, goals_against in entries[:n]]
+
+
+def _insert_result(entries: List[list], entry: list, limit: int) -> List[list]:
+    """Insert a result keeping the list most-recent-first and at most `limit` long"""
+    entries = entries + [entry]
+    entries.sort(key=lambda e: (e[1], e[0]), reverse=True)
+    return entries[:limit]
+
+
+def backfill_log(resource: str, records: int) -> DataSyncLog:
+    """Marker that `resource` was rebuilt from the whole fixture history"""
+    now = datetime.utcnow()
+    return DataSyncLog(
+        provider=BACKFILL_PROVIDER,
+        resource_type=resource,
+        status='success',
+        records_synced=records,
+        started_at=now,
+        completed_at=now
+    )
+
+
+async def backfilled_resources(session) -> Set[str]:
+    """Resources with a backfill marker (only these are kept complete incrementally)"""
+    return set((await session.execute(
+        select(DataSyncLog.resource_type).where(
+            and_(DataSyncLog.provider == BACKFILL_PROVIDER, DataSyncLog.status == 'success')
+        ).distinct()
+    )).scalars().all())
@@ -0,0 +1,459 @@
+"""
+Fixture History
+Process-local columnar snapshot of finished fixtures
+
+Finished fixtures are held as NumPy columns sorted by (kick-off, id): date,
+season code, home/away team ids, scores and xG (NaN when missing). A CSR
+style index (`team_offsets` into `team_rows`) lists every team's rows in
+date order, so a team's matches before a date are one slice plus a binary
+search, and standings are a handful of `np.bincount` calls. A season of
+380 fixtures takes about 21 KB.
+
+`FixtureHistory.refresh` loads everything once per process, then only the
+fixtures whose `last_synced_at` moved since the previous refresh, merging
+them into a new snapshot that replaces the old one in a single assignment
+(readers keep a consistent `FixtureColumns`).
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import and_, select
+
+from app.db.models import Fixture, FixtureStatus, MatchStats
+from app.services.feature_store import naive_utc
+
+logger = logging.getLogger(__name__)
+
+# Synced rows re-read before the watermark, so a transaction that committed
+# late with an earlier `last_synced_at` is still picked up (merging is idempotent)
+SYNC_OVERLAP = timedelta(minutes=5)
+
+
+def as_datetime64(value: datetime) -> np.datetime64:
+    """Kick-off as a naive-UTC datetime64[us] (the snapshot's date unit)"""
+    return np.datetime64(naive_utc(value), 'us')
+
+
+@dataclass(frozen=True)
+class FixtureColumns:
+    """
+    Immutable columnar snapshot of finished fixtures.
+
+    Fixture columns are aligned and sorted by (date, fixture_id); `season`
+    holds indices into `seasons`. The rows of team `team_ids[k]` are
+    `team_rows[team_offsets[k]:team_offsets[k + 1]]`, oldest first.
+    """
+    fixture_id: np.ndarray      # int64
+    date: np.ndarray            # datetime64[us], naive UTC
+    season: np.ndarray          # int16 index into `seasons`
+    home_team_id: np.ndarray    # int32
+    away_team_id: np.ndarray    # int32
+    home_score: np.ndarray      # int16
+    away_score: np.ndarray      # int16
+    home_xg: np.ndarray         # float64, NaN when missing
+    away_xg: np.ndarray         # float64, NaN when missing
+    seasons: Tuple[str, ...]
+    team_ids: np.ndarray        # int32, sorted
+    team_offsets: np.ndarray    # int64, len(team_ids) + 1
+    team_rows: np.ndarray       # int32
+
+    @classmethod
+    def build(
+        cls,
+        fixture_id: np.ndarray,
+        date: np.ndarray,
+        season: np.ndarray,
+        seasons: Sequence[str],
+        home_team_id: np.ndarray,
+        away_team_id: np.ndarray,
+        home_score: np.ndarray,
+        away_score: np.ndarray,
+        home_xg: np.ndarray,
+        away_xg: np.ndarray
+    ) -> 'FixtureColumns':
+        """Snapshot of unsorted columns (sorts them and builds the team index)"""
+        order = np.lexsort((fixture_id, date))
+        home_team_id = np.asarray(home_team_id, dtype=np.int32)[order]
+        away_team_id = np.asarray(away_team_id, dtype=np.int32)[order]
+
+        n = len(order)
+        teams = np.concatenate((home_team_id, away_team_id))
+        rows = np.concatenate((np.arange(n), np.arange(n)))
+        by_team = np.lexsort((rows, teams))
+        team_ids, starts = np.unique(teams[by_team], return_index=True)
+
+        return cls(
+            fixture_id=np.asarray(fixture_id, dtype=np.int64)[order],
+            date=np.asarray(date, dtype='datetime64[us]')[order],
+            season=np.asarray(season, dtype=np.int16)[order],
+            home_team_id=home_team_id,
+            away_team_id=away_team_id,
+            home_score=np.asarray(home_score, dtype=np.int16)[order],
+            away_score=np.asarray(away_score, dtype=np.int16)[order],
+            home_xg=np.asarray(home_xg, dtype=np.float64)[order],
+            away_xg=np.asarray(away_xg, dtype=np.float64)[order],
+            seasons=tuple(seasons),
+            team_ids=team_ids.astype(np.int32),
+            team_offsets=np.append(starts, 2 * n).astype(np.int64),
+            team_rows=rows[by_team].astype(np.int32),
+        )
+
+    @classmethod
+    def from_records(cls, records: Sequence[tuple]) -> 'FixtureColumns':
+        """
+        Snapshot of (fixture_id, season, match_date, home_team_id,
+        away_team_id, home_score, away_score, home_xg, away_xg) tuples.
+        """
+        seasons = sorted({r[1] for r in records})
+        season_codes = {season: i for i, season in enumerate(seasons)}
+        n = len(records)
+
+        def column(i, dtype, convert=None):
+            values = (r[i] for r in records)
+            return np.fromiter(map(convert, values) if convert else values, dtype=dtype, count=n)
+
+        def xg(value):
+            return np.nan if value is None else value
+
+        return cls.build(
+            fixture_id=column(0, np.int64),
+            date=np.array([naive_utc(r[2]) for r in records], dtype='datetime64[us]'),
+            season=column(1, np.int16, season_codes.__getitem__),
+            seasons=seasons,
+            home_team_id=column(3, np.int32),
+            away_team_id=column(4, np.int32),
+            home_score=column(5, np.int16),
+            away_score=column(6, np.int16),
+            home_xg=column(7, np.float64, xg),
+            away_xg=column(8, np.float64, xg),
+        )
+
+    @classmethod
+    def empty(cls) -> 'FixtureColumns':
+        return cls.from_records([])
+
+    def merge(self, other: 'FixtureColumns', removed: Sequence[int] = ()) -> 'FixtureColumns':
+        """
+        Snapshot with `other`'s fixtures added or replaced.
+
+        Args:
+            other: Changed finished fixtures (replace rows with the same id)
+            removed: Fixture ids to drop (e.g. no longer finished)
+        """
+        keep = ~np.isin(self.fixture_id, np.concatenate((other.fixture_id, np.asarray(removed, dtype=np.int64))))
+        seasons = sorted(set(self.seasons) | set(other.seasons))
+        codes = {season: i for i, season in enumerate(seasons)}
+
+        def recode(columns: 'FixtureColumns') -> np.ndarray:
+            mapping = np.array([codes[s] for s in columns.seasons], dtype=np.int16)
+            return mapping[columns.season] if len(mapping) else columns.season
+
+        def combined(name: str) -> np.ndarray:
+            return np.concatenate((getattr(self, name)[keep], getattr(other, name)))
+
+        return FixtureColumns.build(
+            fixture_id=combined('fixture_id'),
+            date=combined('date'),
+            season=np.concatenate((recode(self)[keep], recode(other))),
+            seasons=seasons,
+            home_team_id=combined('home_team_id'),
+            away_team_id=combined('away_team_id'),
+            home_score=combined('home_score'),
+            away_score=combined('away_score'),
+            home_xg=combined('home_xg'),
+            away_xg=combined('away_xg'),
+        )
+
+    def __len__(self) -> int:
+        return len(self.fixture_id)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the arrays"""
+        return sum(getattr(self, f.name).nbytes for f in fields(self) if isinstance(getattr(self, f.name), np.ndarray))
+
+    def team_rows_for(
+        self,
+        team_id: int,
+        before: Optional[datetime] = None,
+        season: Optional[str] = None,
+        venue: Optional[str] = None,
+        exclude: Optional[int] = None,
+        last: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Row indices of a team's matches, most recent first.
+
+        Args:
+            team_id: Team ID
+            before: Only matches kicking off strictly before this time
+            season: Only matches of this season
+            venue: 'home' or 'away' to keep one side only
+            exclude: Fixture ID to leave out
+            last: Keep at most this many rows
+
+        Returns:
+            int32 row indices into the fixture columns
+        """
+        k = int(np.searchsorted(self.team_ids, team_id))
+        if k == len(self.team_ids) or self.team_ids[k] != team_id:
+            return np.empty(0, dtype=np.int32)
+        rows = self.team_rows[self.team_offsets[k]:self.team_offsets[k + 1]]
+
+        if before is not None:
+            rows = rows[:np.searchsorted(self.date[rows], as_datetime64(before), side='left')]
+
+        mask = np.ones(len(rows), dtype=bool)
+        if season is not None:
+            if season not in self.seasons:
+                return np.empty(0, dtype=np.int32)
+            mask &= self.season[rows] == self.seasons.index(season)
+        if venue == 'home':
+            mask &= self.home_team_id[rows] == team_id
+        elif venue == 'away':
+            mask &= self.away_team_id[rows] == team_id
+        if exclude is not None:
+            mask &= self.fixture_id[rows] != exclude
+
+        rows = rows[mask][::-1]
+        return rows if last is None else rows[:last]
+
+    def goals(self, rows: np.ndarray, team_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(goals_for, goals_against) of a team over some of its rows"""
+        is_home = self.home_team_id[rows] == team_id
+        return (
+            np.where(is_home, self.home_score[rows], self.away_score[rows]),
+            np.where(is_home, self.away_score[rows], self.home_score[rows]),
+        )
+
+    def team_results(self, team_id: int, **filters) -> List[Tuple[int, int]]:
+        """
+        A team's (goals_for, goals_against), most recent first.
+
+        Args:
+            team_id: Team ID
+            **filters: before, season, venue, exclude and last as in `team_rows_for`
+        """
+        goals_for, goals_against = self.goals(self.team_rows_for(team_id, **filters), team_id)
+        return list(zip(goals_for.tolist(), goals_against.tolist()))
+
+    def meetings(
+        self,
+        team1_id: int,
+        team2_id: int,
+        before: Optional[datetime] = None,
+        last: Optional[int] = None
+    ) -> List[Tuple[int, int, int]]:
+        """(home_team_id, home_score, away_score) of the pair's meetings, most recent first"""
+        rows = self.team_rows_for(team1_id, before=before)
+        rows = rows[(self.home_team_id[rows] == team2_id) | (self.away_team_id[rows] == team2_id)]
+        if last is not None:
+            rows = rows[:last]
+        return list(zip(
+            self.home_team_id[rows].tolist(), self.home_score[rows].tolist(), self.away_score[rows].tolist()
+        ))
+
+    def xg_average(self, team_id: int, season: str) -> Optional[Tuple[float, float]]:
+        """Season xG for/against per game over the matches with xG (None if none)"""
+        rows = self.team_rows_for(team_id, season=season)
+        is_home = self.home_team_id[rows] == team_id
+        xg_for = np.where(is_home, self.home_xg[rows], self.away_xg[rows])
+        xg_against = np.where(is_home, self.away_xg[rows], self.home_xg[rows])
+        valid = ~(np.isnan(xg_for) | np.isnan(xg_against))
+        if not valid.any():
+            return None
+        return float(xg_for[valid].mean()), float(xg_against[valid].mean())
+
+    def standings(self, season: str, before: Optional[datetime] = None) -> List[Dict]:
+        """
+        League table of a season from its finished fixtures.
+
+        Args:
+            season: Season label (e.g. "2025-2026")
+            before: Only fixtures kicking off strictly before this time
+
+        Returns:
+            One dictionary per team that played (team_id, played, won, drawn,
+            lost, goals_for, goals_against, goal_difference, points), sorted
+            by points, goal difference, goals scored, then team id
+        """
+        if season not in self.seasons:
+            return []
+        mask = self.season == self.seasons.index(season)
+        if before is not None:
+            mask &= self.date < as_datetime64(before)
+
+        home, away = self.home_team_id[mask], self.away_team_id[mask]
+        home_goals, away_goals = self.home_score[mask].astype(np.int64), self.away_score[mask].astype(np.int64)
+        teams = np.union1d(home, away)
+        home_idx, away_idx = np.searchsorted(teams, home), np.searchsorted(teams, away)
+
+        def per_team(home_values, away_values) -> np.ndarray:
+            return (
+                np.bincount(home_idx, weights=home_values, minlength=len(teams)) +
+                np.bincount(away_idx, weights=away_values, minlength=len(teams))
+            ).astype(np.int64)
+
+        ones = np.ones(len(home))
+        played = per_team(ones, ones)
+        won = per_team(home_goals > away_goals, away_goals > home_goals)
+        drawn = per_team(home_goals == away_goals, home_goals == away_goals)
+        goals_for = per_team(home_goals, away_goals)
+        goals_against = per_team(away_goals, home_goals)
+        goal_difference = goals_for - goals_against
+        points = 3 * won + drawn
+
+        order = np.lexsort((teams, -goals_for, -goal_difference, -points))
+        return [
+            {
+                'team_id': int(teams[i]),
+                'played': int(played[i]),
+                'won': int(won[i]),
+                'drawn': int(drawn[i]),
+                'lost': int(played[i] - won[i] - drawn[i]),
+                'goals_for': int(goals_for[i]),
+                'goals_against': int(goals_against[i]),
+                'goal_difference': int(goal_difference[i]),
+                'points': int(points[i]),
+            }
+            for i in order.tolist()
+        ]
+
+    def training_matches(self, team_names: Dict[int, str]) -> List[Dict]:
+        """
+        Match dictionaries for model fitting, oldest first.
+
+        Args:
+            team_names: {team_id: name} (the model is keyed by team name)
+
+        Returns:
+            Dictionaries with home_team/away_team names and ids, scores,
+            date, season and, when the home xG is known, home_xg/away_xg
+        """
+        has_xg = ~np.isnan(self.home_xg)
+        matches = []
+        for fixture_id, date, season, home, away, home_score, away_score, home_xg, away_xg, xg in zip(
+            self.fixture_id.tolist(), self.date.tolist(), self.season.tolist(),
+            self.home_team_id.tolist(), self.away_team_id.tolist(),
+            self.home_score.tolist(), self.away_score.tolist(),
+            self.home_xg.tolist(), self.away_xg.tolist(), has_xg.tolist()
+        ):
+            match = {
+                'fixture_id': fixture_id,
+                'home_team': team_names.get(home),
+                'away_team': team_names.get(away),
+                'home_team_id': home,
+                'away_team_id': away,
+                'home_score': home_score,
+                'away_score': away_score,
+                'date': date,
+                'season': self.seasons[season],
+            }
+            if xg:
+                match['home_xg'] = home_xg
+                match['away_xg'] = None if np.isnan(away_xg) else away_xg
+            matches.append(match)
+        return matches
+
+
+def _history_query(*conditions):
+    """Snapshot columns of fixtures with their xG, plus status and sync time"""
+    return select(
+        Fixture.id,
+        Fixture.season,
+        Fixture.match_date,
+        Fixture.home_team_id,
+        Fixture.away_team_id,
+        Fixture.home_score,
+        Fixture.away_score,
+        MatchStats.home_xg,
+        MatchStats.away_xg,
+        Fixture.status,
+        Fixture.last_synced_at
+    ).outerjoin(MatchStats, MatchStats.fixture_id == Fixture.id).where(and_(*conditions))
+
+
+def _is_finished(row) -> bool:
+    return row.status == FixtureStatus.FINISHED and row.home_score is not None and row.away_score is not None
+
+
+class FixtureHistory:
+    """
+    Incrementally refreshed `FixtureColumns` of one process.
+    """
+
+    def __init__(self):
+        self.columns = FixtureColumns.empty()
+        self.synced_until: Optional[datetime] = None
+        self.loaded = False
+
+    async def refresh(self, session, full: bool = False) -> FixtureColumns:
+        """
+        Bring the snapshot up to date.
+
+        The first call (or `full=True`) loads every finished fixture; later
+        calls only read fixtures whose `last_synced_at` is past the watermark
+        (minus SYNC_OVERLAP).
+
+        Args:
+            session: Async database session
+            full: Reload everything
+
+        Returns:
+            The current snapshot
+        """
+        start = time.perf_counter()
+        started_at = datetime.utcnow()
+        incremental = self.loaded and not full and self.synced_until is not None
+
+        if incremental:
+            query = _history_query(Fixture.last_synced_at >= self.synced_until - SYNC_OVERLAP)
+        else:
+            query = _history_query(
+                Fixture.status == FixtureStatus.FINISHED,
+                Fixture.home_score.isnot(None),
+                Fixture.away_score.isnot(None)
+            )
+        rows = (await session.execute(query)).all()
+
+        changed = FixtureColumns.from_records([tuple(row[:9]) for row in rows if _is_finished(row)])
+        if incremental:
+            removed = [row.id for row in rows if not _is_finished(row)]
+            columns = self.columns.merge(changed, removed) if rows else self.columns
+        else:
+            columns = changed
+
+        # Watermark: latest sync time seen (the load time when no row has one)
+        synced = [naive_utc(row.last_synced_at) for row in rows if row.last_synced_at is not None]
+        if incremental:
+            synced.append(self.synced_until)
+        self.synced_until = max(synced) if synced else started_at
+
+        self.columns = columns
+        self.loaded = True
+
+        logger.info(
+            f"Fixture history {'refreshed' if incremental else 'loaded'}: {len(rows)} rows read, "
+            f"{len(columns)} fixtures ({columns.nbytes / 1024:.1f} KB) in {time.perf_counter() - start:.3f}s"
+        )
+        return columns
+
+
+# Singleton instance
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_fixture_history() -> FixtureHistory:
+    """Get fixture history singleton instance"""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = FixtureHistory()
+    return _history
@@ -0,0 +1,211 @@
+"""
+Head-to-Head Index
+Per team-pair meeting aggregates maintained match by match
+
+Each `HeadToHead` row covers one unordered pair of teams, keyed by
+(team_a_id, team_b_id) with team_a_id < team_b_id, so the H2H record of a
+fixture is a single primary-key lookup in either orientation. Rows hold the
+all-time wins, draws and goals of the pair plus its latest meetings; a
+finished fixture is applied once, in O(1) (see `_update_head_to_head` in
+the sync tasks).
+
+Meeting entries are `[fixture_id, date, home_team_id, home_score, away_score]`
+with the date as a naive-UTC ISO string, most recent first.
+
+Like the team feature store, rows are trusted once the index has been
+backfilled (marker `HEAD_TO_HEAD_RESOURCE`), so every writer of results
+must go through `update_feature_stores` in the sync tasks; before that,
+readers replay history. `reconcile_feature_stores` checks the match
+counts against fixture history out of band and rebuilds on disagreement.
+"""
+
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import and_, case, func, or_, select
+
+from app.db.models import Fixture, HeadToHead
+from app.services.feature_store import backfilled_resources, naive_utc
+
+# DataSyncLog resource recording a completed backfill of the index
+HEAD_TO_HEAD_RESOURCE = 'head_to_head'
+
+# Meetings kept per pair (the H2H features look at the last 10)
+RECENT_MEETINGS = 10
+
+
+def pair_key(team1_id: int, team2_id: int) -> Tuple[int, int]:
+    """Primary key of a team pair (lower id first)"""
+    return (team1_id, team2_id) if team1_id < team2_id else (team2_id, team1_id)
+
+
+@dataclass
+class HeadToHeadState:
+    """
+    Meeting aggregates of one team pair.
+
+    Field names match the `HeadToHead` columns; "a" is the lower team id.
+    """
+    team_a_id: int
+    team_b_id: int
+    matches: int = 0
+    team_a_wins: int = 0
+    draws: int = 0
+    team_b_wins: int = 0
+    team_a_goals: int = 0
+    team_b_goals: int = 0
+    last_match_date: Optional[datetime] = None
+    recent: List[list] = field(default_factory=list)
+    fixture_ids: List[int] = field(default_factory=list)
+
+    @classmethod
+    def from_row(cls, row) -> 'HeadToHeadState':
+        """State held by a `HeadToHead` row"""
+        state = cls(team_a_id=row.team_a_id, team_b_id=row.team_b_id)
+        for f in fields(cls):
+            value = getattr(row, f.name)
+            if value is not None:
+                setattr(state, f.name, list(value) if isinstance(value, list) else value)
+        return state
+
+    def as_dict(self) -> Dict:
+        """Column values (fresh lists, so ORM attribute changes are detected)"""
+        values = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            values[f.name] = [list(v) if isinstance(v, list) else v for v in value] if isinstance(value, list) else value
+        return values
+
+    def apply(
+        self,
+        fixture_id: int,
+        date: datetime,
+        home_team_id: int,
+        home_score: int,
+        away_score: int
+    ) -> bool:
+        """
+        Add one finished meeting (O(1)).
+
+        Returns:
+            False if the fixture had already been applied
+        """
+        if fixture_id in self.fixture_ids:
+            return False
+        self.fixture_ids.append(fixture_id)
+
+        date = naive_utc(date)
+        if home_team_id == self.team_a_id:
+            a_goals, b_goals = home_score, away_score
+        else:
+            a_goals, b_goals = away_score, home_score
+
+        self.matches += 1
+        self.team_a_goals += a_goals
+        self.team_b_goals += b_goals
+        if a_goals > b_goals:
+            self.team_a_wins += 1
+        elif a_goals < b_goals:
+            self.team_b_wins += 1
+        else:
+            self.draws += 1
+
+        if self.last_match_date is None or date >= naive_utc(self.last_match_date):
+            self.last_match_date = date
+
+        self.recent = self.recent + [[fixture_id, date.isoformat(), home_team_id, home_score, away_score]]
+        self.recent.sort(key=lambda e: (e[1], e[0]), reverse=True)
+        self.recent = self.recent[:RECENT_MEETINGS]
+        return True
+
+
+def meetings(recent: Optional[List[list]], limit: int = RECENT_MEETINGS) -> List[Tuple[int, int, int]]:
+    """(home_team_id, home_score, away_score) of the latest meetings, most recent first"""
+    return [(home_team_id, home_score, away_score) for _, _, home_team_id, home_score, away_score in (recent or [])[:limit]]
+
+
+def h2h_summary(row, team_id: int) -> Dict:
+    """
+    Pair record from one team's perspective.
+
+    Args:
+        row: `HeadToHead` row (or HeadToHeadState)
+        team_id: Team whose wins/goals are reported first
+
+    Returns:
+        Dictionary with opponent_id, matches, wins, draws, losses,
+        goals_for, goals_against and the latest meetings
+    """
+    is_a = team_id == row.team_a_id
+    return {
+        'team_id': team_id,
+        'opponent_id': row.team_b_id if is_a else row.team_a_id,
+        'matches': row.matches or 0,
+        'wins': (row.team_a_wins if is_a else row.team_b_wins) or 0,
+        'draws': row.draws or 0,
+        'losses': (row.team_b_wins if is_a else row.team_a_wins) or 0,
+        'goals_for': (row.team_a_goals if is_a else row.team_b_goals) or 0,
+        'goals_against': (row.team_b_goals if is_a else row.team_a_goals) or 0,
+        'last_match_date': row.last_match_date,
+        'recent': [
+            {
+                'fixture_id': fixture_id,
+                'date': date,
+                'home_team_id': home_team_id,
+                'home_score': home_score,
+                'away_score': away_score,
+            }
+            for fixture_id, date, home_team_id, home_score, away_score in (row.recent or [])
+        ],
+    }
+
+
+def _finished_meetings(*conditions):
+    return and_(
+        Fixture.status == 'finished',
+        Fixture.home_score.isnot(None),
+        Fixture.away_score.isnot(None),
+        *conditions
+    )
+
+
+async def count_meetings(session) -> Dict[Tuple[int, int], int]:
+    """
+    Finished meetings per pair key, from fixture history.
+
+    Scans every finished fixture, so it is only meant for the
+    reconciliation task, never for the read path.
+    """
+    team_a = case((Fixture.home_team_id < Fixture.away_team_id, Fixture.home_team_id), else_=Fixture.away_team_id)
+    team_b = case((Fixture.home_team_id < Fixture.away_team_id, Fixture.away_team_id), else_=Fixture.home_team_id)
+    rows = (await session.execute(
+        select(team_a, team_b, func.count()).where(_finished_meetings()).group_by(team_a, team_b)
+    )).all()
+    return {(a, b): count for a, b, count in rows}
+
+
+async def load_head_to_head(session, team1_id: int, team2_id: int) -> Union[HeadToHead, HeadToHeadState]:
+    """
+    Record of a pair: the index row once the index has been backfilled
+    (a pair without a row has never met), otherwise a state replayed from
+    the pair's finished fixtures.
+    """
+    key = pair_key(team1_id, team2_id)
+    if HEAD_TO_HEAD_RESOURCE in await backfilled_resources(session):
+        row = await session.get(HeadToHead, key)
+        return row if row is not None else HeadToHeadState(*key)
+
+    fixtures = (await session.execute(
+        select(Fixture).where(
+            _finished_meetings(or_(
+                and_(Fixture.home_team_id == team1_id, Fixture.away_team_id == team2_id),
+                and_(Fixture.home_team_id == team2_id, Fixture.away_team_id == team1_id)
+            ))
+        ).order_by(Fixture.match_date.asc(), Fixture.id.asc())
+    )).scalars().all()
+
+    state = HeadToHeadState(*key)
+    for f in fixtures:
+        state.apply(f.id, f.match_date, f.home_team_id, f.home_score, f.away_score)
+    return state
@@ -176,7 +176,8 @@ class APIFootballAdapter(BaseDataProvider):
                 home_score=goals['home'],
                 away_score=goals['away'],
                 venue=fixture['venue']['name'] if fixture.get('venue') else None,
-                round=league.get('round')
+                round=league.get('round'),
+                elapsed=fixture['status'].get('elapsed')
             ))
 
         logger.info(f"Retrieved {len(fixtures)} live fixtures from API-Football")
@@ -21,6 +21,7 @@ class MatchData:
     away_score: Optional[int] = None
     venue: Optional[str] = None
     round: Optional[str] = None
+    elapsed: Optional[int] = None  # Match minute, for live fixtures
 
 
 @dataclass
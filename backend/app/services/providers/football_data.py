@@ -383,7 +383,8 @@ class FootballDataAdapter(BaseDataProvider):
                 home_score=home_score,
                 away_score=away_score,
                 venue=match_data.get("venue"),
-                round=round_str
+                round=round_str,
+                elapsed=int(match_data["minute"]) if str(match_data.get("minute") or "").isdigit() else None
             )
 
         except Exception as e:
@@ -58,6 +58,12 @@ celery_app.conf.beat_schedule = {
         'schedule': crontab(minute='*'),  # Every minute
     },
 
+    # Feature stores vs. fixture history (results written out of band)
+    'reconcile-feature-stores': {
+        'task': 'app.tasks.sync_tasks.reconcile_feature_stores',
+        'schedule': crontab(hour=4, minute=0),  # 4 AM daily
+    },
+
     # Post-match evaluation
     'evaluate-predictions': {
         'task': 'app.tasks.prediction_tasks.evaluate_finished_matches',
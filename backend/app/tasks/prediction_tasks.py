@@ -3,7 +3,8 @@ Celery Tasks for Prediction Generation and Evaluation
 """
 
 from celery import shared_task
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, delete, update
+from sqlalchemy.orm import selectinload
 from datetime import datetime, timedelta
 import logging
 import asyncio
@@ -12,16 +13,24 @@ import numpy as np
 from app.tasks.celery_app import celery_app
 from app.db import models
 from app.db.engine import AsyncSessionLocal
-from app.ml.dixon_coles import DixonColesModel
 from app.ml.evaluation import PredictionEvaluator
+from app.ml.online_metrics import OVERALL, MetricTotals, load_metric_totals, record_evaluations
+from app.ml.registry import get_model_registry
+from app.ml.train import TrainingPipeline
 from app.services.feature_extraction import FeatureExtractor
+from app.services.fixture_history import get_fixture_history
 from app.config import get_settings
-import os
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ml", "saved_models", "dixon_coles_latest.pkl")
+# Incremental retrains requested by the live sync are coalesced: one
+# DataSyncLog row marks a retrain as queued, and the task runs after a
+# delay so every fixture finishing within it is covered by a single refit
+RETRAIN_PROVIDER = 'model'
+RETRAIN_RESOURCE = 'incremental_retrain'
+RETRAIN_DEBOUNCE_SECONDS = 15 * 60
+RETRAIN_STALE_AFTER = timedelta(hours=2)  # A queued marker older than this was lost
 
 
 def run_async(coroutine):
@@ -30,6 +39,66 @@ def run_async(coroutine):
     return loop.run_until_complete(coroutine)
 
 
+def _build_prediction_records(
+    fixture_id: int,
+    prediction: dict,
+    features: dict,
+    model_version: str
+):
+    """
+    Build the Prediction row and its FeatureSnapshot audit record.
+
+    Args:
+        fixture_id: Database ID of the fixture
+        prediction: Output of predict_match (or one row of predict_matches)
+        features: Output of FeatureExtractor.extract_features
+        model_version: Version of the model that produced the prediction
+
+    Returns:
+        (Prediction, FeatureSnapshot) tuple, not yet added to the session
+    """
+    new_prediction = models.Prediction(
+        fixture_id=fixture_id,
+        model_version=model_version,
+        prob_home_win=float(prediction['prob_home_win']),
+        prob_draw=float(prediction['prob_draw']),
+        prob_away_win=float(prediction['prob_away_win']),
+        prob_over_25=float(prediction['prob_over_25']),
+        prob_under_25=float(prediction['prob_under_25']),
+        prob_btts_yes=float(prediction['prob_btts_yes']),
+        prob_btts_no=float(prediction['prob_btts_no']),
+        expected_home_goals=float(prediction['expected_home_goals']),
+        expected_away_goals=float(prediction['expected_away_goals']),
+        most_likely_score=str(prediction['most_likely_score']),
+        confidence_score=float(max(
+            prediction['prob_home_win'],
+            prediction['prob_draw'],
+            prediction['prob_away_win']
+        )),
+        created_at=datetime.utcnow()
+    )
+
+    feature_snapshot = models.FeatureSnapshot(
+        prediction=new_prediction,
+        home_elo_rating=features.get('home_elo', 1500),
+        away_elo_rating=features.get('away_elo', 1500),
+        home_form_last5=features.get('home_form_last5', 0),
+        away_form_last5=features.get('away_form_last5', 0),
+        home_goals_scored_avg=features.get('home_goals_scored_avg', 0),
+        away_goals_scored_avg=features.get('away_goals_scored_avg', 0),
+        home_goals_conceded_avg=features.get('home_goals_conceded_avg', 0),
+        away_goals_conceded_avg=features.get('away_goals_conceded_avg', 0),
+        home_injuries_count=features.get('home_injuries_count', 0),
+        away_injuries_count=features.get('away_injuries_count', 0),
+        h2h_home_wins=features.get('h2h_home_wins', 0),
+        h2h_draws=features.get('h2h_draws', 0),
+        h2h_away_wins=features.get('h2h_away_wins', 0),
+        snapshot_timestamp=datetime.utcnow()
+    )
+
+    return new_prediction, feature_snapshot
+
+
 @shared_task(bind=True, max_retries=3)
 def generate_predictions(self, fixture_id: int, force_regenerate: bool = False):
     """
@@ -54,13 +123,20 @@ def generate_predictions(self, fixture_id: int, force_regenerate: bool = False):
                     logger.error(f"Fixture {fixture_id} not found")
                     return
 
+                # Active model (loaded once per process, reloaded when retrained)
+                entry = get_model_registry().get()
+
+                if entry is None:
+                    logger.warning("Model not fitted and no saved model found. Skipping prediction.")
+                    return
+
                 # Check if prediction already exists
                 pred_stmt = select(models.Prediction).where(
                     and_(
                         models.Prediction.fixture_id == fixture_id,
-                        models.Prediction.model_version == '1.0'  # TODO: Get from config
+                        models.Prediction.model_version == entry.version
                     )
-                ).order_by(models.Prediction.created_at.desc())
+                ).order_by(models.Prediction.created_at.desc()).limit(1)
 
                 existing_pred = (await session.execute(pred_stmt)).scalar_one_or_none()
 
@@ -69,30 +145,17 @@ def generate_predictions(self, fixture_id: int, force_regenerate: bool = False):
                     return
 
                 # Extract features
-                feature_extractor = FeatureExtractor(session)
+                history = await get_fixture_history().refresh(session)
+                feature_extractor = FeatureExtractor(session, history)
                 features = await feature_extractor.extract_features(fixture_id)
 
-                # Load ML model
-                model = DixonColesModel()
-                if os.path.exists(MODEL_PATH):
-                    try:
-                        model = DixonColesModel.load(MODEL_PATH)
-                        logger.info(f"Loaded trained model from {MODEL_PATH}")
-                    except Exception as e:
-                        logger.error(f"Failed to load model: {e}")
-                
-                # Check if model is fitted
-                if not model._is_fitted:
-                    logger.warning("Model not fitted and no saved model found. Skipping prediction.")
-                    return
-
                 # Generate prediction
                 home_form_factor = features.get('home_form_factor', 1.0)
                 away_form_factor = features.get('away_form_factor', 1.0)
 
                 # Safe prediction (handle new teams)
                 try:
-                    prediction = model.predict_match(
+                    prediction = entry.table.lookup(
                         fixture.home_team.name,
                         fixture.away_team.name,
                         home_form_factor=home_form_factor,
@@ -103,49 +166,11 @@ def generate_predictions(self, fixture_id: int, force_regenerate: bool = False):
                     # Fallback or skip
                     return
 
-                # Save prediction to database
-                new_prediction = models.Prediction(
-                    fixture_id=fixture_id,
-                    model_version='1.2.0-xg',
-                    prob_home_win=prediction['prob_home_win'],
-                    prob_draw=prediction['prob_draw'],
-                    prob_away_win=prediction['prob_away_win'],
-                    prob_over_25=prediction['prob_over_25'],
-                    prob_under_25=prediction['prob_under_25'],
-                    prob_btts_yes=prediction['prob_btts_yes'],
-                    prob_btts_no=prediction['prob_btts_no'],
-                    expected_home_goals=prediction['expected_home_goals'],
-                    expected_away_goals=prediction['expected_away_goals'],
-                    most_likely_score=prediction['most_likely_score'],
-                    confidence_score=max(
-                        prediction['prob_home_win'],
-                        prediction['prob_draw'],
-                        prediction['prob_away_win']
-                    ),
-                    created_at=datetime.utcnow()
+                # Save prediction and feature snapshot for audit trail
+                new_prediction, feature_snapshot = _build_prediction_records(
+                    fixture_id, prediction, features, entry.version
                 )
-
                 session.add(new_prediction)
-
-                # Save feature snapshot for audit trail
-                feature_snapshot = models.FeatureSnapshot(
-                    prediction=new_prediction,
-                    home_elo_rating=features.get('home_elo', 1500),
-                    away_elo_rating=features.get('away_elo', 1500),
-                    home_form_last5=features.get('home_form_last5', 0),
-                    away_form_last5=features.get('away_form_last5', 0),
-                    home_goals_scored_avg=features.get('home_goals_scored_avg', 0),
-                    away_goals_scored_avg=features.get('away_goals_scored_avg', 0),
-                    home_goals_conceded_avg=features.get('home_goals_conceded_avg', 0),
-                    away_goals_conceded_avg=features.get('away_goals_conceded_avg', 0),
-                    home_injuries_count=features.get('home_injuries_count', 0),
-                    away_injuries_count=features.get('away_injuries_count', 0),
-                    h2h_home_wins=features.get('h2h_home_wins', 0),
-                    h2h_draws=features.get('h2h_draws', 0),
-                    h2h_away_wins=features.get('h2h_away_wins', 0),
-                    snapshot_timestamp=datetime.utcnow()
-                )
-
                 session.add(feature_snapshot)
                 await session.commit()
 
@@ -163,6 +188,95 @@ def generate_predictions(self, fixture_id: int, force_regenerate: bool = False):
         raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
 
 
+async def request_incremental_retrain(session) -> bool:
+    """
+    Mark an incremental retrain as queued unless one already is.
+
+    The marker is added to the caller's session, so it is committed with
+    the results that triggered it.
+
+    Returns:
+        True if the caller should queue `retrain_model` (after committing)
+    """
+    pending = (await session.execute(
+        select(models.DataSyncLog.id)
+        .where(
+            and_(
+                models.DataSyncLog.provider == RETRAIN_PROVIDER,
+                models.DataSyncLog.resource_type == RETRAIN_RESOURCE,
+                models.DataSyncLog.status == 'queued',
+                models.DataSyncLog.started_at >= datetime.utcnow() - RETRAIN_STALE_AFTER
+            )
+        )
+        .limit(1)
+    )).first()
+    if pending is not None:
+        return False
+
+    session.add(models.DataSyncLog(
+        provider=RETRAIN_PROVIDER,
+        resource_type=RETRAIN_RESOURCE,
+        status='queued',
+        started_at=datetime.utcnow()
+    ))
+    return True
+
+
+async def _set_retrain_status(from_status: str, to_status: str, **values) -> None:
+    """Move the incremental retrain markers from one status to another"""
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(models.DataSyncLog)
+            .where(
+                and_(
+                    models.DataSyncLog.provider == RETRAIN_PROVIDER,
+                    models.DataSyncLog.resource_type == RETRAIN_RESOURCE,
+                    models.DataSyncLog.status == from_status
+                )
+            )
+            .values(status=to_status, **values)
+        )
+        await session.commit()
+
+
+@shared_task
+def retrain_model(incremental: bool = True):
+    """
+    Refit the model on all finished matches and save a new artifact.
+
+    With incremental=True the fit is warm-started from the previous artifact,
+    which is cheap enough to run right after a matchday's results are synced.
+    Workers pick up the new artifact through the model registry.
+
+    The queued marker is claimed before fitting, so fixtures finishing
+    while this retrain runs queue the next one.
+    """
+    try:
+        logger.info(f"Retraining model (incremental={incremental})")
+
+        async def _retrain():
+            await _set_retrain_status('queued', 'running')
+            try:
+                report = await TrainingPipeline(incremental=incremental).run()
+            except Exception as exc:
+                await _set_retrain_status(
+                    'running', 'failed', error_message=str(exc), completed_at=datetime.utcnow()
+                )
+                raise
+            await _set_retrain_status(
+                'running', 'success', records_synced=report.get('n_matches', 0), completed_at=datetime.utcnow()
+            )
+            return report
+
+        report = run_async(_retrain())
+        logger.info(f"✅ Retraining completed: {report}")
+        return report
+
+    except Exception as exc:
+        logger.error(f"Error retraining model: {str(exc)}")
+        raise
+
+
 @shared_task
 def evaluate_finished_matches():
     """
@@ -172,7 +286,7 @@ def evaluate_finished_matches():
     1. Finds matches that finished in the last 6 hours
     2. Compares predictions against actual results
     3. Calculates accuracy metrics
-    4. Stores evaluation results
+    4. Stores evaluation results and adds them to the running metric sums
     """
     try:
         logger.info("Starting evaluation of finished matches")
@@ -201,6 +315,7 @@ def evaluate_finished_matches():
 
                 evaluator = PredictionEvaluator()
                 evaluated_count = 0
+                new_evaluations = []
 
                 for fixture in finished_fixtures:
                     try:
@@ -288,6 +403,17 @@ def evaluate_finished_matches():
 
                         session.add(evaluation)
                         evaluated_count += 1
+                        new_evaluations.append((
+                            prediction.model_version,
+                            fixture.home_team_id,
+                            fixture.away_team_id,
+                            evaluation.evaluated_at.date().isoformat(),
+                            MetricTotals.from_evaluation(
+                                probs, actual_outcome_idx,
+                                is_correct_over_under, is_correct_btts,
+                                brier_over_under, brier_btts
+                            )
+                        ))
 
                         result_emoji = "✅" if is_correct_1x2 else "❌"
                         logger.info(
@@ -300,9 +426,13 @@ def evaluate_finished_matches():
                     except Exception as e:
                         logger.error(f"Error evaluating fixture {fixture.id}: {str(e)}")
                         await session.rollback()
+                        # The rollback discarded the evaluations added so far
+                        new_evaluations.clear()
+                        evaluated_count = 0
                         continue
 
-                # Commit all evaluations
+                # Commit all evaluations together with their metric sums
+                await record_evaluations(session, new_evaluations)
                 await session.commit()
 
                 logger.info(f"✅ Evaluated {evaluated_count} predictions successfully")
@@ -319,58 +449,106 @@ def evaluate_finished_matches():
 
 async def _calculate_aggregate_metrics(session):
     """
-    Calculate and log aggregate performance metrics.
+    Log aggregate performance metrics for the last 30 days.
+
+    Read from the running sums kept by `record_evaluations` (at most one
+    row per day), not recomputed from the evaluations.
     """
     try:
-        # Get all evaluations from last 30 days
-        cutoff = datetime.utcnow() - timedelta(days=30)
-
-        stmt = select(models.PredictionEvaluation).where(
-            models.PredictionEvaluation.evaluated_at >= cutoff
-        )
-
-        evaluations = (await session.execute(stmt)).scalars().all()
+        totals = (await load_metric_totals(session, OVERALL, days=30)).get('')
 
-        if not evaluations:
+        if totals is None or not totals.n_evaluated:
             return
 
-        # Calculate metrics
-        total = len(evaluations)
-        correct_1x2 = sum(1 for e in evaluations if e.is_correct_1x2)
-        correct_over_under = sum(1 for e in evaluations if e.is_correct_over_under)
-        correct_btts = sum(1 for e in evaluations if e.is_correct_btts)
-
-        accuracy_1x2 = correct_1x2 / total
-        accuracy_over_under = correct_over_under / total
-        accuracy_btts = correct_btts / total
-
-        avg_brier_1x2 = np.mean([e.brier_score_1x2 for e in evaluations])
-        avg_brier_over_under = np.mean([e.brier_score_over_under for e in evaluations])
-        avg_brier_btts = np.mean([e.brier_score_btts for e in evaluations])
+        metrics = totals.summary()
 
         logger.info("=" * 50)
         logger.info("📊 PERFORMANCE METRICS (Last 30 days)")
         logger.info("=" * 50)
-        logger.info(f"Total predictions evaluated: {total}")
-        logger.info(f"1X2 Accuracy: {accuracy_1x2:.2%}")
-        logger.info(f"Over/Under Accuracy: {accuracy_over_under:.2%}")
-        logger.info(f"BTTS Accuracy: {accuracy_btts:.2%}")
-        logger.info(f"1X2 Brier Score: {avg_brier_1x2:.4f}")
-        logger.info(f"Over/Under Brier: {avg_brier_over_under:.4f}")
-        logger.info(f"BTTS Brier: {avg_brier_btts:.4f}")
+        logger.info(f"Total predictions evaluated: {metrics['n_evaluated']}")
+        logger.info(f"1X2 Accuracy: {metrics['accuracy_1x2']:.2%}")
+        logger.info(f"Over/Under Accuracy: {metrics['accuracy_over_under']:.2%}")
+        logger.info(f"BTTS Accuracy: {metrics['accuracy_btts']:.2%}")
+        logger.info(f"1X2 Brier Score: {metrics['brier_1x2']:.4f}")
+        logger.info(f"Over/Under Brier: {metrics['brier_over_under']:.4f}")
+        logger.info(f"BTTS Brier: {metrics['brier_btts']:.4f}")
+        logger.info(f"1X2 Log Loss: {metrics['log_loss_1x2']:.4f}")
+        logger.info(f"1X2 RPS: {metrics['rps_1x2']:.4f}")
+        logger.info(f"1X2 ECE: {metrics['expected_calibration_error']:.4f}")
         logger.info("=" * 50)
 
     except Exception as e:
         logger.error(f"Error calculating aggregate metrics: {str(e)}")
 
 
+@shared_task
+def rebuild_prediction_metrics():
+    """
+    Backfill the running metric sums from every stored evaluation.
+    """
+    outcome_idx = {'home': 0, 'draw': 1, 'away': 2}
+
+    async def _rebuild():
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(
+                select(
+                    models.Prediction.model_version,
+                    models.Prediction.prob_home_win,
+                    models.Prediction.prob_draw,
+                    models.Prediction.prob_away_win,
+                    models.Fixture.home_team_id,
+                    models.Fixture.away_team_id,
+                    models.PredictionEvaluation.actual_outcome_1x2,
+                    models.PredictionEvaluation.is_correct_over_under,
+                    models.PredictionEvaluation.is_correct_btts,
+                    models.PredictionEvaluation.brier_score_over_under,
+                    models.PredictionEvaluation.brier_score_btts,
+                    models.PredictionEvaluation.evaluated_at
+                ).join(
+                    models.Prediction, models.PredictionEvaluation.prediction_id == models.Prediction.id
+                ).join(
+                    models.Fixture, models.Prediction.fixture_id == models.Fixture.id
+                )
+            )).all()
+
+            evaluations = [
+                (
+                    r.model_version,
+                    r.home_team_id,
+                    r.away_team_id,
+                    r.evaluated_at.date().isoformat(),
+                    MetricTotals.from_evaluation(
+                        (r.prob_home_win, r.prob_draw, r.prob_away_win),
+                        outcome_idx[r.actual_outcome_1x2],
+                        r.is_correct_over_under, r.is_correct_btts,
+                        r.brier_score_over_under, r.brier_score_btts
+                    )
+                )
+                for r in rows
+                if r.actual_outcome_1x2 in outcome_idx and r.evaluated_at is not None
+            ]
+
+            await session.execute(delete(models.PredictionMetrics))
+            cells = await record_evaluations(session, evaluations)
+            await session.commit()
+
+            logger.info(f"Rebuilt {cells} metric cells from {len(evaluations)} evaluations")
+            return len(evaluations)
+
+    return run_async(_rebuild())
+
+
 @shared_task(bind=True)
-def batch_generate_predictions(self, season: str = "2025-2026"):
+def batch_generate_predictions(self, season: str = "2025-2026", force_regenerate: bool = False):
     """
     Generate predictions for all upcoming fixtures in the next 7 days.
 
+    The model is loaded once and every fixture is scored in a single
+    vectorized `predict_matches` call.
+
     Args:
         season: Season to process (default: 2025-2026)
+        force_regenerate: If True, regenerate even if prediction exists
     """
     try:
         logger.info(f"Generating predictions for upcoming fixtures in season {season}")
@@ -381,7 +559,10 @@ def batch_generate_predictions(self, season: str = "2025-2026"):
                 now = datetime.utcnow()
                 week_from_now = now + timedelta(days=7)
 
-                stmt = select(models.Fixture).where(
+                stmt = select(models.Fixture).options(
+                    selectinload(models.Fixture.home_team),
+                    selectinload(models.Fixture.away_team)
+                ).where(
                     and_(
                         models.Fixture.season == season,
                         models.Fixture.match_date.between(now, week_from_now),
@@ -397,10 +578,62 @@ def batch_generate_predictions(self, season: str = "2025-2026"):
 
                 logger.info(f"Found {len(fixtures)} upcoming fixtures")
 
-                # Queue individual prediction tasks
+                entry = get_model_registry().get()
+                if entry is None:
+                    logger.warning("Model not fitted and no saved model found. Skipping predictions.")
+                    return
+                model = entry.model
+
+                if not force_regenerate:
+                    existing_stmt = select(models.Prediction.fixture_id).where(
+                        and_(
+                            models.Prediction.fixture_id.in_([f.id for f in fixtures]),
+                            models.Prediction.model_version == entry.version
+                        )
+                    )
+                    existing_ids = set((await session.execute(existing_stmt)).scalars().all())
+                    fixtures = [f for f in fixtures if f.id not in existing_ids]
+
+                # Collect features for every fixture the model can score
+                scorable = []
                 for fixture in fixtures:
-                    generate_predictions.delay(fixture.id)
-                    logger.info(f"Queued prediction task for fixture {fixture.id}")
+                    if (fixture.home_team.name not in model.attack_params or
+                            fixture.away_team.name not in model.attack_params):
+                        logger.warning(f"Could not predict fixture {fixture.id}: team not in fitted model")
+                        continue
+                    scorable.append(fixture)
+
+                # One batched extraction for the whole window
+                history = await get_fixture_history().refresh(session)
+                features_by_fixture = await FeatureExtractor(session, history).extract_features_batch(
+                    [f.id for f in scorable]
+                )
+                to_score = [(f, features_by_fixture[f.id]) for f in scorable if f.id in features_by_fixture]
+
+                if not to_score:
+                    logger.info("No fixtures to predict")
+                    return
+
+                predictions = model.predict_matches(
+                    [f.home_team.name for f, _ in to_score],
+                    [f.away_team.name for f, _ in to_score],
+                    form_factors=[
+                        [features.get('home_form_factor', 1.0), features.get('away_form_factor', 1.0)]
+                        for _, features in to_score
+                    ]
+                )
+
+                for idx, (fixture, features) in enumerate(to_score):
+                    prediction = {key: values[idx] for key, values in predictions.items()}
+                    new_prediction, feature_snapshot = _build_prediction_records(
+                        fixture.id, prediction, features, entry.version
+                    )
+                    session.add(new_prediction)
+                    session.add(feature_snapshot)
+
+                await session.commit()
+
+                logger.info(f"✅ Saved predictions for {len(to_score)} fixtures")
 
         run_async(_batch_generate())
 
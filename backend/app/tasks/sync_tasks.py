@@ -3,8 +3,10 @@ Celery Tasks for Data Synchronization
 """
 
 from celery import shared_task
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, and_, or_, func, delete, insert, update, tuple_, union_all
+from sqlalchemy.orm import selectinload
 from datetime import datetime, timedelta
+from typing import Dict, List, Optional
 import logging
 import asyncio
 
@@ -24,6 +26,778 @@ def run_async(coroutine):
     return loop.run_until_complete(coroutine)
 
 
+async def _refresh_live_predictions(session, elapsed_by_fixture: Dict[int, Optional[int]]) -> int:
+    """
+    Recompute in-play predictions for live fixtures in one batch and upsert
+    one LivePrediction row per fixture.
+
+    Pre-match rates come from the fixture's latest stored prediction, or
+    from the active model's prediction table when there is none.
+
+    Returns:
+        Number of live predictions written
+    """
+    from app.ml.live import estimate_elapsed_minute, live_predictions
+    from app.ml.registry import get_model_registry
+
+    if not elapsed_by_fixture:
+        return 0
+
+    entry = get_model_registry().get()
+    if entry is None:
+        logger.warning("No model loaded, skipping live predictions")
+        return 0
+
+    fixtures = (await session.execute(
+        select(models.Fixture)
+        .options(selectinload(models.Fixture.home_team), selectinload(models.Fixture.away_team))
+        .where(models.Fixture.id.in_(list(elapsed_by_fixture)))
+    )).scalars().all()
+
+    prematch = {}
+    for prediction in (await session.execute(
+        select(models.Prediction)
+        .where(models.Prediction.fixture_id.in_(list(elapsed_by_fixture)))
+        .order_by(models.Prediction.created_at.asc())
+    )).scalars().all():
+        prematch[prediction.fixture_id] = (prediction.expected_home_goals, prediction.expected_away_goals)
+
+    rows = []
+    for fixture in fixtures:
+        rates = prematch.get(fixture.id)
+        if rates is None or None in rates:
+            pairing = (fixture.home_team.name, fixture.away_team.name)
+            if pairing not in entry.table:
+                continue
+            i = entry.table.team_to_idx[pairing[0]]
+            j = entry.table.team_to_idx[pairing[1]]
+            rates = (float(entry.table.lambdas[i, j]), float(entry.table.mus[i, j]))
+
+        minute = elapsed_by_fixture[fixture.id]
+        if minute is None:
+            minute = estimate_elapsed_minute(fixture.match_date)
+
+        rows.append((fixture, rates, minute))
+
+    if not rows:
+        return 0
+
+    results = live_predictions(
+        [rates[0] for _, rates, _ in rows],
+        [rates[1] for _, rates, _ in rows],
+        [fixture.home_score or 0 for fixture, _, _ in rows],
+        [fixture.away_score or 0 for fixture, _, _ in rows],
+        [minute for _, _, minute in rows],
+        rho=entry.model.rho
+    )
+
+    existing = {
+        live.fixture_id: live
+        for live in (await session.execute(
+            select(models.LivePrediction)
+            .where(models.LivePrediction.fixture_id.in_([fixture.id for fixture, _, _ in rows]))
+        )).scalars().all()
+    }
+
+    for (fixture, _, minute), result in zip(rows, results):
+        live = existing.get(fixture.id)
+        if live is None:
+            live = models.LivePrediction(fixture_id=fixture.id)
+            session.add(live)
+
+        live.model_version = entry.version
+        live.minute = int(minute)
+        live.home_score = fixture.home_score or 0
+        live.away_score = fixture.away_score or 0
+        for key, value in result.items():
+            setattr(live, key, value)
+
+    return len(rows)
+
+
+def _strength_row(team_id: int, fixture_id: Optional[int], state) -> Dict:
+    """TeamStrength column values for a StrengthState"""
+    return {
+        'team_id': team_id,
+        'fixture_id': fixture_id,
+        'as_of': state.as_of,
+        'attack': state.attack,
+        'defense': state.defense,
+        'attack_var': state.attack_var,
+        'defense_var': state.defense_var,
+    }
+
+
+async def _update_team_strengths(session, fixture_ids: List[int]) -> int:
+    """
+    Apply newly finished fixtures to the online team strengths.
+
+    Only the latest state of the teams involved is read (one grouped query
+    on the (team_id, as_of) index), and each fixture is a single O(1)
+    update per team; fixtures already applied are skipped.
+
+    Returns:
+        Number of fixtures applied
+    """
+    from app.ml.online_ratings import OnlineStrengthModel, StrengthState
+
+    if not fixture_ids:
+        return 0
+
+    fixtures = (await session.execute(
+        select(models.Fixture)
+        .where(
+            and_(
+                models.Fixture.id.in_(list(fixture_ids)),
+                models.Fixture.status == models.FixtureStatus.FINISHED,
+                models.Fixture.home_score.isnot(None),
+                models.Fixture.away_score.isnot(None)
+            )
+        )
+        .order_by(models.Fixture.match_date.asc())
+    )).scalars().all()
+    if not fixtures:
+        return 0
+
+    applied = set((await session.execute(
+        select(models.TeamStrength.team_id, models.TeamStrength.fixture_id)
+        .where(models.TeamStrength.fixture_id.in_([f.id for f in fixtures]))
+    )).all())
+
+    team_ids = {f.home_team_id for f in fixtures} | {f.away_team_id for f in fixtures}
+    latest_as_of = (
+        select(models.TeamStrength.team_id, func.max(models.TeamStrength.as_of).label('as_of'))
+        .where(models.TeamStrength.team_id.in_(team_ids))
+        .group_by(models.TeamStrength.team_id)
+        .subquery()
+    )
+    latest = (await session.execute(
+        select(models.TeamStrength).join(
+            latest_as_of,
+            and_(
+                models.TeamStrength.team_id == latest_as_of.c.team_id,
+                models.TeamStrength.as_of == latest_as_of.c.as_of
+            )
+        )
+    )).scalars().all()
+
+    model = OnlineStrengthModel.load()
+    states = {
+        row.team_id: StrengthState(row.attack, row.defense, row.attack_var, row.defense_var, row.as_of)
+        for row in latest
+    }
+
+    rows = []
+    for fixture in fixtures:
+        if (fixture.home_team_id, fixture.id) in applied:
+            continue
+
+        home_state, away_state = model.update(
+            states.get(fixture.home_team_id) or model.initial_state(),
+            states.get(fixture.away_team_id) or model.initial_state(),
+            fixture.home_score,
+            fixture.away_score,
+            fixture.match_date
+        )
+        states[fixture.home_team_id] = home_state
+        states[fixture.away_team_id] = away_state
+        rows.append(_strength_row(fixture.home_team_id, fixture.id, home_state))
+        rows.append(_strength_row(fixture.away_team_id, fixture.id, away_state))
+
+    if rows:
+        await session.execute(insert(models.TeamStrength), rows)
+
+    return len(rows) // 2
+
+
+@shared_task
+def rebuild_team_strengths():
+    """
+    Backfill the online team strengths by replaying every finished fixture
+    in chronological order. Intercept and home advantage are re-estimated
+    from the replayed goals and saved for the live updates.
+    """
+    from app.ml.online_ratings import OnlineRatings, OnlineStrengthModel
+
+    async def _rebuild():
+        async with AsyncSessionLocal() as session:
+            fixtures = (await session.execute(
+                select(
+                    models.Fixture.id,
+                    models.Fixture.home_team_id,
+                    models.Fixture.away_team_id,
+                    models.Fixture.home_score,
+                    models.Fixture.away_score,
+                    models.Fixture.match_date
+                ).where(
+                    and_(
+                        models.Fixture.status == models.FixtureStatus.FINISHED,
+                        models.Fixture.home_score.isnot(None),
+                        models.Fixture.away_score.isnot(None)
+                    )
+                ).order_by(models.Fixture.match_date.asc())
+            )).all()
+
+            matches = [
+                {'home_score': f.home_score, 'away_score': f.away_score} for f in fixtures
+            ]
+            model = OnlineStrengthModel.estimate(matches)
+            model.save()
+            ratings = OnlineRatings(model)
+
+            rows = []
+            for f in fixtures:
+                home_state, away_state = ratings.apply(
+                    f.home_team_id, f.away_team_id, f.home_score, f.away_score, f.match_date
+                )
+                rows.append(_strength_row(f.home_team_id, f.id, home_state))
+                rows.append(_strength_row(f.away_team_id, f.id, away_state))
+
+            await session.execute(delete(models.TeamStrength))
+            if rows:
+                await session.execute(insert(models.TeamStrength), rows)
+            await session.commit()
+
+            logger.info(f"Rebuilt online strengths from {len(fixtures)} fixtures ({len(ratings.states)} teams)")
+            return len(fixtures)
+
+    return run_async(_rebuild())
+
+
+async def _update_elo_ratings(session, fixture_ids: List[int]) -> int:
+    """
+    Apply newly finished fixtures to the season Elo ratings (TeamStats.elo_rating).
+
+    A team's first rated match of a season starts from its rating at the
+    end of its latest earlier season. Call once per fixture, when it
+    transitions to finished; `rebuild_elo_ratings` recomputes everything.
+
+    Returns:
+        Number of fixtures applied
+    """
+    from app.ml.elo import EloEngine
+
+    if not fixture_ids:
+        return 0
+
+    fixtures = (await session.execute(
+        select(models.Fixture)
+        .where(
+            and_(
+                models.Fixture.id.in_(list(fixture_ids)),
+                models.Fixture.status == models.FixtureStatus.FINISHED,
+                models.Fixture.home_score.isnot(None),
+                models.Fixture.away_score.isnot(None)
+            )
+        )
+        .order_by(models.Fixture.match_date.asc())
+    )).scalars().all()
+    if not fixtures:
+        return 0
+
+    batch_ids = [f.id for f in fixtures]
+    team_ids = {f.home_team_id for f in fixtures} | {f.away_team_id for f in fixtures}
+    seasons = {f.season for f in fixtures}
+
+    stats = {
+        (row.team_id, row.season): row
+        for row in (await session.execute(
+            select(models.TeamStats).where(models.TeamStats.team_id.in_(team_ids))
+        )).scalars().all()
+    }
+
+    # (team, season) pairs whose season row already holds a rated match
+    rated = set()
+    for team_column in (models.Fixture.home_team_id, models.Fixture.away_team_id):
+        rated.update((await session.execute(
+            select(team_column, models.Fixture.season).where(
+                and_(
+                    team_column.in_(team_ids),
+                    models.Fixture.season.in_(seasons),
+                    models.Fixture.status == models.FixtureStatus.FINISHED,
+                    models.Fixture.id.notin_(batch_ids)
+                )
+            ).distinct()
+        )).all())
+
+    def rating_before(team_id: int, season: str) -> Optional[float]:
+        if (team_id, season) in ratings:
+            return ratings[(team_id, season)]
+        row = stats.get((team_id, season))
+        if row is not None and (team_id, season) in rated:
+            return row.elo_rating
+        earlier = [key for key in stats if key[0] == team_id and key[1] < season]
+        return stats[max(earlier)].elo_rating if earlier else None
+
+    engine = EloEngine()
+    ratings: Dict = {}
+    for fixture in fixtures:
+        home_rating, away_rating = engine.update(
+            rating_before(fixture.home_team_id, fixture.season),
+            rating_before(fixture.away_team_id, fixture.season),
+            fixture.home_score,
+            fixture.away_score
+        )
+        ratings[(fixture.home_team_id, fixture.season)] = home_rating
+        ratings[(fixture.away_team_id, fixture.season)] = away_rating
+
+    for (team_id, season), rating in ratings.items():
+        row = stats.get((team_id, season))
+        if row is None:
+            session.add(models.TeamStats(team_id=team_id, season=season, elo_rating=rating))
+        else:
+            row.elo_rating = rating
+
+    return len(fixtures)
+
+
+@shared_task
+def rebuild_elo_ratings():
+    """
+    Backfill TeamStats.elo_rating by replaying every finished fixture in
+    date order, then write all season ratings with one bulk update (and one
+    bulk insert for seasons without a stats row).
+    """
+    from app.ml.elo import EloEngine
+
+    async def _rebuild():
+        async with AsyncSessionLocal() as session:
+            fixtures = (await session.execute(
+                select(
+                    models.Fixture.season,
+                    models.Fixture.home_team_id,
+                    models.Fixture.away_team_id,
+                    models.Fixture.home_score,
+                    models.Fixture.away_score
+                ).where(
+                    and_(
+                        models.Fixture.status == models.FixtureStatus.FINISHED,
+                        models.Fixture.home_score.isnot(None),
+                        models.Fixture.away_score.isnot(None)
+                    )
+                ).order_by(models.Fixture.match_date.asc())
+            )).mappings().all()
+
+            replay = EloEngine().replay(fixtures, key='team_id')
+            season_ratings = replay.season_ratings(fixtures, key='team_id')
+
+            existing = {
+                (row.team_id, row.season): row.id
+                for row in (await session.execute(
+                    select(models.TeamStats.id, models.TeamStats.team_id, models.TeamStats.season)
+                )).all()
+            }
+
+            updates = [
+                {'id': existing[key], 'elo_rating': rating}
+                for key, rating in season_ratings.items() if key in existing
+            ]
+            inserts = [
+                {'team_id': team_id, 'season': season, 'elo_rating': rating}
+                for (team_id, season), rating in season_ratings.items() if (team_id, season) not in existing
+            ]
+
+            if updates:
+                await session.execute(update(models.TeamStats), updates)
+            if inserts:
+                await session.execute(insert(models.TeamStats), inserts)
+            await session.commit()
+
+            logger.info(
+                f"Rebuilt Elo ratings from {len(fixtures)} fixtures "
+                f"({len(updates)} season rows updated, {len(inserts)} created)"
+            )
+            return len(fixtures)
+
+    return run_async(_rebuild())
+
+
+def _feature_fixtures_query(*conditions):
+    """Finished fixtures with their xG (if any), in date order, for the feature store"""
+    return select(
+        models.Fixture.id,
+        models.Fixture.season,
+        models.Fixture.match_date,
+        models.Fixture.home_team_id,
+        models.Fixture.away_team_id,
+        models.Fixture.home_score,
+        models.Fixture.away_score,
+        models.MatchStats.home_xg,
+        models.MatchStats.away_xg
+    ).outerjoin(
+        models.MatchStats, models.MatchStats.fixture_id == models.Fixture.id
+    ).where(
+        and_(
+            models.Fixture.status == models.FixtureStatus.FINISHED,
+            models.Fixture.home_score.isnot(None),
+            models.Fixture.away_score.isnot(None),
+            *conditions
+        )
+    ).order_by(models.Fixture.match_date.asc(), models.Fixture.id.asc())
+
+
+def _apply_feature_fixtures(states: Dict, fixtures) -> int:
+    """
+    Apply finished fixtures (in date order) to TeamFeatureState by
+    (team_id, season). A team's first match of a season starts a state
+    seeded from its latest earlier season.
+
+    Returns:
+        Number of fixtures that were not applied before
+    """
+    from app.services.feature_store import TeamFeatureState
+
+    applied = 0
+    for f in fixtures:
+        sides = (
+            (f.home_team_id, True, f.home_score, f.away_score, f.home_xg, f.away_xg),
+            (f.away_team_id, False, f.away_score, f.home_score, f.away_xg, f.home_xg),
+        )
+        is_new = False
+        for team_id, is_home, goals_for, goals_against, xg_for, xg_against in sides:
+            key = (team_id, f.season)
+            if key not in states:
+                earlier = [k for k in states if k[0] == team_id and k[1] < f.season]
+                states[key] = TeamFeatureState.new_season(
+                    team_id, f.season, states[max(earlier)] if earlier else None
+                )
+            is_new |= states[key].apply(
+                f.id, f.match_date, is_home, goals_for, goals_against, xg_for, xg_against
+            )
+        applied += int(is_new)
+    return applied
+
+
+async def _update_team_features(session, fixture_ids: List[int]) -> int:
+    """
+    Apply newly finished fixtures to the team feature store (TeamFeatures).
+
+    Only the season rows of the teams involved are read and written, and
+    fixtures already applied are skipped, so repeated syncs are harmless.
+    On a database whose store was never backfilled, the whole history is
+    replayed instead (see `_rebuild_team_features`).
+
+    Returns:
+        Number of fixtures applied
+    """
+    from app.services.feature_store import (
+        TEAM_FEATURES_RESOURCE, TeamFeatureState, backfilled_resources
+    )
+
+    if not fixture_ids:
+        return 0
+
+    if TEAM_FEATURES_RESOURCE not in await backfilled_resources(session):
+        return await _rebuild_team_features(session)
+
+    fixtures = (await session.execute(
+        _feature_fixtures_query(models.Fixture.id.in_(list(fixture_ids)))
+    )).all()
+    if not fixtures:
+        return 0
+
+    team_ids = {f.home_team_id for f in fixtures} | {f.away_team_id for f in fixtures}
+    rows = {
+        (row.team_id, row.season): row
+        for row in (await session.execute(
+            select(models.TeamFeatures).where(
+                and_(
+                    models.TeamFeatures.team_id.in_(team_ids),
+                    models.TeamFeatures.season <= max(f.season for f in fixtures)
+                )
+            )
+        )).scalars().all()
+    }
+
+    states = {key: TeamFeatureState.from_row(row) for key, row in rows.items()}
+    applied = _apply_feature_fixtures(states, fixtures)
+
+    touched = {(f.home_team_id, f.season) for f in fixtures} | {(f.away_team_id, f.season) for f in fixtures}
+    for key in touched:
+        row = rows.get(key)
+        if row is None:
+            session.add(models.TeamFeatures(**states[key].as_dict()))
+        else:
+            for name, value in states[key].as_dict().items():
+                setattr(row, name, value)
+
+    return applied
+
+
+async def _rebuild_team_features(session) -> int:
+    """
+    Replace the team feature store with a replay of every finished fixture
+    in date order (one bulk insert) and record the backfill marker. The
+    caller commits.
+
+    Returns:
+        Number of fixtures replayed
+    """
+    from app.services.feature_store import TEAM_FEATURES_RESOURCE, backfill_log
+
+    fixtures = (await session.execute(_feature_fixtures_query())).all()
+
+    states: Dict = {}
+    _apply_feature_fixtures(states, fixtures)
+
+    await session.execute(delete(models.TeamFeatures))
+    if states:
+        await session.execute(
+            insert(models.TeamFeatures), [state.as_dict() for state in states.values()]
+        )
+    session.add(backfill_log(TEAM_FEATURES_RESOURCE, len(fixtures)))
+
+    logger.info(f"Rebuilt team features from {len(fixtures)} fixtures ({len(states)} team seasons)")
+    return len(fixtures)
+
+
+@shared_task
+def rebuild_team_features():
+    """
+    Backfill the team feature store by replaying every finished fixture in
+    date order, then replace all rows with one bulk insert.
+    """
+    async def _rebuild():
+        async with AsyncSessionLocal() as session:
+            replayed = await _rebuild_team_features(session)
+            await session.commit()
+            return replayed
+
+    return run_async(_rebuild())
+
+
+async def _update_head_to_head(session, fixture_ids: List[int]) -> int:
+    """
+    Apply newly finished fixtures to the head-to-head index (HeadToHead).
+
+    Each fixture touches the one row of its team pair; fixtures already
+    applied are skipped. On a database whose index was never backfilled,
+    the whole history is replayed instead (see `_rebuild_head_to_head`).
+
+    Returns:
+        Number of fixtures applied
+    """
+    from app.services.feature_store import backfilled_resources
+    from app.services.h2h_index import HEAD_TO_HEAD_RESOURCE, HeadToHeadState, pair_key
+
+    if not fixture_ids:
+        return 0
+
+    if HEAD_TO_HEAD_RESOURCE not in await backfilled_resources(session):
+        return await _rebuild_head_to_head(session)
+
+    fixtures = (await session.execute(
+        _feature_fixtures_query(models.Fixture.id.in_(list(fixture_ids)))
+    )).all()
+    if not fixtures:
+        return 0
+
+    pairs = {pair_key(f.home_team_id, f.away_team_id) for f in fixtures}
+    rows = {
+        (row.team_a_id, row.team_b_id): row
+        for row in (await session.execute(
+            select(models.HeadToHead).where(
+                tuple_(models.HeadToHead.team_a_id, models.HeadToHead.team_b_id).in_(list(pairs))
+            )
+        )).scalars().all()
+    }
+
+    states = {key: HeadToHeadState.from_row(row) for key, row in rows.items()}
+    applied = 0
+    for f in fixtures:
+        key = pair_key(f.home_team_id, f.away_team_id)
+        state = states.setdefault(key, HeadToHeadState(*key))
+        applied += int(state.apply(f.id, f.match_date, f.home_team_id, f.home_score, f.away_score))
+
+    for key, state in states.items():
+        row = rows.get(key)
+        if row is None:
+            session.add(models.HeadToHead(**state.as_dict()))
+        else:
+            for name, value in state.as_dict().items():
+                setattr(row, name, value)
+
+    return applied
+
+
+async def _rebuild_head_to_head(session) -> int:
+    """
+    Replace the head-to-head index with one date-ordered pass over every
+    finished fixture (one bulk insert) and record the backfill marker. The
+    caller commits.
+
+    Returns:
+        Number of fixtures replayed
+    """
+    from app.services.feature_store import backfill_log
+    from app.services.h2h_index import HEAD_TO_HEAD_RESOURCE, HeadToHeadState, pair_key
+
+    fixtures = (await session.execute(_feature_fixtures_query())).all()
+
+    states: Dict = {}
+    for f in fixtures:
+        key = pair_key(f.home_team_id, f.away_team_id)
+        states.setdefault(key, HeadToHeadState(*key)).apply(
+            f.id, f.match_date, f.home_team_id, f.home_score, f.away_score
+        )
+
+    await session.execute(delete(models.HeadToHead))
+    if states:
+        await session.execute(
+            insert(models.HeadToHead), [state.as_dict() for state in states.values()]
+        )
+    session.add(backfill_log(HEAD_TO_HEAD_RESOURCE, len(fixtures)))
+
+    logger.info(f"Rebuilt head-to-head index from {len(fixtures)} fixtures ({len(states)} pairs)")
+    return len(fixtures)
+
+
+@shared_task
+def rebuild_head_to_head():
+    """
+    Backfill the head-to-head index in one date-ordered pass over every
+    finished fixture, then replace all rows with one bulk insert.
+    """
+    async def _rebuild():
+        async with AsyncSessionLocal() as session:
+            replayed = await _rebuild_head_to_head(session)
+            await session.commit()
+            return replayed
+
+    return run_async(_rebuild())
+
+
+def rewrites_result(fixture, status, home_score, away_score) -> bool:
+    """
+    Whether an update changes the result of an already finished fixture
+    (score correction or status change), which the incremental store
+    updates cannot undo.
+    """
+    return fixture.status == models.FixtureStatus.FINISHED and (
+        status != fixture.status or home_score != fixture.home_score or away_score != fixture.away_score
+    )
+
+
+async def update_feature_stores(session, finished_ids: List[int], rebuild: bool = False) -> int:
+    """
+    Bring the team feature store and the head-to-head index in line with
+    results written to `Fixture`. Every writer of results calls this before
+    committing, since readers trust the stores once they are backfilled.
+
+    Args:
+        session: Session holding the (flushed) fixture changes
+        finished_ids: Fixtures that have just finished
+        rebuild: Replay the whole history instead, for writers that
+            changed the result of an already finished fixture
+            (see `rewrites_result`) or rewrote results in bulk
+
+    Returns:
+        Number of fixtures applied or replayed
+    """
+    if rebuild:
+        await _rebuild_team_features(session)
+        return await _rebuild_head_to_head(session)
+
+    await _update_team_features(session, finished_ids)
+    return await _update_head_to_head(session, finished_ids)
+
+
+async def _reconcile_team_features(session) -> bool:
+    """
+    Compare the matches played of each team feature store row with the
+    team's finished fixtures in that season, and rebuild the store if any
+    disagree. The caller commits.
+
+    Returns:
+        True if the store was rebuilt
+    """
+    from app.services.feature_store import TEAM_FEATURES_RESOURCE, backfilled_resources
+
+    if TEAM_FEATURES_RESOURCE not in await backfilled_resources(session):
+        return False
+
+    def side(team):
+        return select(team.label('team_id'), models.Fixture.season.label('season')).where(
+            and_(
+                models.Fixture.status == models.FixtureStatus.FINISHED,
+                models.Fixture.home_score.isnot(None),
+                models.Fixture.away_score.isnot(None)
+            )
+        )
+
+    sides = union_all(side(models.Fixture.home_team_id), side(models.Fixture.away_team_id)).subquery()
+    played = {
+        (team_id, season): count
+        for team_id, season, count in (await session.execute(
+            select(sides.c.team_id, sides.c.season, func.count()).group_by(sides.c.team_id, sides.c.season)
+        )).all()
+    }
+    stored = {
+        (team_id, season): matches or 0
+        for team_id, season, matches in (await session.execute(
+            select(models.TeamFeatures.team_id, models.TeamFeatures.season, models.TeamFeatures.matches_played)
+        )).all()
+    }
+    drifted = {key for key in set(played) | set(stored) if played.get(key, 0) != stored.get(key, 0)}
+    if not drifted:
+        return False
+
+    logger.warning(f"Team feature store disagrees with fixture history for {len(drifted)} team seasons, rebuilding")
+    await _rebuild_team_features(session)
+    return True
+
+
+async def _reconcile_head_to_head(session) -> bool:
+    """
+    Compare the match counts of the head-to-head index with the finished
+    fixtures of each pair, and rebuild the index if any disagree. The
+    caller commits.
+
+    Returns:
+        True if the index was rebuilt
+    """
+    from app.services.feature_store import backfilled_resources
+    from app.services.h2h_index import HEAD_TO_HEAD_RESOURCE, count_meetings
+
+    if HEAD_TO_HEAD_RESOURCE not in await backfilled_resources(session):
+        return False
+
+    played = await count_meetings(session)
+    stored = {
+        (a, b): matches or 0
+        for a, b, matches in (await session.execute(
+            select(models.HeadToHead.team_a_id, models.HeadToHead.team_b_id, models.HeadToHead.matches)
+        )).all()
+    }
+    drifted = {key for key in set(played) | set(stored) if played.get(key, 0) != stored.get(key, 0)}
+    if not drifted:
+        return False
+
+    logger.warning(f"Head-to-head index disagrees with fixture history for {len(drifted)} pairs, rebuilding")
+    await _rebuild_head_to_head(session)
+    return True
+
+
+@shared_task
+def reconcile_feature_stores():
+    """
+    Consistency check of the backfilled feature stores against fixture
+    history, for results that reached the database without going through
+    `update_feature_stores`. Stores that disagree are rebuilt.
+    """
+    async def _reconcile():
+        async with AsyncSessionLocal() as session:
+            rebuilt = []
+            if await _reconcile_team_features(session):
+                rebuilt.append('team_features')
+            if await _reconcile_head_to_head(session):
+                rebuilt.append('head_to_head')
+            await session.commit()
+            return rebuilt
+
+    return run_async(_reconcile())
+
+
 @shared_task(bind=True, max_retries=3)
 def sync_season_fixtures(self, season: str):
     """
@@ -50,6 +824,9 @@ def sync_season_fixtures(self, season: str):
 
                     # Save to database
                     saved_count = 0
+                    finished_ids = []
+                    inserted_finished = []
+                    rewritten = False
                     for fixture_data in fixtures:
                         # Check if fixture exists
                         stmt = select(models.Fixture).where(
@@ -58,6 +835,13 @@ def sync_season_fixtures(self, season: str):
                         existing = (await session.execute(stmt)).scalar_one_or_none()
 
                         if existing:
+                            if (existing.status != models.FixtureStatus.FINISHED and
+                                    fixture_data.status == models.FixtureStatus.FINISHED):
+                                finished_ids.append(existing.id)
+                            rewritten |= rewrites_result(
+                                existing, fixture_data.status, fixture_data.home_score, fixture_data.away_score
+                            )
+
                             # Update existing
                             existing.match_date = fixture_data.match_date
                             existing.status = fixture_data.status
@@ -115,9 +899,17 @@ def sync_season_fixtures(self, season: str):
                                 last_synced_at=datetime.utcnow()
                             )
                             session.add(new_fixture)
+                            if new_fixture.status == models.FixtureStatus.FINISHED:
+                                inserted_finished.append(new_fixture)
 
                         saved_count += 1
 
+                    await session.flush()
+                    # Fixtures imported already finished need the same updates
+                    finished_ids.extend(f.id for f in inserted_finished)
+                    await _update_team_strengths(session, finished_ids)
+                    await _update_elo_ratings(session, finished_ids)
+                    await update_feature_stores(session, finished_ids, rebuild=rewritten)
                     await session.commit()
                     logger.info(f"Saved {saved_count} fixtures to database")
 
@@ -367,6 +1159,10 @@ def sync_live_fixtures(self):
 
                 logger.info(f"Found {len(live_fixtures_data)} live fixtures")
                 
+                finished_ids = []
+                rewritten = False
+                live_minutes = {}
+
                 async with AsyncSessionLocal() as session:
                     for fixture_data in live_fixtures_data:
                         # Find existing fixture
@@ -376,17 +1172,50 @@ def sync_live_fixtures(self):
                         fixture = (await session.execute(stmt)).scalar_one_or_none()
                         
                         if fixture:
+                            if (fixture.status != models.FixtureStatus.FINISHED and
+                                    fixture_data.status == models.FixtureStatus.FINISHED):
+                                finished_ids.append(fixture.id)
+                            rewritten |= rewrites_result(
+                                fixture, fixture_data.status, fixture_data.home_score, fixture_data.away_score
+                            )
+
                             # Update details
                             fixture.status = fixture_data.status
                             fixture.home_score = fixture_data.home_score
                             fixture.away_score = fixture_data.away_score
                             fixture.last_synced_at = datetime.utcnow()
-                            
-                            # If we have minute/elapsed info in the future, we can add it
-                            
+
+                            if fixture.status == models.FixtureStatus.LIVE:
+                                live_minutes[fixture.id] = fixture_data.elapsed
+
                             logger.info(f"Updated live fixture {fixture.id}: {fixture.home_score}-{fixture.away_score}")
-                    
+
+                    await session.flush()
+                    updated = await _refresh_live_predictions(session, live_minutes)
+                    if updated:
+                        logger.info(f"Refreshed {updated} live predictions")
+
+                    # Online strengths move immediately, without a refit
+                    rated = await _update_team_strengths(session, finished_ids)
+                    if rated:
+                        logger.info(f"Updated online strengths with {rated} finished fixtures")
+                    await _update_elo_ratings(session, finished_ids)
+                    await update_feature_stores(session, finished_ids, rebuild=rewritten)
+
+                    # Refresh model strengths once results are in; fixtures
+                    # finishing on later ticks join the retrain already queued
+                    from app.tasks.prediction_tasks import (
+                        RETRAIN_DEBOUNCE_SECONDS, request_incremental_retrain, retrain_model
+                    )
+                    queue_retrain = bool(finished_ids) and await request_incremental_retrain(session)
+
                     await session.commit()
+
+                if queue_retrain:
+                    retrain_model.apply_async(kwargs={'incremental': True}, countdown=RETRAIN_DEBOUNCE_SECONDS)
+                    logger.info(f"{len(finished_ids)} fixtures finished, queued incremental retraining")
+                elif finished_ids:
+                    logger.info(f"{len(finished_ids)} fixtures finished, incremental retraining already queued")
             
             finally:
                 await orchestrator.close()
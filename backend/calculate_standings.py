@@ -14,7 +14,8 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from app.db.engine import AsyncSessionLocal
-from app.db.models import Fixture, Team, TeamStats, FixtureStatus
+from app.db.models import Team, TeamStats
+from app.services.fixture_history import get_fixture_history
 
 
 async def calculate_standings():
@@ -40,23 +41,20 @@ async def calculate_standings():
 
             # Get all finished fixtures
             print("📋 Loading finished fixtures...")
-            fixtures_stmt = select(Fixture).where(
-                and_(
-                    Fixture.season == season,
-                    Fixture.status == FixtureStatus.FINISHED
-                )
-            )
-            fixtures = (await session.execute(fixtures_stmt)).scalars().all()
-            print(f"✅ Found {len(fixtures)} finished matches")
+            history = await get_fixture_history().refresh(session)
+            table = history.standings(season)
+            print(f"✅ Found {sum(row['played'] for row in table) // 2} finished matches")
             print()
 
-            if not fixtures:
+            if not table:
                 print("⚠️  No finished fixtures found!")
                 print("   Standings will be initialized with 0 points for all teams")
                 print()
 
-            # Initialize standings
+            # Aggregates come from the columnar snapshot (vectorized);
+            # teams without a finished match get an empty row
             print("🔢 Calculating standings...")
+            rows = {row["team_id"]: row for row in table}
             standings = {}
             for team_id, team in teams.items():
                 standings[team_id] = {
@@ -69,50 +67,10 @@ async def calculate_standings():
                     "goals_for": 0,
                     "goals_against": 0,
                     "goal_difference": 0,
-                    "points": 0
+                    "points": 0,
+                    **rows.get(team_id, {})
                 }
 
-            # Calculate from fixtures
-            for fixture in fixtures:
-                if fixture.home_score is None or fixture.away_score is None:
-                    continue
-
-                home_id = fixture.home_team_id
-                away_id = fixture.away_team_id
-                home_score = fixture.home_score
-                away_score = fixture.away_score
-
-                # Update matches played
-                standings[home_id]["played"] += 1
-                standings[away_id]["played"] += 1
-
-                # Update goals
-                standings[home_id]["goals_for"] += home_score
-                standings[home_id]["goals_against"] += away_score
-                standings[away_id]["goals_for"] += away_score
-                standings[away_id]["goals_against"] += home_score
-
-                # Update results and points
-                if home_score > away_score:
-                    standings[home_id]["won"] += 1
-                    standings[home_id]["points"] += 3
-                    standings[away_id]["lost"] += 1
-                elif home_score < away_score:
-                    standings[away_id]["won"] += 1
-                    standings[away_id]["points"] += 3
-                    standings[home_id]["lost"] += 1
-                else:
-                    standings[home_id]["drawn"] += 1
-                    standings[home_id]["points"] += 1
-                    standings[away_id]["drawn"] += 1
-                    standings[away_id]["points"] += 1
-
-            # Calculate goal difference
-            for team_id in standings:
-                standings[team_id]["goal_difference"] = (
-                    standings[team_id]["goals_for"] - standings[team_id]["goals_against"]
-                )
-
             # Sort standings
             sorted_standings = sorted(
                 standings.values(),
@@ -0,0 +1,136 @@
+"""
+Dixon-Coles objectives: values against a per-match reference and exact
+gradients against central finite differences.
+"""
+
+import numpy as np
+import pytest
+from scipy.stats import poisson
+
+from app.ml.dixon_coles import DixonColesModel, dixon_coles_nll, xg_loss
+
+N_TEAMS = 6
+
+
+@pytest.fixture
+def data():
+    """Weighted matches covering every low-score cell tau corrects"""
+    rng = np.random.default_rng(3)
+    matches = []
+    for k in range(120):
+        home, away = rng.choice(N_TEAMS, 2, replace=False)
+        matches.append({
+            'home_team': f'Team {home}',
+            'away_team': f'Team {away}',
+            'home_score': int(rng.poisson(1.4)),
+            'away_score': int(rng.poisson(1.1)),
+        })
+    for home_score, away_score in ((0, 0), (0, 1), (1, 0), (1, 1)):
+        matches.append({'home_team': 'Team 0', 'away_team': 'Team 1', 'home_score': home_score, 'away_score': away_score})
+
+    arrays = DixonColesModel().build_match_arrays(matches, time_decay=False)
+    arrays.weights = rng.uniform(0.2, 1.0, arrays.n_matches)
+    arrays.home_xg = rng.gamma(4, 0.35, arrays.n_matches)
+    arrays.away_xg = rng.gamma(4, 0.28, arrays.n_matches)
+    return arrays
+
+
+def goals_params(rng, rho=-0.08):
+    return np.concatenate([
+        rng.uniform(0.7, 1.4, N_TEAMS),
+        rng.uniform(0.7, 1.4, N_TEAMS),
+        [1.25, rho]
+    ])
+
+
+def numerical_gradient(objective, params, step=1e-6):
+    grad = np.empty_like(params)
+    for k in range(len(params)):
+        shift = np.zeros_like(params)
+        shift[k] = step
+        grad[k] = (objective(params + shift)[0] - objective(params - shift)[0]) / (2 * step)
+    return grad
+
+
+def test_nll_matches_per_match_likelihood(data):
+    params = goals_params(np.random.default_rng(0))
+    model = DixonColesModel(rho=params[-1])
+
+    expected = 0.0
+    for i, j, x, y, w in zip(data.home_idx, data.away_idx, data.home_goals, data.away_goals, data.weights):
+        lambda_ = params[i] * params[N_TEAMS + j] * params[-2]
+        mu = params[j] * params[N_TEAMS + i]
+        expected -= w * (
+            np.log(model.tau(x, y, lambda_, mu)) + poisson.logpmf(x, lambda_) + poisson.logpmf(y, mu)
+        )
+
+    value, _ = dixon_coles_nll(params, data)
+    assert value == pytest.approx(expected, rel=1e-12)
+
+
+@pytest.mark.parametrize('rho', [-0.08, 0.0, 0.12])
+def test_nll_gradient_matches_finite_differences(data, rho):
+    params = goals_params(np.random.default_rng(1), rho=rho)
+
+    _, grad = dixon_coles_nll(params, data)
+    expected = numerical_gradient(lambda p: dixon_coles_nll(p, data), params)
+
+    np.testing.assert_allclose(grad, expected, rtol=1e-6, atol=1e-6)
+
+
+def test_nll_penalizes_non_positive_tau(data):
+    params = goals_params(np.random.default_rng(2), rho=0.0)
+    params[-1] = 1.5  # tau(1, 1) = 1 - rho < 0
+
+    value, grad = dixon_coles_nll(params, data)
+
+    assert value > 1e6
+    assert np.all(np.isfinite(grad))
+
+
+def xg_params(rng):
+    return np.concatenate([rng.uniform(0.7, 1.4, N_TEAMS), rng.uniform(0.7, 1.4, N_TEAMS), [1.2]])
+
+
+def test_xg_loss_matches_per_match_sum(data):
+    params = xg_params(np.random.default_rng(4))
+    attack, defense, home_adv = params[:N_TEAMS], params[N_TEAMS:2 * N_TEAMS], params[-1]
+
+    mse, deviance = 0.0, 0.0
+    for i, j, home_xg, away_xg, w in zip(data.home_idx, data.away_idx, data.home_xg, data.away_xg, data.weights):
+        pred_home, pred_away = attack[i] * defense[j] * home_adv, attack[j] * defense[i]
+        mse += w * ((pred_home - home_xg) ** 2 + (pred_away - away_xg) ** 2)
+        deviance += 2 * w * sum(
+            target * np.log(target / pred) - (target - pred)
+            for target, pred in ((home_xg, pred_home), (away_xg, pred_away))
+        )
+    penalty = 1000 * ((attack.mean() - 1) ** 2 + (defense.mean() - 1) ** 2)
+
+    assert xg_loss(params, data, 'mse')[0] == pytest.approx(mse + penalty, rel=1e-12)
+    assert xg_loss(params, data, 'poisson')[0] == pytest.approx(deviance + penalty, rel=1e-12)
+
+
+@pytest.mark.parametrize('loss', ['mse', 'poisson'])
+def test_xg_loss_gradient_matches_finite_differences(data, loss):
+    params = xg_params(np.random.default_rng(5))
+
+    _, grad = xg_loss(params, data, loss)
+    expected = numerical_gradient(lambda p: xg_loss(p, data, loss), params)
+
+    np.testing.assert_allclose(grad, expected, rtol=1e-6, atol=1e-5)
+
+
+def test_xg_loss_rejects_unknown_objective(data):
+    with pytest.raises(ValueError):
+        xg_loss(xg_params(np.random.default_rng(6)), data, 'huber')
+
+
+@pytest.mark.parametrize('parameterization', ['bounded', 'log'])
+def test_xg_fit_ignores_parameterization(data, parameterization):
+    reference = DixonColesModel()
+    reference.fit_xg_arrays(data)
+    model = DixonColesModel(parameterization=parameterization)
+    model.fit_xg_arrays(data)
+
+    np.testing.assert_allclose(model.attack, reference.attack)
+    assert model.fit_stats['parameterization'] == 'bounded'
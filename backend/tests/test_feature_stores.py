@@ -0,0 +1,312 @@
+"""
+Feature stores vs. fixture history
+
+The team feature store, the head-to-head index and the point-in-time
+cache must describe a fixture exactly as a scan of the finished fixtures
+before its kick-off would.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.models import Base, Competition, DataSyncLog, Fixture, FixtureStatus, MatchStats, Team
+from app.services.feature_extraction import FeatureExtractor
+from app.services.feature_store import BACKFILL_PROVIDER
+from app.services.fixture_history import FixtureHistory
+from app.services.h2h_index import load_head_to_head
+from app.tasks.sync_tasks import (
+    _rebuild_head_to_head,
+    _rebuild_team_features,
+    _reconcile_head_to_head,
+    _reconcile_team_features,
+    _update_head_to_head,
+    _update_team_features,
+    rewrites_result,
+    update_feature_stores,
+)
+
+N_TEAMS = 6
+SEASONS = ('2023-2024', '2024-2025')
+
+# Features read from fixture history (form, venue, xG, head-to-head)
+HISTORY_KEYS = (
+    'home_form_points', 'away_form_points',
+    'home_win_rate_home', 'away_win_rate_away',
+    'home_xg_per_game', 'home_xga_per_game', 'away_xg_per_game', 'away_xga_per_game',
+    'h2h_home_wins', 'h2h_draws', 'h2h_away_wins', 'h2h_avg_goals',
+)
+
+
+def round_robin(n_teams):
+    """Double round robin as a list of rounds of (home, away) indices"""
+    teams = list(range(n_teams))
+    rounds = []
+    for _ in range(n_teams - 1):
+        rounds.append([(teams[i], teams[n_teams - 1 - i]) for i in range(n_teams // 2)])
+        teams.insert(1, teams.pop())
+    return rounds + [[(away, home) for home, away in r] for r in rounds]
+
+
+async def seed(session):
+    """Two seasons between six teams; the last round is still to be played"""
+    rng = np.random.default_rng(7)
+    competition = Competition(name='Serie A', country='Italy', season=SEASONS[-1])
+    teams = [Team(name=f'Team {i}') for i in range(N_TEAMS)]
+    session.add_all([competition, *teams])
+    await session.flush()
+
+    kickoff = datetime(2023, 8, 20, 18, 0)
+    rounds = round_robin(N_TEAMS)
+    for season in SEASONS:
+        for number, matches in enumerate(rounds, 1):
+            last_round = season == SEASONS[-1] and number == len(rounds)
+            for home, away in matches:
+                fixture = Fixture(
+                    competition_id=competition.id,
+                    season=season,
+                    round=f'Regular Season - {number}',
+                    match_date=kickoff,
+                    home_team_id=teams[home].id,
+                    away_team_id=teams[away].id,
+                    status=FixtureStatus.SCHEDULED if last_round else FixtureStatus.FINISHED,
+                    home_score=None if last_round else int(rng.poisson(1.5)),
+                    away_score=None if last_round else int(rng.poisson(1.1)),
+                    last_synced_at=kickoff + timedelta(hours=2)
+                )
+                session.add(fixture)
+                if not last_round and rng.random() < 0.8:
+                    await session.flush()
+                    session.add(MatchStats(
+                        fixture_id=fixture.id,
+                        home_xg=round(float(rng.gamma(4, 0.4)), 2),
+                        away_xg=round(float(rng.gamma(4, 0.3)), 2)
+                    ))
+            kickoff += timedelta(days=7)
+        kickoff += timedelta(days=60)
+
+    await session.commit()
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'features.db'}"
+
+    async def _create():
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            await seed(session)
+        await engine.dispose()
+
+    asyncio.run(_create())
+    return url
+
+
+def run_with_session(url, body):
+    """Run `body(session)` on a fresh engine in its own event loop"""
+    async def _run():
+        engine = create_async_engine(url)
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+                return await body(session)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(_run())
+
+
+async def fixture_ids(session, *conditions):
+    return (await session.execute(
+        select(Fixture.id).where(*conditions).order_by(Fixture.match_date, Fixture.id)
+    )).scalars().all()
+
+
+def delete_markers():
+    """Drop the backfill markers so extraction ignores the stores"""
+    return delete(DataSyncLog).where(DataSyncLog.provider == BACKFILL_PROVIDER)
+
+
+def history_features(features):
+    return {fixture_id: {key: f[key] for key in HISTORY_KEYS} for fixture_id, f in features.items()}
+
+
+def assert_same_features(actual, expected):
+    assert actual.keys() == expected.keys()
+    for fixture_id in expected:
+        for key in HISTORY_KEYS:
+            assert actual[fixture_id][key] == pytest.approx(expected[fixture_id][key]), (fixture_id, key)
+
+
+def test_store_and_index_match_history(database_url):
+    async def body(session):
+        scheduled = await fixture_ids(session, Fixture.status == FixtureStatus.SCHEDULED)
+
+        # No backfill marker yet: every lookback is scanned from history
+        from_history = await FeatureExtractor(session).extract_features_batch(scheduled)
+
+        await _rebuild_team_features(session)
+        await _rebuild_head_to_head(session)
+        await session.commit()
+        markers = (await session.execute(select(DataSyncLog.resource_type))).scalars().all()
+        assert sorted(markers) == ['head_to_head', 'team_features']
+
+        from_store = await FeatureExtractor(session).extract_features_batch(scheduled)
+        assert_same_features(history_features(from_store), history_features(from_history))
+
+    run_with_session(database_url, body)
+
+
+def test_incremental_updates_match_history(database_url):
+    async def body(session):
+        scheduled = await fixture_ids(session, Fixture.status == FixtureStatus.SCHEDULED)
+
+        # The first update backfills the stores, later ones apply results
+        first, second, rest = scheduled[0], scheduled[1], scheduled[2:]
+        for fixture_id, (home_score, away_score) in ((first, (2, 0)), (second, (1, 1))):
+            fixture = await session.get(Fixture, fixture_id)
+            fixture.status = FixtureStatus.FINISHED
+            fixture.home_score, fixture.away_score = home_score, away_score
+            await session.flush()
+            await _update_team_features(session, [fixture_id])
+            await _update_head_to_head(session, [fixture_id])
+            await session.commit()
+
+        markers = (await session.execute(select(DataSyncLog.resource_type))).scalars().all()
+        assert sorted(markers) == ['head_to_head', 'team_features']
+        from_store = await FeatureExtractor(session).extract_features_batch(rest)
+
+        await session.execute(delete_markers())
+        await session.commit()
+        from_history = await FeatureExtractor(session).extract_features_batch(rest)
+
+        assert_same_features(history_features(from_store), history_features(from_history))
+
+    run_with_session(database_url, body)
+
+
+def test_reconciliation_repairs_a_result_that_bypassed_the_stores(database_url):
+    async def body(session):
+        scheduled = await fixture_ids(session, Fixture.status == FixtureStatus.SCHEDULED)
+        previous_round = (await fixture_ids(session, Fixture.id.notin_(scheduled)))[-len(scheduled):]
+
+        # Build the stores while the previous round is still unplayed
+        results = {}
+        for fixture_id in previous_round:
+            fixture = await session.get(Fixture, fixture_id)
+            results[fixture_id] = (fixture.home_score, fixture.away_score)
+            fixture.status, fixture.home_score, fixture.away_score = FixtureStatus.SCHEDULED, None, None
+        await session.flush()
+        await _rebuild_team_features(session)
+        await _rebuild_head_to_head(session)
+        await session.commit()
+
+        # One of its results is then written without going through the sync tasks
+        fixture = await session.get(Fixture, previous_round[0])
+        fixture.status = FixtureStatus.FINISHED
+        fixture.home_score, fixture.away_score = results[fixture.id]
+        await session.commit()
+
+        meetings = await fixture_ids(
+            session,
+            Fixture.status == FixtureStatus.FINISHED,
+            Fixture.home_team_id.in_([fixture.home_team_id, fixture.away_team_id]),
+            Fixture.away_team_id.in_([fixture.home_team_id, fixture.away_team_id])
+        )
+        # Readers trust the backfilled index; the reconciliation repairs it
+        h2h = await load_head_to_head(session, fixture.home_team_id, fixture.away_team_id)
+        assert h2h.matches == len(meetings) - 1
+
+        assert await _reconcile_team_features(session)
+        assert await _reconcile_head_to_head(session)
+        await session.commit()
+        h2h = await load_head_to_head(session, fixture.home_team_id, fixture.away_team_id)
+        assert h2h.matches == len(meetings)
+        assert not await _reconcile_team_features(session)
+        assert not await _reconcile_head_to_head(session)
+
+        from_store = await FeatureExtractor(session).extract_features_batch(scheduled)
+        await session.execute(delete_markers())
+        await session.commit()
+        from_history = await FeatureExtractor(session).extract_features_batch(scheduled)
+
+        assert_same_features(history_features(from_store), history_features(from_history))
+
+    run_with_session(database_url, body)
+
+
+def test_rewritten_result_rebuilds_the_stores(database_url):
+    async def body(session):
+        await _rebuild_team_features(session)
+        await _rebuild_head_to_head(session)
+        await session.commit()
+        scheduled = await fixture_ids(session, Fixture.status == FixtureStatus.SCHEDULED)
+
+        # A score correction on a fixture the stores already applied
+        played = (await fixture_ids(session, Fixture.status == FixtureStatus.FINISHED))[-1]
+        fixture = await session.get(Fixture, played)
+        assert not rewrites_result(fixture, fixture.status, fixture.home_score, fixture.away_score)
+        corrected = (fixture.home_score + 3, fixture.away_score)
+        assert rewrites_result(fixture, fixture.status, *corrected)
+        fixture.home_score, fixture.away_score = corrected
+        await session.flush()
+        await update_feature_stores(session, [], rebuild=True)
+        await session.commit()
+
+        from_store = await FeatureExtractor(session).extract_features_batch(scheduled)
+        await session.execute(delete_markers())
+        await session.commit()
+        from_history = await FeatureExtractor(session).extract_features_batch(scheduled)
+
+        assert_same_features(history_features(from_store), history_features(from_history))
+
+    run_with_session(database_url, body)
+
+
+def test_batch_matches_single_extraction(database_url):
+    async def body(session):
+        await _rebuild_team_features(session)
+        await _rebuild_head_to_head(session)
+        await session.commit()
+
+        ids = await fixture_ids(session, Fixture.season == SEASONS[-1])
+        ids = ids[-9:]  # Last played rounds and the scheduled one
+        extractor = FeatureExtractor(session)
+        batch = await extractor.extract_features_batch(ids)
+        single = {fixture_id: await extractor.extract_features(fixture_id) for fixture_id in ids}
+
+        for fixture_id in ids:
+            expected = {k: v for k, v in single[fixture_id].items() if k != 'timestamp'}
+            actual = {k: v for k, v in batch[fixture_id].items() if k != 'timestamp'}
+            assert actual == pytest.approx(expected), fixture_id
+
+    run_with_session(database_url, body)
+
+
+def test_as_of_matches_history_cut_at_kickoff(database_url):
+    async def body(session):
+        ids = await fixture_ids(session, Fixture.season == SEASONS[-1])
+        targets = ids[len(ids) // 2:len(ids) // 2 + N_TEAMS // 2]  # One mid-season round
+        kickoff = (await session.get(Fixture, targets[0])).match_date
+
+        history = await FixtureHistory().refresh(session)
+        as_of = await FeatureExtractor(session, history=history).extract_features_as_of(targets)
+
+        # Forget every result from the kick-off on, then describe the
+        # round as of now
+        await session.execute(
+            update(Fixture)
+            .where(Fixture.match_date >= kickoff)
+            .values(status=FixtureStatus.SCHEDULED, home_score=None, away_score=None)
+        )
+        await session.commit()
+        cut = await FeatureExtractor(session).extract_features_batch(targets)
+
+        assert_same_features(history_features(as_of), history_features(cut))
+
+    run_with_session(database_url, body)
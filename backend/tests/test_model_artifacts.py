@@ -0,0 +1,149 @@
+"""
+Model artifacts: manifest + memory-mapped parameter block round trips.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.ml.artifacts import (
+    convert_legacy_pickle,
+    load_artifact,
+    load_model,
+    publish_artifact,
+    read_manifest,
+    save_artifact,
+    stage_artifact,
+)
+from app.ml.dixon_coles import DixonColesModel
+from app.ml.prediction_table import model_fingerprint
+
+TEAMS = [f'Team {i}' for i in range(6)]
+
+
+def make_matches(seed, n_matches=150):
+    rng = np.random.default_rng(seed)
+    start = datetime(2024, 8, 18)
+    matches = []
+    for k in range(n_matches):
+        home, away = rng.choice(len(TEAMS), 2, replace=False)
+        matches.append({
+            'home_team': TEAMS[home],
+            'away_team': TEAMS[away],
+            'home_team_id': 100 + int(home),
+            'away_team_id': 100 + int(away),
+            'home_score': int(rng.poisson(1.5)),
+            'away_score': int(rng.poisson(1.1)),
+            'date': start + timedelta(days=k),
+        })
+    return matches
+
+
+@pytest.fixture(scope='module')
+def fitted():
+    model = DixonColesModel()
+    model.fit(make_matches(0))
+    model.version = 'test-1'
+    return model
+
+
+def predictions(model):
+    home, away = zip(*[(h, a) for h in TEAMS for a in TEAMS if h != a])
+    batch = model.predict_matches(list(home), list(away), max_goals=8)
+    return np.column_stack([batch['prob_home_win'], batch['prob_draw'], batch['prob_away_win']])
+
+
+def test_round_trip_preserves_the_model(fitted, tmp_path):
+    path = tmp_path / 'model.json'
+    save_artifact(fitted, path, max_goals=8)
+
+    loaded = load_artifact(path)
+
+    assert loaded.team_list == fitted.team_list
+    assert loaded.team_ids_by_name() == fitted.team_ids_by_name()
+    assert loaded.version == 'test-1'
+    assert loaded.home_advantage == fitted.home_advantage
+    assert loaded.rho == fitted.rho
+    assert loaded.fit_stats['iterations'] == fitted.fit_stats['iterations']
+    assert read_manifest(path)['max_goals'] == 8
+    np.testing.assert_array_equal(predictions(loaded), predictions(fitted))
+
+
+def test_parameters_are_memory_mapped_read_only(fitted, tmp_path):
+    path = tmp_path / 'model.json'
+    save_artifact(fitted, path)
+
+    loaded = load_artifact(path)
+
+    assert isinstance(loaded.attack.base, np.memmap)
+    assert not loaded.attack.flags.writeable
+    assert load_artifact(path, mmap=False).attack.flags.writeable
+
+
+def test_staged_artifact_is_published_atomically(fitted, tmp_path):
+    path = tmp_path / 'model.json'
+    save_artifact(fitted, path)
+    live = model_fingerprint(path)
+    first_block = read_manifest(path)['params_file']
+
+    refit = DixonColesModel()
+    refit.fit(make_matches(1))
+    staged = stage_artifact(refit, path)
+
+    # Readers still see the old artifact until it is published
+    assert model_fingerprint(path) == live
+    staged_fingerprint = model_fingerprint(staged)
+
+    publish_artifact(staged, path)
+
+    assert model_fingerprint(path) == staged_fingerprint
+    assert not staged.exists()
+    blocks = sorted(p.name for p in tmp_path.glob('model.*.params.npy'))
+    assert blocks == [read_manifest(path)['params_file']]
+    assert first_block not in blocks
+
+
+def test_saving_the_same_parameters_reuses_the_block(fitted, tmp_path):
+    path = tmp_path / 'model.json'
+    save_artifact(fitted, path)
+    save_artifact(fitted, path)
+
+    assert len(list(tmp_path.glob('model.*.params.npy'))) == 1
+
+
+def test_legacy_pickle_loads_and_converts(fitted, tmp_path):
+    pickle_path = str(tmp_path / 'model.pkl')
+    fitted.save(pickle_path)
+
+    assert read_manifest(pickle_path) == {}
+    np.testing.assert_allclose(predictions(load_model(pickle_path)), predictions(fitted))
+
+    manifest_path = tmp_path / 'model.json'
+    convert_legacy_pickle(pickle_path, manifest_path, model_version='converted')
+    np.testing.assert_allclose(predictions(load_model(str(manifest_path))), predictions(fitted))
+
+
+def test_rejects_foreign_or_inconsistent_artifacts(fitted, tmp_path):
+    path = tmp_path / 'model.json'
+    save_artifact(fitted, path)
+    manifest = read_manifest(path)
+
+    for change in ({'format': 'other'}, {'format_version': 99}, {'teams': TEAMS[:-1]}):
+        with open(path, 'w') as f:
+            json.dump({**manifest, **change}, f)
+        with pytest.raises(ValueError):
+            load_artifact(path)
+
+
+def test_assigning_to_a_loaded_model_copies_on_write(fitted, tmp_path):
+    path = tmp_path / 'model.json'
+    save_artifact(fitted, path)
+    loaded = load_artifact(path)
+
+    loaded.attack_params[TEAMS[0]] = 2.0
+
+    assert loaded.attack_params[TEAMS[0]] == 2.0
+    assert loaded.attack.flags.writeable
+    np.testing.assert_array_equal(load_artifact(path).attack, fitted.attack)
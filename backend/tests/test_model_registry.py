@@ -0,0 +1,125 @@
+"""
+Model registry: hot reload of the artifact and its companion files.
+"""
+
+import os
+
+import pytest
+
+from app.ml.artifacts import publish_artifact, save_artifact, stage_artifact
+from app.ml.bootstrap import BootstrapDraws
+from app.ml.dixon_coles import DixonColesModel
+from app.ml.prediction_table import PredictionTable, model_fingerprint
+from app.ml.registry import DEFAULT_MAX_GOALS, ModelRegistry
+from test_model_artifacts import make_matches
+
+
+def fit(seed, version):
+    model = DixonColesModel()
+    model.fit(make_matches(seed))
+    model.version = version
+    return model
+
+
+@pytest.fixture(scope='module')
+def models():
+    return fit(0, 'v1'), fit(1, 'v2')
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return {
+        'model_path': str(tmp_path / 'model.json'),
+        'table_path': str(tmp_path / 'model.table.npz'),
+        'bootstrap_path': str(tmp_path / 'model.bootstrap.npz'),
+        'legacy_path': None,
+    }
+
+
+def test_loads_once_and_reloads_on_a_new_artifact(models, paths):
+    first, second = models
+    registry = ModelRegistry(**paths)
+    assert registry.get() is None
+    assert registry.active_version == registry.default_version
+
+    save_artifact(first, paths['model_path'])
+    entry = registry.get()
+    assert entry.version == 'v1'
+    assert entry.fingerprint == model_fingerprint(paths['model_path'])
+    assert registry.get() is entry
+
+    save_artifact(second, paths['model_path'])
+    reloaded = registry.get()
+    assert reloaded is not entry
+    assert reloaded.version == 'v2'
+    assert reloaded.table.model_fingerprint == reloaded.fingerprint
+
+
+def test_keeps_the_entry_when_content_is_unchanged_or_gone(models, paths):
+    registry = ModelRegistry(**paths)
+    save_artifact(models[0], paths['model_path'])
+    entry = registry.get()
+
+    # Rewritten with the same bytes: new mtime, same fingerprint
+    with open(paths['model_path'], 'rb') as f:
+        content = f.read()
+    with open(paths['model_path'], 'wb') as f:
+        f.write(content)
+    os.utime(paths['model_path'], ns=(0, 0))
+    assert registry.get() is entry
+
+    os.remove(paths['model_path'])
+    assert registry.get() is entry
+
+
+def test_table_uses_the_manifest_grid_size(models, paths):
+    save_artifact(models[0], paths['model_path'], max_goals=7)
+    fingerprint = model_fingerprint(paths['model_path'])
+
+    # A table saved for this artifact but with another grid is rebuilt
+    PredictionTable.build(models[0], 'v1', model_fingerprint=fingerprint, max_goals=10).save(paths['table_path'])
+    assert ModelRegistry(**paths).get().table.max_goals == 7
+
+    PredictionTable.build(models[0], 'v1', model_fingerprint=fingerprint, max_goals=7).save(paths['table_path'])
+    assert ModelRegistry(**paths).get().table.max_goals == 7
+
+    save_artifact(models[1], paths['model_path'])
+    assert ModelRegistry(**paths).get().table.max_goals == DEFAULT_MAX_GOALS
+
+
+def bootstrap_draws(model, fingerprint):
+    draws = BootstrapDraws.fit(model, make_matches(0), n_resamples=3, n_workers=1)
+    draws.model_fingerprint = fingerprint
+    return draws
+
+
+def test_bootstrap_saved_before_publishing_is_attached(models, paths):
+    staged = stage_artifact(models[0], paths['model_path'])
+    fingerprint = model_fingerprint(staged)
+    bootstrap_draws(models[0], fingerprint).save(paths['bootstrap_path'])
+    publish_artifact(staged, paths['model_path'])
+
+    entry = ModelRegistry(**paths).get()
+
+    assert entry.fingerprint == fingerprint
+    assert entry.bootstrap is not None and entry.bootstrap.n_draws == 3
+
+
+def test_bootstrap_saved_later_is_picked_up(models, paths):
+    save_artifact(models[0], paths['model_path'])
+    registry = ModelRegistry(**paths)
+    entry = registry.get()
+    assert entry.bootstrap is None
+
+    bootstrap_draws(models[0], entry.fingerprint).save(paths['bootstrap_path'])
+    refreshed = registry.get()
+
+    assert refreshed.bootstrap.n_draws == 3
+    assert refreshed.model is entry.model
+
+
+def test_bootstrap_of_another_artifact_is_ignored(models, paths):
+    save_artifact(models[0], paths['model_path'])
+    bootstrap_draws(models[0], 'f' * 64).save(paths['bootstrap_path'])
+
+    assert ModelRegistry(**paths).get().bootstrap is None